@@ -0,0 +1,124 @@
+# agents/agent_dag.py
+"""
+Small dependency-aware executor for agent pipelines.
+
+Each node names the inputs it needs (initial inputs passed to run() or the
+outputs of other nodes). Nodes whose inputs are ready run concurrently on a
+shared thread pool, and the wall time of every node is recorded. run() can be
+limited to the outputs a caller needs; nodes nothing requested depends on are
+skipped.
+"""
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional, Sequence
+
+
+# process-wide default so every run (and every Streamlit rerun) shares threads
+SHARED_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="agent-dag")
+
+
+class _Node:
+    __slots__ = ("name", "fn", "inputs")
+
+    def __init__(self, name, fn, inputs):
+        self.name = name
+        self.fn = fn
+        self.inputs = tuple(inputs)
+
+
+class DagRun:
+    def __init__(self, values: Dict[str, Any], timings: Dict[str, float], total: float):
+        self.values = values
+        self.timings = timings  # node name -> wall seconds
+        self.total = total
+
+    def __getitem__(self, name: str):
+        return self.values[name]
+
+
+class AgentDAG:
+    def __init__(self, executor: Optional[ThreadPoolExecutor] = None):
+        self.executor = executor or SHARED_POOL
+        self._nodes: "OrderedDict[str, _Node]" = OrderedDict()
+
+    def node(self, name: str, fn: Callable[..., Any], inputs: Sequence[str] = ()) -> "AgentDAG":
+        """Register `fn`, called with the values of `inputs` (in that order) once they are all available."""
+        if name in self._nodes:
+            raise ValueError(f"duplicate node: {name}")
+        self._nodes[name] = _Node(name, fn, inputs)
+        return self
+
+    def _check(self, initial: Dict[str, Any]):
+        known = set(initial) | set(self._nodes)
+        for node in self._nodes.values():
+            missing = [i for i in node.inputs if i not in known]
+            if missing:
+                raise ValueError(f"node {node.name!r} depends on unknown inputs {missing}")
+        # Kahn's algorithm, only to reject cycles up front
+        indegree = {n: sum(i in self._nodes for i in node.inputs) for n, node in self._nodes.items()}
+        ready = [n for n, d in indegree.items() if d == 0]
+        seen = 0
+        while ready:
+            current = ready.pop()
+            seen += 1
+            for n, node in self._nodes.items():
+                if current in node.inputs:
+                    indegree[n] -= 1
+                    if indegree[n] == 0:
+                        ready.append(n)
+        if seen != len(self._nodes):
+            raise ValueError("agent DAG has a cycle")
+
+    def _needed(self, outputs: Sequence[str]) -> "OrderedDict[str, _Node]":
+        unknown = [o for o in outputs if o not in self._nodes]
+        if unknown:
+            raise ValueError(f"unknown outputs {unknown}")
+        needed = set()
+        stack = list(outputs)
+        while stack:
+            name = stack.pop()
+            if name in needed:
+                continue
+            needed.add(name)
+            stack.extend(i for i in self._nodes[name].inputs if i in self._nodes)
+        return OrderedDict((n, node) for n, node in self._nodes.items() if n in needed)
+
+    def _call(self, node: _Node, args: Sequence[Any]):
+        start = time.perf_counter()
+        value = node.fn(*args)
+        return value, time.perf_counter() - start
+
+    def run(self, outputs: Optional[Sequence[str]] = None, **initial) -> DagRun:
+        """
+        Run the nodes with `initial` as the starting inputs. With `outputs`, only those
+        nodes and the ones they depend on run; the others are absent from the result.
+        """
+        self._check(initial)
+        start = time.perf_counter()
+        values: Dict[str, Any] = dict(initial)
+        timings: Dict[str, float] = {}
+        pending = self._needed(outputs) if outputs is not None else OrderedDict(self._nodes)
+        running = {}
+
+        while pending or running:
+            for name in [n for n, node in pending.items() if all(i in values for i in node.inputs)]:
+                node = pending.pop(name)
+                args = [values[i] for i in node.inputs]
+                running[self.executor.submit(self._call, node, args)] = node
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                node = running.pop(future)
+                try:
+                    value, elapsed = future.result()
+                except BaseException:
+                    for other in running:
+                        other.cancel()
+                    raise
+                values[node.name] = value
+                timings[node.name] = elapsed
+
+        for name in initial:
+            values.pop(name, None)
+        return DagRun(values, timings, time.perf_counter() - start)
@@ -0,0 +1,132 @@
+# agents/brake_stream.py
+"""
+Streaming ingestion stage for brake-pad telematics.
+
+Vehicles report their pad thickness every few seconds, but only a change of
+state matters downstream: a vehicle whose pads just went below the limit needs
+a call and a booking, one that keeps reporting worn pads does not. Readings are
+buffered into windows and each window is diagnosed as NumPy arrays; per vehicle
+the stream remembers the last state and emits only transitions (ok -> worn as
+an issue, worn -> ok as cleared), in arrival order.
+
+A reading between the limit and limit + hysteresis_mm keeps the previous state,
+so a sensor hovering around 3 mm does not flap between issue and cleared.
+"""
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+import numpy as np
+
+from agents.diagnosis_simple import BRAKE_ISSUE, BRAKE_PAD_MIN_MM, diagnose_brake_sensors
+
+WINDOW = 4096
+
+
+class BrakeTransition(NamedTuple):
+    vehicle_id: str
+    issue: Optional[str]  # BRAKE_ISSUE when the pads became worn, None when cleared
+    brake_sensor_mm: float
+    city: str
+    seq: int  # position of the reading in the stream
+
+
+class BrakeEventStream:
+    def __init__(self, window: int = WINDOW, hysteresis_mm: float = 0.25):
+        self.window = window
+        self.clear_mm = BRAKE_PAD_MIN_MM + hysteresis_mm
+        self._codes: Dict[str, int] = {}
+        self._ids: List[str] = []
+        self._worn = np.zeros(1024, dtype=bool)  # last known state per vehicle code
+        self.readings = 0
+        self.transitions = 0
+
+    def _code(self, vehicle_id: str) -> int:
+        c = self._codes.get(vehicle_id)
+        if c is None:
+            c = self._codes[vehicle_id] = len(self._ids)
+            self._ids.append(vehicle_id)
+        return c
+
+    def process_window(self, vehicle_ids, sensor_mm, cities=None) -> List[BrakeTransition]:
+        """Diagnose one window of readings (in arrival order) and return its transitions."""
+        codes = np.fromiter((self._code(v) for v in vehicle_ids), dtype=np.int64, count=len(vehicle_ids))
+        mm = np.asarray(sensor_mm, dtype=np.float64)
+        n = len(codes)
+        base = self.readings
+        self.readings += n
+        if n == 0:
+            return []
+        if len(self._ids) > len(self._worn):
+            grown = np.zeros(max(len(self._ids), 2 * len(self._worn)), dtype=bool)
+            grown[: len(self._worn)] = self._worn
+            self._worn = grown
+
+        # +1 worn, -1 ok, 0 inside the hysteresis band (keep the previous state)
+        vote = np.where(diagnose_brake_sensors(mm), 1, np.where(mm >= self.clear_mm, -1, 0)).astype(np.int8)
+
+        # group the window by vehicle, keeping arrival order inside each group
+        order = np.argsort(codes, kind="stable")
+        c = codes[order]
+        v = vote[order]
+        starts = np.empty(n, dtype=bool)
+        starts[0] = True
+        np.not_equal(c[1:], c[:-1], out=starts[1:])
+
+        prev_state = self._worn[c[starts]]
+        # a hold at the start of a group carries the state from earlier windows
+        v[starts] = np.where(v[starts] == 0, np.where(prev_state, 1, -1), v[starts])
+        # forward-fill the holds from the last decisive reading of the same vehicle
+        last = np.maximum.accumulate(np.where(v != 0, np.arange(n), 0))
+        state = v[last] > 0
+
+        before = np.empty(n, dtype=bool)
+        before[1:] = state[:-1]
+        before[starts] = prev_state
+        changed = order[state != before]
+
+        ends = np.empty(n, dtype=bool)
+        ends[-1] = True
+        ends[:-1] = starts[1:]
+        self._worn[c[ends]] = state[ends]
+
+        worn = np.empty(n, dtype=bool)
+        worn[order] = state
+        changed.sort()
+        out = []
+        for i in changed.tolist():
+            out.append(BrakeTransition(
+                self._ids[codes[i]],
+                BRAKE_ISSUE if worn[i] else None,
+                float(mm[i]),
+                cities[i] if cities is not None else "Unknown",
+                base + i,
+            ))
+        self.transitions += len(out)
+        return out
+
+    def run(self, readings: Iterable[Any]) -> Iterator[BrakeTransition]:
+        """
+        Consume readings and yield transitions window by window. A reading is a
+        (vehicle_id, brake_sensor_mm[, city]) tuple or a dict with those keys.
+        """
+        ids, mms, cities = [], [], []
+        for r in readings:
+            if isinstance(r, dict):
+                ids.append(r["vehicle_id"])
+                mms.append(r["brake_sensor_mm"])
+                cities.append(r.get("city", "Unknown"))
+            else:
+                ids.append(r[0])
+                mms.append(r[1])
+                cities.append(r[2] if len(r) > 2 else "Unknown")
+            if len(ids) >= self.window:
+                yield from self.process_window(ids, mms, cities)
+                ids, mms, cities = [], [], []
+        if ids:
+            yield from self.process_window(ids, mms, cities)
+
+    def is_worn(self, vehicle_id: str) -> bool:
+        c = self._codes.get(vehicle_id)
+        return c is not None and bool(self._worn[c])
+
+    def stats(self) -> Dict[str, int]:
+        return {"readings": self.readings, "vehicles": len(self._ids), "transitions": self.transitions}
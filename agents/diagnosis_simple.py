@@ -1,11 +1,20 @@
 # agents/diagnosis_simple.py
 """Tiny diagnosis function (keeps your earlier logic)"""
 
+BRAKE_PAD_MIN_MM = 3.0
+BRAKE_ISSUE = "Brake Pad Wear"
+
 def diagnose_brake_sensor(sensor_mm: float):
     """
     Returns None or a short issue string based on brake pad thickness in mm.
     (your demo logic: <3mm -> issue)
     """
-    if sensor_mm < 3.0:
-        return "Brake Pad Wear"
+    if sensor_mm < BRAKE_PAD_MIN_MM:
+        return BRAKE_ISSUE
     return None
+
+def diagnose_brake_sensors(sensor_mm):
+    """Vectorized diagnose_brake_sensor: boolean array, True where the pads are worn."""
+    import numpy as np  # only streaming callers pay for numpy
+
+    return np.asarray(sensor_mm, dtype=np.float64) < BRAKE_PAD_MIN_MM
@@ -1,14 +1,24 @@
 # agents/integrator.py
-from services.db_manager import DatabaseManager
+from services.db_manager import open_database
 from agents.voice_agent import VoiceAI_Agent
 from agents.diagnosis_simple import diagnose_brake_sensor
 from agents.scheduler_agent import SchedulingAgent
 
 class SimpleOrchestrator:
     def __init__(self, db_file: str = "vehicle_database.json"):
-        self.db = DatabaseManager(db_file)
+        self.db = open_database(db_file)
         self.voice = VoiceAI_Agent()
         self.scheduler = SchedulingAgent(self.db)
+        self._brake_stream = None
+
+    @property
+    def brake_stream(self):
+        """Per-vehicle brake state between stream windows; created (with numpy) on first use."""
+        if self._brake_stream is None:
+            from agents.brake_stream import BrakeEventStream
+
+            self._brake_stream = BrakeEventStream()
+        return self._brake_stream
 
     def process_brake_event(self, vehicle_id: str, brake_sensor_mm: float, city: str = "Unknown"):
         """
@@ -41,3 +51,17 @@ class SimpleOrchestrator:
             flow["status"] = "declined"
 
         return flow
+
+    def process_brake_stream(self, readings):
+        """
+        Streaming version of process_brake_event for raw telematics: readings are
+        (vehicle_id, brake_sensor_mm[, city]) tuples or dicts. Repeated readings of an
+        unchanged state are dropped; only a vehicle whose pads have just become worn
+        goes through the call / booking flow, and a recovered one is reported as cleared.
+        Yields one flow dict per transition.
+        """
+        for t in self.brake_stream.run(readings):
+            if t.issue:
+                yield self.process_brake_event(t.vehicle_id, t.brake_sensor_mm, city=t.city)
+            else:
+                yield {"vehicle_id": t.vehicle_id, "issue": None, "status": "cleared"}
@@ -1,21 +1,26 @@
 # agents/scheduler_agent.py
-import time
 from typing import Dict
-from services.db_manager import DatabaseManager
+from services.db_manager import DatabaseManager, open_database
+from services.slot_inventory import SLOT_INVENTORY, Reservation, SlotInventory
 
 class SchedulingAgent:
-    def __init__(self, db: DatabaseManager = None):
-        self.db = db or DatabaseManager()
+    def __init__(self, db: DatabaseManager = None, inventory: SlotInventory = None):
+        self.db = db or open_database()
+        self.inventory = inventory or SLOT_INVENTORY
 
-    def _find_earliest_slot(self, city: str):
-        # Minimal deterministic slot logic for demo
-        t = time.localtime()
-        # build a friendly string
-        slot = time.strftime("%a %d %b - 10:00 AM", t)
-        return slot
+    def _find_earliest_slot(self, city: str, vehicle_id: str = None) -> Reservation:
+        # earliest bay with capacity at the city hub; reserved so no one else gets it
+        return self.inventory.reserve(city, vehicle_id=vehicle_id)
 
-    def book_service(self, vehicle_id: str, issue: str, city: str = "Unknown"):
-        slot = self._find_earliest_slot(city)
-        action = f"Scheduled Service ({slot})"
-        self.db.update_vehicle_history(vehicle_id, issue, action)
-        return {"status": "booked", "slot": slot, "vehicle_id": vehicle_id}
+    def book_service(self, vehicle_id: str, issue: str, city: str = "Unknown") -> Dict:
+        booked = self._find_earliest_slot(city, vehicle_id)
+        if booked is None:
+            return {"status": "waitlisted", "slot": None, "vehicle_id": vehicle_id}
+        slot = booked.start.strftime("%a %d %b - %I:%M %p")
+        action = f"Scheduled Service ({slot}, bay {booked.bay})"
+        try:
+            self.db.update_vehicle_history(vehicle_id, issue, action, slot=booked.start)
+        except Exception:
+            self.inventory.release(booked)
+            raise
+        return {"status": "booked", "slot": slot, "bay": booked.bay, "vehicle_id": vehicle_id}
@@ -1,36 +1,46 @@
-# agents/voice_agent_ui.py
-import pyttsx3
-import threading
+# agents/voice_agent.py
+from typing import Optional
+
+from services.tts_worker import shared_speech_worker
 
 class VoiceAgentServer:
-    def __init__(self, rate: int = 150, speak_enabled: bool = True):
+    def __init__(self, rate: int = 150, speak_enabled: bool = True, backend: str = "auto"):
         self.speak_enabled = speak_enabled
-        if speak_enabled:
-            self.engine = pyttsx3.init()
-            self.engine.setProperty("rate", rate)
-        else:
-            self.engine = None
+        # utterances go to the single process-wide speech thread, which owns the engine
+        self.worker = shared_speech_worker(backend, rate) if speak_enabled else None
 
     def speak_async(self, text: str):
-        """Run TTS in separate thread so Streamlit UI doesn't freeze for long scripts."""
+        """Queue TTS without blocking; a reply still waiting is replaced by this one."""
         if not self.speak_enabled:
             print("[VOICE DISABLED] " + text)
             return
-
-        def runner():
-            try:
-                self.engine.say(text)
-                self.engine.runAndWait()
-            except Exception as e:
-                print("TTS failed:", e)
-
-        t = threading.Thread(target=runner, daemon=True)
-        t.start()
+        self.worker.say(text)
 
     def speak(self, text: str):
         """Synchronous speak (small text)"""
         if self.speak_enabled:
-            self.engine.say(text)
-            self.engine.runAndWait()
+            self.worker.speak(text)
         else:
             print("[VOICE DISABLED] " + text)
+
+class VoiceAI_Agent:
+    """Phone-call style agent used by SimpleOrchestrator: explains the issue and asks to book."""
+
+    def __init__(self, server: Optional[VoiceAgentServer] = None, auto_response: Optional[str] = None):
+        self.server = server or VoiceAgentServer()
+        # fixed answer for unattended runs; None asks on the console
+        self.auto_response = auto_response
+
+    def make_call(self, owner: str, issue: str) -> str:
+        script = (
+            f"Hello {owner}, this is your vehicle care assistant. "
+            f"Our sensors detected {issue.lower()}. "
+            "Shall I book a service slot for you? Please say yes or no."
+        )
+        self.server.speak(script)
+        if self.auto_response is not None:
+            return self.auto_response.lower()
+        try:
+            return input(f"[{owner}] response (yes/no): ").strip().lower()
+        except EOFError:
+            return ""
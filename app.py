@@ -1,23 +1,23 @@
 # streamlit_app_with_server_tts.py
 import streamlit as st
 import pandas as pd
-import numpy as np
 from datetime import datetime, timedelta
+from importlib.util import find_spec
 import random
-import threading
 import json
 
-# Try to import pyttsx3; if unavailable, disable server TTS gracefully
-try:
-    import pyttsx3
-    TTS_AVAILABLE = True
-except Exception:
-    pyttsx3 = None
-    TTS_AVAILABLE = False
+# pyttsx3 is only imported (and its engine started) by the speech worker on the first
+# reply; here we just check it is installed, and disable server TTS gracefully if not
+TTS_AVAILABLE = find_spec("pyttsx3") is not None
 
 # small helper to embed raw html/js
 from streamlit.components.v1 import html as st_html
 
+from data.fleet_data import vehicles_df, maint_df, demand_forecaster
+from agents.agentic_layer import UebaMonitor, ManufacturingInsightsAgent, master_orchestrate
+from services.slot_inventory import SLOT_INVENTORY
+from services.tts_worker import shared_speech_worker
+
 # ------------------ PAGE CONFIG & STYLE ------------------ #
 st.set_page_config(
     page_title="AI Car Maintenance Dashboard",
@@ -114,430 +114,50 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
-# ------------------ SYNTHETIC DATA (expanded to 20 vehicles) ------------------ #
-def build_synthetic_vehicles():
-    base_year = datetime.now().year
-    vehicles = [
-        {"id": "V001", "make": "Hero", "model": "Xtreme 160R", "year": base_year-1, "city": "Mumbai", "segment": "2W", "avg_km_per_day": 38},
-        {"id": "V002", "make": "Hero", "model": "Splendor Plus", "year": base_year-3, "city": "Pune", "segment": "2W", "avg_km_per_day": 32},
-        {"id": "V003", "make": "Hero", "model": "Glamour", "year": base_year-2, "city": "Delhi", "segment": "2W", "avg_km_per_day": 45},
-        {"id": "V004", "make": "Hero", "model": "Maestro Edge", "year": base_year-4, "city": "Nagpur", "segment": "2W", "avg_km_per_day": 25},
-        {"id": "V005", "make": "Mahindra", "model": "XUV700", "year": base_year-1, "city": "Bengaluru", "segment": "4W", "avg_km_per_day": 52},
-        {"id": "V006", "make": "Mahindra", "model": "Scorpio N", "year": base_year-5, "city": "Chennai", "segment": "4W", "avg_km_per_day": 40},
-        {"id": "V007", "make": "Mahindra", "model": "Thar", "year": base_year-3, "city": "Jaipur", "segment": "4W", "avg_km_per_day": 30},
-        {"id": "V008", "make": "Mahindra", "model": "Bolero Neo", "year": base_year-6, "city": "Lucknow", "segment": "4W", "avg_km_per_day": 34},
-        {"id": "V009", "make": "Hero", "model": "Xpulse 200", "year": base_year-2, "city": "Hyderabad", "segment": "2W", "avg_km_per_day": 48},
-        {"id": "V010", "make": "Mahindra", "model": "XUV300", "year": base_year-4, "city": "Indore", "segment": "4W", "avg_km_per_day": 29},
-        # extra vehicles to reach up to 20
-        {"id": "V011", "make": "Hero", "model": "Destini 125", "year": base_year-2, "city": "Surat", "segment": "2W", "avg_km_per_day": 28},
-        {"id": "V012", "make": "Mahindra", "model": "Bolero", "year": base_year-7, "city": "Ranchi", "segment": "4W", "avg_km_per_day": 36},
-        {"id": "V013", "make": "Tata", "model": "Nexon EV", "year": base_year-1, "city": "Kolkata", "segment": "4W", "avg_km_per_day": 44},
-        {"id": "V014", "make": "Tata", "model": "Harrier", "year": base_year-3, "city": "Ahmedabad", "segment": "4W", "avg_km_per_day": 31},
-        {"id": "V015", "make": "Maruti", "model": "Swift", "year": base_year-2, "city": "Bengaluru", "segment": "4W", "avg_km_per_day": 38},
-        {"id": "V016", "make": "Hyundai", "model": "i20", "year": base_year-1, "city": "Pune", "segment": "4W", "avg_km_per_day": 29},
-        {"id": "V017", "make": "Kia", "model": "Seltos", "year": base_year-4, "city": "Chennai", "segment": "4W", "avg_km_per_day": 33},
-        {"id": "V018", "make": "Honda", "model": "CB Shine", "year": base_year-2, "city": "Lucknow", "segment": "2W", "avg_km_per_day": 26},
-        {"id": "V019", "make": "RoyalEnfield", "model": "Classic 350", "year": base_year-3, "city": "Jaipur", "segment": "2W", "avg_km_per_day": 22},
-        {"id": "V020", "make": "Mahindra", "model": "Marazzo", "year": base_year-5, "city": "Delhi", "segment": "4W", "avg_km_per_day": 27},
-    ]
-    return pd.DataFrame(vehicles)
-
-def build_maintenance_logs():
-    random.seed(42)
-    vehicles = [f"V{str(i).zfill(3)}" for i in range(1, 21)]
-    components = ["Brakes", "Battery", "Engine", "Tyres", "Suspension"]
-    issues = {
-        "Brakes": "Brake pad wear",
-        "Battery": "Cranking issue",
-        "Engine": "Overheating",
-        "Tyres": "Uneven wear",
-        "Suspension": "Noise on bumps",
-    }
-    rca_tags = {
-        "Brakes": "City stop-go traffic",
-        "Battery": "Short trips / accessories",
-        "Engine": "Low coolant / oil quality",
-        "Tyres": "Improper alignment",
-        "Suspension": "Bad roads",
-    }
-    capa_actions = {
-        "Brakes": "Upgrade pad material; better cooling slots",
-        "Battery": "Higher CCA rating; smart alternator profile",
-        "Engine": "Improved cooling routing; sensor calibration",
-        "Tyres": "Factory alignment spec update",
-        "Suspension": "Reinforced bushings",
-    }
-
-    rows = []
-    today = datetime.now().date()
-    for _ in range(200):  # more synthetic records for larger dataset
-        comp = random.choice(components)
-        v = random.choice(vehicles)
-        when = today - timedelta(days=random.randint(1, 730))  # broader date range
-        severity = random.randint(1, 5)
-        cost = random.randint(800, 20000)
-        rows.append(
-            {
-                "vehicle_id": v,
-                "date": when,
-                "component": comp,
-                "issue": issues[comp],
-                "severity": severity,
-                "cost": cost,
-                "rca_tag": rca_tags[comp],
-                "capa_action": capa_actions[comp],
-            }
-        )
-    return pd.DataFrame(rows)
-
-VEHICLES_DF = build_synthetic_vehicles()
-MAINT_DF = build_maintenance_logs()
+# ------------------ SYNTHETIC DATA (see data/fleet_data.py) ------------------ #
+# vehicles_df() / maint_df() build the frames on first use and cache them per process,
+# so reruns and other sessions reuse the same frames
 
 # ------------------ SIMPLE VOICE AGENT (SERVER TTS) ------------------ #
 class VoiceAgentServer:
-    def __init__(self, rate: int = 150, speak_enabled: bool = True):
-        self.speak_enabled = speak_enabled and TTS_AVAILABLE
-        self.engine = None
-        if self.speak_enabled:
-            try:
-                self.engine = pyttsx3.init()
-                self.engine.setProperty("rate", rate)
-            except Exception as e:
-                print("pyttsx3 init failed:", e)
-                self.speak_enabled = False
-
-    def _runner(self, text: str):
-        try:
-            self.engine.say(text)
-            self.engine.runAndWait()
-        except Exception as e:
-            print("TTS speak failed:", e)
+    def __init__(self, rate: int = 150, speak_enabled: bool = True, backend: str = "auto"):
+        self.speak_enabled = speak_enabled and (TTS_AVAILABLE or backend != "auto")
+        # one process-wide speech thread owns the engine, so reruns do not start new ones
+        self.worker = shared_speech_worker(backend, rate) if self.speak_enabled else None
 
     def speak_async(self, text: str):
         if not self.speak_enabled:
             # fallback print for debug
             print("[VOICE DISABLED] " + text)
             return
-        t = threading.Thread(target=self._runner, args=(text,), daemon=True)
-        t.start()
+        # replaces a reply still waiting to be spoken
+        self.worker.say(text)
 
     def speak(self, text: str):
         if not self.speak_enabled:
             print("[VOICE DISABLED] " + text)
             return
-        self._runner(text)
+        self.worker.speak(text)
 
 voice_agent = VoiceAgentServer(speak_enabled=True)
 
 # ------------------ SIMPLE SCHEDULER (demo) ------------------ #
 class SchedulingAgentSimple:
-    def __init__(self):
-        pass
-
-    def book_service(self, vehicle_id: str, issue: str, city: str = "Unknown"):
-        today = datetime.now().date()
-        slot = (today + timedelta(days=2)).strftime("%d %b %Y") + " – 10:00 AM"
-        return {"status": "booked", "slot": slot, "vehicle_id": vehicle_id, "issue": issue}
+    def __init__(self, inventory=None):
+        # shared with the agentic SchedulingAgent, so a slot proposed there is the one confirmed here
+        self.inventory = inventory or SLOT_INVENTORY
+
+    def book_service(self, vehicle_id: str, issue: str, city: str = "Unknown", deadline=None):
+        # the analysis only quotes a slot; this is where the seat is actually taken
+        booked = self.inventory.reserve(city, deadline, vehicle_id=vehicle_id) if deadline else None
+        if booked is None:
+            booked = self.inventory.reserve(city, vehicle_id=vehicle_id)
+        if booked is None:
+            return {"status": "waitlisted", "slot": "No free slot", "vehicle_id": vehicle_id, "issue": issue}
+        return {"status": "booked", "slot": booked.label, "bay": booked.bay, "vehicle_id": vehicle_id, "issue": issue}
 
 sched_agent_simple = SchedulingAgentSimple()
 
-# ------------------ AGENTIC AI LAYER ------------------ #
-class UebaMonitor:
-    def __init__(self):
-        self.baseline_access = {
-            "DataAnalysisAgent": {"telematics_stream", "maintenance_db"},
-            "DiagnosisAgent": {"analysis_results"},
-            "CustomerEngagementAgent": {"customer_profile", "analysis_results"},
-            "SchedulingAgent": {"scheduler_api", "customer_profile"},
-            "FeedbackAgent": {"feedback_db", "customer_profile"},
-            "ManufacturingInsightsAgent": {"maintenance_db", "rca_capa_db"},
-        }
-        self.actions_log = []
-
-    def log_action(self, agent, action, resource, meta=None):
-        meta = meta or {}
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        allowed = resource in self.baseline_access.get(agent, set())
-        anomaly = not allowed
-        self.actions_log.append(
-            {
-                "time": timestamp,
-                "agent": agent,
-                "action": action,
-                "resource": resource,
-                "anomaly": anomaly,
-                "meta": meta,
-            }
-        )
-
-    def anomalies(self):
-        return [a for a in self.actions_log if a["anomaly"]]
-
-class DataAnalysisAgent:
-    def __init__(self, ueba: UebaMonitor):
-        self.ueba = ueba
-
-    def analyze(self, input_payload, maint_df: pd.DataFrame):
-        self.ueba.log_action("DataAnalysisAgent", "read", "telematics_stream")
-        self.ueba.log_action("DataAnalysisAgent", "read", "maintenance_db")
-
-        engine = input_payload["engine_temp"]
-        brake = input_payload["brake_health"]
-        battery = input_payload["battery_health"]
-        tyre = input_payload["tyre_pressure"]
-        mileage = input_payload["mileage"]
-        year = input_payload["year"]
-
-        now_year = datetime.now().year
-        age_factor = max(0, now_year - year) / 10.0
-        mileage_factor = min(1.0, mileage / 150000)
-        engine_factor = max(0, (engine - 195) / 60)
-        brake_factor = max(0, (60 - brake) / 40)
-        battery_factor = max(0, (55 - battery) / 40)
-        tyre_factor = max(0, abs(32 - tyre) / 12)
-
-        raw_score = (
-            0.20 * age_factor
-            + 0.25 * mileage_factor
-            + 0.20 * engine_factor
-            + 0.15 * brake_factor
-            + 0.10 * battery_factor
-            + 0.10 * tyre_factor
-        )
-        risk_score = float(max(0.0, min(1.0, raw_score)))
-
-        if risk_score < 0.25:
-            risk_band = "Low"
-        elif risk_score < 0.5:
-            risk_band = "Moderate"
-        elif risk_score < 0.75:
-            risk_band = "High"
-        else:
-            risk_band = "Critical"
-
-        likely_components = []
-        if engine_factor > 0.3:
-            likely_components.append("Engine cooling / oil circuit")
-        if brake_factor > 0.25:
-            likely_components.append("Brake pads & brake fluid")
-        if battery_factor > 0.2:
-            likely_components.append("Battery & charging system")
-        if tyre_factor > 0.3:
-            likely_components.append("Tyre pressure & wheel alignment")
-        if not likely_components:
-            likely_components.append("Routine check only – no acute risk")
-
-        base_daily = int(len(VEHICLES_DF) * 0.4)
-        x_days = np.arange(30)
-        seasonality = 4 * np.sin(x_days / 6)
-        forecast = pd.DataFrame(
-            {
-                "date": [datetime.now().date() + timedelta(days=int(d)) for d in x_days],
-                "expected_jobs": [
-                    max(1, int(base_daily + seasonality[i] + random.randint(-2, 3)))
-                    for i in range(30)
-                ],
-            }
-        )
-
-        return {
-            "risk_score": risk_score,
-            "risk_band": risk_band,
-            "likely_components": likely_components,
-            "forecast": forecast,
-        }
-
-class DiagnosisAgent:
-    def __init__(self, ueba: UebaMonitor):
-        self.ueba = ueba
-
-    def diagnose(self, analysis_output):
-        self.ueba.log_action("DiagnosisAgent", "read", "analysis_results")
-        score = analysis_output["risk_score"]
-        band = analysis_output["risk_band"]
-        components = analysis_output["likely_components"]
-
-        if band == "Low":
-            sla_days = 30
-        elif band == "Moderate":
-            sla_days = 15
-        elif band == "High":
-            sla_days = 7
-        else:
-            sla_days = 2
-
-        eta_date = datetime.now().date() + timedelta(days=sla_days)
-
-        est_cost = 1500 + int(score * 15000)
-        potential_saving = int(est_cost * 0.35)
-
-        summary = f"Risk is **{band}** with score {score:.2f}. Recommended to visit within **{sla_days} days** (by {eta_date})."
-        return {
-            "sla_days": sla_days,
-            "target_date": eta_date,
-            "estimated_cost": est_cost,
-            "potential_saving": potential_saving,
-            "summary": summary,
-            "components": components,
-        }
-
-class SchedulingAgent:
-    def __init__(self, ueba: UebaMonitor):
-        self.ueba = ueba
-
-    def schedule(self, city, diagnosis_output):
-        self.ueba.log_action("SchedulingAgent", "read", "scheduler_api")
-        self.ueba.log_action(
-            "SchedulingAgent", "read", "telematics_stream",
-            meta={"reason": "suspicious cross-access for demo"},
-        )
-
-        today = datetime.now().date()
-        sla_days = diagnosis_output["sla_days"]
-
-        slots = []
-        for d in range(1, 8):
-            date = today + timedelta(days=d)
-            label_base = date.strftime("%d %b")
-            slots.append({"date": date, "slot": f"{label_base} – 09:30 AM"})
-            slots.append({"date": date, "slot": f"{label_base} – 01:30 PM"})
-            slots.append({"date": date, "slot": f"{label_base} – 05:30 PM"})
-
-        eligible = [s for s in slots if s["date"] <= today + timedelta(days=sla_days)]
-        proposed = eligible[0] if eligible else slots[0]
-
-        return {
-            "proposed_slot": proposed["slot"],
-            "city": city,
-            "all_slots": [s["slot"] for s in eligible],
-        }
-
-class CustomerEngagementAgent:
-    def __init__(self, ueba: UebaMonitor):
-        self.ueba = ueba
-
-    def build_voice_script(self, owner_name, make, model, diagnosis_output, schedule_output):
-        self.ueba.log_action("CustomerEngagementAgent", "read", "customer_profile")
-        self.ueba.log_action("CustomerEngagementAgent", "read", "analysis_results")
-
-        band = diagnosis_output["summary"]
-        cost = diagnosis_output["estimated_cost"]
-        saving = diagnosis_output["potential_saving"]
-        slot = schedule_output["proposed_slot"]
-        components = diagnosis_output["components"]
-
-        script = f"""
-Hi {owner_name}, this is your virtual service advisor from Hero ✕ Mahindra.
-
-I’ve just completed a health scan of your {make} {model} using the latest telematics
-and service history.
-
-• Current health status: {band}
-• Likely attention areas: {", ".join(components)}
-• Estimated service cost if ignored: around ₹{cost:,}
-• You can save almost ₹{saving:,} by fixing this proactively.
-
-I recommend a preventive service visit. I’ve reserved a priority slot for you on
-{slot} at your nearest authorised workshop.
-
-Shall I go ahead and confirm this booking for you now?
-"""
-        return script.strip()
-
-class FeedbackAgent:
-    def __init__(self, ueba: UebaMonitor):
-        self.ueba = ueba
-
-    def plan_feedback(self, slot):
-        self.ueba.log_action("FeedbackAgent", "write", "feedback_db")
-        text = f"SMS + in-app survey will be triggered 6 hours after completion of service scheduled at **{slot}**."
-        return text
-
-class ManufacturingInsightsAgent:
-    def __init__(self, ueba: UebaMonitor):
-        self.ueba = ueba
-
-    def insights(self, maint_df: pd.DataFrame):
-        self.ueba.log_action("ManufacturingInsightsAgent", "read", "maintenance_db")
-        self.ueba.log_action("ManufacturingInsightsAgent", "read", "rca_capa_db")
-
-        grouped = (
-            maint_df.groupby("component")
-            .agg(
-                avg_severity=("severity", "mean"),
-                avg_cost=("cost", "mean"),
-                count=("component", "count"),
-            )
-            .reset_index()
-            .sort_values("avg_severity", ascending=False)
-        )
-
-        top3 = grouped.head(3)
-        bullets = []
-        for _, row in top3.iterrows():
-            comp = row["component"]
-            matching = maint_df[maint_df["component"] == comp]
-            common_rca = (
-                matching["rca_tag"]
-                .value_counts()
-                .idxmax()
-                if not matching.empty
-                else "NA"
-            )
-            sample_capa = (
-                matching["capa_action"].iloc[0] if not matching.empty else ""
-            )
-            bullets.append(
-                f"• **{comp}** – Avg severity {row['avg_severity']:.1f}, "
-                f"avg cost ₹{row['avg_cost']:.0f} over {int(row['count'])} cases. "
-                f"Top RCA: _{common_rca}_. Suggested CAPA: _{sample_capa}_"
-            )
-
-        summary = (
-            "These patterns are fed back to the manufacturing quality team every week. "
-            "Components with rising severity or cost automatically trigger a CAPA ticket and design review."
-        )
-        return bullets, summary
-
-# ------------------ MASTER ORCHESTRATOR ------------------ #
-def master_orchestrate(input_payload):
-    ueba = UebaMonitor()
-    data_agent = DataAnalysisAgent(ueba)
-    diag_agent = DiagnosisAgent(ueba)
-    sched_agent = SchedulingAgent(ueba)
-    voice_agent_local = CustomerEngagementAgent(ueba)
-    fb_agent = FeedbackAgent(ueba)
-    mfg_agent = ManufacturingInsightsAgent(ueba)
-
-    analysis_out = data_agent.analyze(input_payload, MAINT_DF)
-    diag_out = diag_agent.diagnose(analysis_out)
-    sched_out = sched_agent.schedule(input_payload["city"], diag_out)
-    voice_script = voice_agent_local.build_voice_script(
-        input_payload["owner_name"],
-        input_payload["make"],
-        input_payload["model"],
-        diag_out,
-        sched_out,
-    )
-    fb_plan = fb_agent.plan_feedback(sched_out["proposed_slot"])
-    mfg_bullets, mfg_summary = mfg_agent.insights(MAINT_DF)
-
-    return {
-        "analysis": analysis_out,
-        "diagnosis": diag_out,
-        "schedule": sched_out,
-        "voice_script": voice_script,
-        "feedback_plan": fb_plan,
-        "manufacturing": {
-            "bullets": mfg_bullets,
-            "summary": mfg_summary,
-        },
-        "ueba": {
-            "log": ueba.actions_log,
-            "anomalies": ueba.anomalies(),
-        },
-    }
-
 # ------------------ SESSION METRICS ------------------ #
 if "total_analyses" not in st.session_state:
     st.session_state.total_analyses = 156
@@ -607,6 +227,7 @@ with tab_single:
     st.subheader("Analyze Your Vehicle")
 
     # --------- VEHICLE INPUTS (non-form) to remove Streamlit form hint ----------
+    VEHICLES_DF = vehicles_df()
     c1, c2, c3, c4 = st.columns(4)
     with c1:
         makes = sorted(VEHICLES_DF["make"].unique().tolist())
@@ -665,7 +286,7 @@ with tab_single:
         # save payload so voice flow can reuse it
         st.session_state.last_payload = payload
 
-        result = master_orchestrate(payload)
+        result = master_orchestrate(payload, manufacturing=False)
         st.session_state.last_result = result
 
         st.session_state.total_analyses += 1
@@ -758,7 +379,8 @@ with tab_single:
             with col_confirm:
                 if st.button("Confirm booking (customer agrees)"):
                     vehicle_id_for_booking = st.session_state.get("last_payload", {}).get("vehicle_id", f"{make[:2].upper()}-{random.randint(100,999)}")
-                    booking = sched_agent_simple.book_service(vehicle_id_for_booking, "Proactive service", city=city)
+                    deadline = datetime.now().date() + timedelta(days=res["diagnosis"]["sla_days"])
+                    booking = sched_agent_simple.book_service(vehicle_id_for_booking, "Proactive service", city=city, deadline=deadline)
                     st.session_state.bookings.append(booking)
                     st.success(f"Booking confirmed: {booking['slot']}")
                     # speak confirmation
@@ -786,32 +408,30 @@ with tab_forecast:
     st.markdown('<div class="panel">', unsafe_allow_html=True)
     st.subheader("Forecasting Service Demand")
 
-    if st.session_state.last_result:
-        forecast_df = st.session_state.last_result["analysis"]["forecast"]
-    else:
-        forecast_df = DataAnalysisAgent(UebaMonitor()).analyze(
-            {
-                "engine_temp": 195,
-                "brake_health": 80,
-                "battery_health": 75,
-                "tyre_pressure": 32,
-                "mileage": 45000,
-                "year": 2022,
-            },
-            MAINT_DF,
-        )["forecast"]
+    forecaster = demand_forecaster()
+    forecast_df = forecaster.fleet_forecast()
 
     st.line_chart(
-        forecast_df.set_index("date")["expected_jobs"],
+        forecast_df.set_index("date")[["expected_jobs", "bays_needed"]].rename(
+            columns={"expected_jobs": "Expected jobs / day (rate)", "bays_needed": "Bays to plan"}
+        ),
         height=260,
     )
-    st.caption("Expected workshop load over the next 30 days – used by the Scheduling Agent to avoid over-booking.")
+    st.caption(
+        "Expected workshop load over the next 30 days: the mean job rate per day and the whole "
+        "bay-days to reserve for it (rate rounded up) – used by the Scheduling Agent to avoid over-booking."
+    )
+
+    # the per-hub chart is the slowest element on the page: only build it when asked for
+    if st.checkbox("Show expected jobs per day (rate) per city hub"):
+        hub_df = forecaster.to_frame().pivot(index="date", columns="city", values="expected_jobs")
+        st.line_chart(hub_df, height=260)
 
     st.markdown("---")
     st.subheader("RCA / CAPA – Manufacturing Feedback Loop")
 
     mfg_agent_demo = ManufacturingInsightsAgent(UebaMonitor())
-    bullets, summary = mfg_agent_demo.insights(MAINT_DF)
+    bullets, summary = mfg_agent_demo.insights(maint_df())
 
     for b in bullets:
         st.markdown(b)
@@ -1004,7 +624,7 @@ if "voice" in params:
             except Exception:
                 pass
 
-            res = master_orchestrate(payload)
+            res = master_orchestrate(payload, manufacturing=False)
             st.session_state.last_result = res
             st.session_state.total_analyses += 1
             st.session_state.issues_detected += 1
@@ -1075,7 +695,7 @@ with st.container():
                     "city": "Mumbai",
                     "vehicle_id": "V001"
                 })
-                res = master_orchestrate(payload)
+                res = master_orchestrate(payload, manufacturing=False)
                 st.session_state.last_result = res
                 st.session_state.total_analyses += 1
                 st.session_state.issues_detected += 1
@@ -0,0 +1,124 @@
+# benchmarks/api_load.py
+"""
+Load generator for run_api_server.py: keep-alive connections sending requests
+back to back, then throughput and latency percentiles.
+
+    python run_api_server.py --port 8080 &
+    python benchmarks/api_load.py --endpoint /score --connections 64 --requests 20000
+    python benchmarks/api_load.py --endpoint /analyze --vehicles 20 --requests 5000
+    python benchmarks/api_load.py --endpoint /brake-event --db vehicle_database.json
+
+Payloads cycle over --vehicles synthetic vehicles (V001, V002, ...). Brake events
+must name vehicles the server knows, so they cycle over the ids in --db (the
+same store the server was started with); every event is written to its history.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def db_vehicle_ids(db_file: str):
+    from services.db_manager import open_database
+
+    db = open_database(db_file)
+    try:
+        return db.list_vehicles()
+    finally:
+        db.close()
+
+
+def make_payloads(endpoint: str, n: int, seed: int = 0, vehicle_ids=None):
+    rng = random.Random(seed)
+    payloads = []
+    for i in range(1, n + 1):
+        vid = vehicle_ids[(i - 1) % len(vehicle_ids)] if vehicle_ids else f"V{i:03d}"
+        if endpoint == "/brake-event":
+            payloads.append({"vehicle_id": vid, "brake_sensor_mm": round(rng.uniform(1.5, 8.0), 2), "city": "Pune"})
+            continue
+        payloads.append({
+            "vehicle_id": vid,
+            "engine_temp": rng.randint(150, 260),
+            "brake_health": rng.randint(0, 100),
+            "battery_health": rng.randint(0, 100),
+            "tyre_pressure": rng.randint(20, 45),
+            "mileage": rng.randint(0, 300_000),
+            "year": rng.randint(2012, 2025),
+            "city": "Pune",
+        })
+    return [json.dumps(p).encode("utf-8") for p in payloads]
+
+
+async def _client(host, port, endpoint, bodies, count, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for i in range(count):
+            body = bodies[i % len(bodies)]
+            start = time.perf_counter()
+            writer.write(
+                f"POST {endpoint} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+            )
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in head.split(b"\r\n"):
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":", 1)[1])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+            if not head.startswith(b"HTTP/1.1 200"):
+                errors.append(head.split(b"\r\n", 1)[0].decode("latin-1"))
+    finally:
+        writer.close()
+
+
+async def run_load(host, port, endpoint, connections, requests, vehicles, vehicle_ids=None):
+    bodies = make_payloads(endpoint, vehicles, vehicle_ids=vehicle_ids)
+    latencies, errors = [], []
+    per_client = [requests // connections + (1 if i < requests % connections else 0) for i in range(connections)]
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        _client(host, port, endpoint, bodies[i:] + bodies[:i], n, latencies, errors)
+        for i, n in enumerate(per_client) if n
+    ))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+
+    def pct(q):
+        return round(latencies[min(len(latencies) - 1, int(q / 100 * len(latencies)))] * 1000, 3) if latencies else 0.0
+
+    return {
+        "endpoint": endpoint,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_per_s": round(len(latencies) / elapsed, 1) if elapsed > 0 else 0.0,
+        "latency_ms": {"p50": pct(50), "p95": pct(95), "p99": pct(99), "max": pct(100)},
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--endpoint", default="/score", choices=["/score", "/analyze", "/brake-event"])
+    parser.add_argument("--connections", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=10_000)
+    parser.add_argument("--vehicles", type=int, default=20, help="distinct payloads to cycle through")
+    parser.add_argument("--db", default="vehicle_database.json", help="vehicle store the server uses (for /brake-event ids)")
+    args = parser.parse_args()
+
+    ids = db_vehicle_ids(args.db) if args.endpoint == "/brake-event" else None
+    if ids == []:
+        sys.exit(f"no vehicles in {args.db}")
+    stats = asyncio.run(run_load(args.host, args.port, args.endpoint, args.connections, args.requests, args.vehicles, ids))
+    print(json.dumps(stats, indent=2))
+    sys.exit(1 if stats["errors"] else 0)
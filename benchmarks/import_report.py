@@ -0,0 +1,116 @@
+# benchmarks/import_report.py
+"""
+Cold-start report: how long importing each entry point takes, and what dominates it.
+
+    python benchmarks/import_report.py                          # default modules
+    python benchmarks/import_report.py agents.integrator services.ueba_stream --top 15
+    python benchmarks/import_report.py -o imports.json --compare imports_before.json
+
+Each module is imported in a fresh interpreter under `python -X importtime`,
+several times, keeping the fastest run. The report lists the total import time,
+whether numpy / pandas / streamlit were pulled in, and the heaviest imports by
+self time. --compare prints the change against an earlier report.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MODULES = [
+    "agents.agentic_layer",
+    "agents.integrator",
+    "agents.scheduler_agent",
+    "services.ueba_stream",
+    "services.tts_worker",
+    "run_batch_analysis",
+]
+HEAVY = ("numpy", "pandas", "streamlit", "pyttsx3")
+
+
+def profile_import(module: str, repeat: int = 3):
+    """Fastest of `repeat` cold imports: total microseconds and {package: (self_us, cumulative_us)}."""
+    best = None
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=ROOT, capture_output=True, text=True,
+            env={**os.environ, "PYTHONPATH": ROOT},
+        )
+        if proc.returncode != 0:
+            return {"module": module, "error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "failed"}
+        entries = {}
+        total = 0
+        for line in proc.stderr.splitlines():
+            if not line.startswith("import time:") or "self [us]" in line:
+                continue
+            self_us, cumulative_us, name = line[len("import time:"):].split("|")
+            name = name.rstrip()
+            depth = (len(name) - len(name.lstrip())) // 2
+            name = name.strip()
+            entries[name] = (int(self_us), int(cumulative_us))
+            if depth == 0:
+                total += int(cumulative_us)
+        if best is None or total < best["total_us"]:
+            best = {"module": module, "total_us": total, "entries": entries}
+    return best
+
+
+def summarize(result, top: int):
+    if "error" in result:
+        return result
+    entries = result["entries"]
+    heaviest = sorted(entries.items(), key=lambda kv: kv[1][0], reverse=True)[:top]
+    return {
+        "module": result["module"],
+        "total_ms": round(result["total_us"] / 1000, 1),
+        "modules_loaded": len(entries),
+        "heavy": [h for h in HEAVY if h in entries],
+        "top_self_ms": [{"import": name, "self_ms": round(s / 1000, 1), "cumulative_ms": round(c / 1000, 1)}
+                        for name, (s, c) in heaviest],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=8, help="heaviest imports listed per module")
+    parser.add_argument("-o", "--output", help="write the report as JSON")
+    parser.add_argument("--compare", help="earlier JSON report to compare total times against")
+    args = parser.parse_args(argv)
+
+    report = []
+    for module in args.modules:
+        r = summarize(profile_import(module, args.repeat), args.top)
+        report.append(r)
+        if "error" in r:
+            print(f"{module:<28} failed: {r['error']}")
+            continue
+        print(f"{module:<28} {r['total_ms']:8.1f} ms  {r['modules_loaded']:5d} modules  heavy: {', '.join(r['heavy']) or '-'}")
+        for t in r["top_self_ms"]:
+            print(f"    {t['import']:<50} self {t['self_ms']:7.1f} ms  cumulative {t['cumulative_ms']:7.1f} ms")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"timestamp": datetime.now().isoformat(timespec="seconds"), "results": report}, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            before = {r["module"]: r for r in json.load(f)["results"] if "total_ms" in r}
+        print()
+        for r in report:
+            old = before.get(r["module"])
+            if old is None or "total_ms" not in r:
+                continue
+            print(f"{r['module']:<28} {old['total_ms']:8.1f} ms -> {r['total_ms']:8.1f} ms  "
+                  f"({r['total_ms'] - old['total_ms']:+.1f} ms)  heavy: {', '.join(old['heavy']) or '-'} -> "
+                  f"{', '.join(r['heavy']) or '-'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
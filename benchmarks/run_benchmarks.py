@@ -0,0 +1,311 @@
+# benchmarks/run_benchmarks.py
+"""
+Benchmarks for the hot paths at synthetic fleet sizes from 20 to 1M vehicles.
+
+    python benchmarks/run_benchmarks.py                      # all benchmarks, default sizes
+    python benchmarks/run_benchmarks.py --sizes 20 10000 --only analyze master_orchestrate
+    python benchmarks/run_benchmarks.py -o new.json --compare old.json --tolerance 0.25
+
+Every (benchmark, size) pair is timed over a number of calls, then run once more
+under tracemalloc to record peak Python memory. Results go to a JSON file so runs
+can be compared; --compare exits non-zero when a per-call time regresses by more
+than the tolerance.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from agents.agentic_layer import DataAnalysisAgent, ManufacturingInsightsAgent, UebaMonitor, master_orchestrate  # noqa: E402
+from data.synthetic_data import VEHICLE_DTYPES, SyntheticFleetGenerator  # noqa: E402
+from services.data_cache import DATA_CACHE  # noqa: E402
+from services.db_manager import DatabaseManager  # noqa: E402
+from services import maintenance_store  # noqa: E402
+
+DEFAULT_SIZES = [20, 1_000, 10_000, 100_000, 1_000_000]
+
+
+# ------------------ SYNTHETIC FLEET ------------------ #
+class Fleet:
+    """
+    Vehicles and maintenance log from data.synthetic_data.SyntheticFleetGenerator (a mean
+    of `maint_per_vehicle` records per vehicle), plus one telematics reading per vehicle.
+    """
+
+    def __init__(self, n: int, maint_per_vehicle: int = 2, seed: int = 0):
+        gen = SyntheticFleetGenerator(n, records_per_vehicle=maint_per_vehicle, seed=seed, chunk_size=max(n, 1))
+        # same layout as data.fleet_data.vehicles_df() / maint_df()
+        self.vehicles = gen.vehicle_chunk(0).astype(VEHICLE_DTYPES)
+        self.maintenance = maintenance_store.compact(gen.maintenance_chunk(0))
+        rng = np.random.default_rng([seed, n])
+        self.telematics = pd.DataFrame(
+            {
+                "engine_temp": rng.integers(150, 261, n),
+                "brake_health": rng.integers(0, 101, n),
+                "battery_health": rng.integers(0, 101, n),
+                "tyre_pressure": rng.integers(20, 46, n),
+                "mileage": rng.integers(0, 300_001, n),
+                "year": self.vehicles["year"].values,
+            }
+        )
+
+    def payload(self, i: int):
+        row = self.telematics.iloc[i % len(self.telematics)]
+        vehicle = self.vehicles.iloc[i % len(self.vehicles)]
+        return {
+            **{k: int(v) for k, v in row.items()},
+            "make": vehicle["make"],
+            "model": vehicle["model"],
+            "owner_name": "Owner",
+            "city": vehicle["city"],
+            "vehicle_id": vehicle["id"],
+        }
+
+    def install(self):
+        """Make this fleet the process-wide dataset that master_orchestrate reads."""
+        DATA_CACHE.set_dataset("vehicles", self.vehicles)
+        DATA_CACHE.set_dataset("maintenance", self.maintenance)
+
+
+def write_json_db(path: str, vehicles: pd.DataFrame):
+    data = {
+        vid: {"owner": f"Owner {i}", "phone": "555-0000", "model": model, "status": "Healthy", "history": []}
+        for i, (vid, model) in enumerate(zip(vehicles["id"], vehicles["model"]))
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+# ------------------ BENCHMARKS ------------------ #
+# each returns (fn, calls) where fn(i) performs call i; setup cost is not timed
+def bench_analyze(fleet, ctx):
+    agent = DataAnalysisAgent(UebaMonitor())
+    payloads = [fleet.payload(i) for i in range(min(len(fleet.telematics), 1000))]
+    agent.analyze(payloads[0], fleet.maintenance)  # fits the day's forecast outside the timing
+    return (lambda i: agent.analyze(payloads[i % len(payloads)], fleet.maintenance)), len(payloads)
+
+
+def bench_analyze_fleet(fleet, ctx):
+    agent = DataAnalysisAgent(UebaMonitor())
+    return (lambda i: agent.analyze_fleet(fleet.telematics)), 1
+
+
+def bench_insights_cold(fleet, ctx):
+    agent = ManufacturingInsightsAgent(UebaMonitor())
+    # a shallow copy is not the registered dataset, so every call aggregates the full log
+    unregistered = fleet.maintenance.copy(deep=False)
+    return (lambda i: agent.insights(unregistered)), 3
+
+
+def bench_insights_cached(fleet, ctx):
+    agent = ManufacturingInsightsAgent(UebaMonitor())
+    agent.insights(fleet.maintenance)
+    return (lambda i: agent.insights(fleet.maintenance)), 1000
+
+
+def bench_master_orchestrate(fleet, ctx):
+    payloads = [fleet.payload(i) for i in range(200)]
+    master_orchestrate(payloads[0], use_cache=False)
+    return (lambda i: master_orchestrate(payloads[i % len(payloads)], use_cache=False)), len(payloads)
+
+
+def bench_master_orchestrate_cached(fleet, ctx):
+    # repeated analyses of payloads already seen today
+    payloads = [fleet.payload(i) for i in range(200)]
+    for p in payloads:
+        master_orchestrate(p)
+    return (lambda i: master_orchestrate(payloads[i % len(payloads)])), 10 * len(payloads)
+
+
+def _json_db(fleet, ctx, **kwargs):
+    path = os.path.join(ctx["tmpdir"], f"db_{len(fleet.vehicles)}.json")
+    write_json_db(path, fleet.vehicles)
+    return DatabaseManager(path, **kwargs)
+
+
+def bench_db_save(fleet, ctx):
+    db = _json_db(fleet, ctx)
+    return (lambda i: db.save()), 3
+
+
+def bench_db_update_history(fleet, ctx):
+    db = _json_db(fleet, ctx)
+    ids = fleet.vehicles["id"].values
+    return (lambda i: db.update_vehicle_history(ids[i % len(ids)], "Brake Pad Wear", "Scheduled Service")), 5
+
+
+def bench_db_update_history_journal(fleet, ctx):
+    db = _json_db(fleet, ctx, journal=True, compact_every=10**9)
+    ids = fleet.vehicles["id"].values
+    return (lambda i: db.update_vehicle_history(ids[i % len(ids)], "Brake Pad Wear", "Scheduled Service")), 1000
+
+
+def bench_db_update_history_sqlite(fleet, ctx):
+    from services.sqlite_db import SqliteDatabaseManager
+
+    db = SqliteDatabaseManager(os.path.join(ctx["tmpdir"], f"db_{len(fleet.vehicles)}.db"), seed=False)
+    if not db.list_vehicles():
+        db.import_records(
+            {vid: {"owner": "Owner", "phone": "", "model": "XUV700", "status": "Healthy"} for vid in fleet.vehicles["id"]}
+        )
+    ids = fleet.vehicles["id"].values
+    return (lambda i: db.update_vehicle_history(ids[i % len(ids)], "Brake Pad Wear", "Scheduled Service")), 1000
+
+
+class _AlwaysYes:
+    """Stands in for the interactive phone call so the booking path runs unattended."""
+
+    def make_call(self, owner, issue):
+        return "yes"
+
+
+def bench_process_brake_event(fleet, ctx):
+    from agents.integrator import SimpleOrchestrator
+
+    path = os.path.join(ctx["tmpdir"], f"orch_{len(fleet.vehicles)}.json")
+    write_json_db(path, fleet.vehicles)
+    orch = SimpleOrchestrator(db_file=path)
+    orch.voice = _AlwaysYes()
+    ids = fleet.vehicles["id"].values
+    # alternate worn (books a service) and healthy readings
+    return (lambda i: orch.process_brake_event(ids[i % len(ids)], 2.5 if i % 2 else 6.0, city="Pune")), 10
+
+
+BENCHMARKS = {
+    "analyze": (bench_analyze, False),
+    "analyze_fleet": (bench_analyze_fleet, False),
+    "insights_cold": (bench_insights_cold, False),
+    "insights_cached": (bench_insights_cached, False),
+    "master_orchestrate": (bench_master_orchestrate, False),
+    "master_orchestrate_cached": (bench_master_orchestrate_cached, False),
+    "db_save": (bench_db_save, True),
+    "db_update_history": (bench_db_update_history, True),
+    "db_update_history_journal": (bench_db_update_history_journal, True),
+    "db_update_history_sqlite": (bench_db_update_history_sqlite, True),
+    "process_brake_event": (bench_process_brake_event, True),
+}
+
+
+def run_one(name, setup, fleet, ctx):
+    size = len(fleet.vehicles)
+    try:
+        fn, calls = setup(fleet, ctx)
+    except Exception as e:
+        return {"bench": name, "size": size, "skipped": f"{type(e).__name__}: {e}"}
+
+    start = time.perf_counter()
+    for i in range(calls):
+        fn(i)
+    total = time.perf_counter() - start
+
+    tracemalloc.start()
+    fn(calls)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "bench": name,
+        "size": size,
+        "calls": calls,
+        "total_s": round(total, 6),
+        "per_call_s": total / calls,
+        "peak_mem_bytes": peak,
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def compare(results, baseline_path: str, tolerance: float):
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {(r["bench"], r["size"]): r for r in json.load(f)["results"] if "per_call_s" in r}
+    regressions = []
+    for r in results:
+        old = baseline.get((r["bench"], r["size"]))
+        if old is None or "per_call_s" not in r:
+            continue
+        ratio = r["per_call_s"] / old["per_call_s"] if old["per_call_s"] else float("inf")
+        flag = "REGRESSION" if ratio > 1 + tolerance else ""
+        print(f"{r['bench']:<28} {r['size']:>9} {old['per_call_s']:.6f}s -> {r['per_call_s']:.6f}s  x{ratio:.2f} {flag}")
+        if flag:
+            regressions.append(r)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="run only these benchmarks")
+    parser.add_argument("--db-max", type=int, default=100_000,
+                        help="largest fleet for the file/SQLite benchmarks (JSON snapshots of 1M vehicles are slow)")
+    parser.add_argument("--maint-per-vehicle", type=int, default=2)
+    parser.add_argument("-o", "--output", default="bench_results.json")
+    parser.add_argument("--compare", help="earlier results file to compare per-call times against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown before flagging (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    names = args.only or list(BENCHMARKS)
+    results = []
+    tmpdir = tempfile.mkdtemp(prefix="bench_")
+    try:
+        for size in args.sizes:
+            fleet = Fleet(size, maint_per_vehicle=args.maint_per_vehicle)
+            fleet.install()
+            ctx = {"tmpdir": tmpdir}
+            for name in names:
+                setup, uses_db = BENCHMARKS[name]
+                if uses_db and size > args.db_max:
+                    results.append({"bench": name, "size": size, "skipped": f"size above --db-max {args.db_max}"})
+                    continue
+                r = run_one(name, setup, fleet, ctx)
+                results.append(r)
+                if "skipped" in r:
+                    print(f"{name:<28} {size:>9}  skipped: {r['skipped']}", file=sys.stderr)
+                else:
+                    print(f"{name:<28} {size:>9}  {r['per_call_s'] * 1000:10.3f} ms/call  "
+                          f"peak {r['peak_mem_bytes'] / 2**20:8.1f} MiB", file=sys.stderr)
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"wrote {len(results)} results to {args.output}", file=sys.stderr)
+
+    if args.compare:
+        return 1 if compare(results, args.compare, args.tolerance) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+# data/fleet_data.py
+"""
+Demo fleet and maintenance-log datasets used by the dashboard and the agents.
+
+The builders are deterministic-ish synthetic data; the accessors below cache the
+built frames (and what is derived from them) once per process via DATA_CACHE.
+The maintenance log is kept in the compact layout of services/maintenance_store;
+with MAINT_STORE_DIR set it is memory-mapped from a saved copy instead of built,
+so every process pointed at the same directory shares it.
+"""
+import os
+import random
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from data.synthetic_data import CATALOG, COMPONENTS
+from services.data_cache import DATA_CACHE
+from services import maintenance_store
+from services.demand_forecast import DemandForecaster
+from services.maintenance_history import MaintenanceHistoryIndex
+from services.rca_store import RcaAggregateStore
+
+MAINT_STORE_ENV = "MAINT_STORE_DIR"
+
+# ------------------ SYNTHETIC DATA (expanded to 20 vehicles) ------------------ #
+# id, model (make and segment come from the shared CATALOG), age in years, city, km per day
+DEMO_FLEET = [
+    ("V001", "Xtreme 160R", 1, "Mumbai", 38),
+    ("V002", "Splendor Plus", 3, "Pune", 32),
+    ("V003", "Glamour", 2, "Delhi", 45),
+    ("V004", "Maestro Edge", 4, "Nagpur", 25),
+    ("V005", "XUV700", 1, "Bengaluru", 52),
+    ("V006", "Scorpio N", 5, "Chennai", 40),
+    ("V007", "Thar", 3, "Jaipur", 30),
+    ("V008", "Bolero Neo", 6, "Lucknow", 34),
+    ("V009", "Xpulse 200", 2, "Hyderabad", 48),
+    ("V010", "XUV300", 4, "Indore", 29),
+    # extra vehicles to reach up to 20
+    ("V011", "Destini 125", 2, "Surat", 28),
+    ("V012", "Bolero", 7, "Ranchi", 36),
+    ("V013", "Nexon EV", 1, "Kolkata", 44),
+    ("V014", "Harrier", 3, "Ahmedabad", 31),
+    ("V015", "Swift", 2, "Bengaluru", 38),
+    ("V016", "i20", 1, "Pune", 29),
+    ("V017", "Seltos", 4, "Chennai", 33),
+    ("V018", "CB Shine", 2, "Lucknow", 26),
+    ("V019", "Classic 350", 3, "Jaipur", 22),
+    ("V020", "Marazzo", 5, "Delhi", 27),
+]
+
+
+def build_synthetic_vehicles():
+    base_year = datetime.now().year
+    catalog = {model: (make, segment) for make, model, segment in CATALOG}
+    vehicles = []
+    for vid, model, age, city, km_per_day in DEMO_FLEET:
+        make, segment = catalog[model]
+        vehicles.append({
+            "id": vid, "make": make, "model": model, "year": base_year - age,
+            "city": city, "segment": segment, "avg_km_per_day": km_per_day,
+        })
+    return pd.DataFrame(vehicles)
+
+def build_maintenance_logs():
+    random.seed(42)
+    vehicles = [vid for vid, *_ in DEMO_FLEET]
+    components = list(COMPONENTS)
+
+    rows = []
+    today = datetime.now().date()
+    for _ in range(200):  # more synthetic records for larger dataset
+        comp = random.choice(components)
+        v = random.choice(vehicles)
+        when = today - timedelta(days=random.randint(1, 730))  # broader date range
+        severity = random.randint(1, 5)
+        cost = random.randint(800, 20000)
+        issue, rca_tag, capa_action = COMPONENTS[comp]
+        rows.append(
+            {
+                "vehicle_id": v,
+                "date": when,
+                "component": comp,
+                "issue": issue,
+                "severity": severity,
+                "cost": cost,
+                "rca_tag": rca_tag,
+                "capa_action": capa_action,
+            }
+        )
+    return maintenance_store.compact(pd.DataFrame(rows))
+
+def load_maintenance_logs():
+    """Memory-map the saved log in MAINT_STORE_DIR if there is one, else build the demo log."""
+    directory = os.environ.get(MAINT_STORE_ENV)
+    if directory and os.path.exists(os.path.join(directory, maintenance_store.SCHEMA_FILE)):
+        return maintenance_store.load(directory, mmap=True)
+    return build_maintenance_logs()
+
+# ------------------ SHARED ACCESSORS ------------------ #
+# built once per process and shared by all sessions (see services/data_cache.py)
+def vehicles_df() -> pd.DataFrame:
+    return DATA_CACHE.dataset("vehicles", build_synthetic_vehicles)
+
+def maint_df() -> pd.DataFrame:
+    return DATA_CACHE.dataset("maintenance", load_maintenance_logs)
+
+def rca_store() -> RcaAggregateStore:
+    """Running RCA/CAPA aggregates for the current maintenance log (built once, then updated in place)."""
+    return DATA_CACHE.derived("maintenance", "rca_store", lambda: RcaAggregateStore.from_frame(maint_df()))
+
+def maintenance_history() -> MaintenanceHistoryIndex:
+    """Per-vehicle index over the current maintenance log (built once, then extended in place)."""
+    return DATA_CACHE.derived("maintenance", "history_index", lambda: MaintenanceHistoryIndex.from_frame(maint_df()))
+
+def demand_forecaster() -> DemandForecaster:
+    """30-day workshop demand per hub, fitted from the maintenance log once per day (and per version)."""
+    today = datetime.now().date()
+    maint, vehicles = maint_df(), vehicles_df()  # built first, so the entry is stored under their current version
+    # one entry holding (day, forecaster): a new day replaces yesterday's fit instead of adding a key
+    _, forecaster = DATA_CACHE.derived(
+        "maintenance", "demand_forecast",
+        lambda: (today, DemandForecaster(horizon_days=30).fit(maint, vehicles, today)),
+        valid=lambda entry: entry[0] == today,
+    )
+    return forecaster
+
+def append_maintenance_records(records) -> pd.DataFrame:
+    """Add new maintenance rows, fold them into the RCA aggregates and history index, and invalidate cached insights."""
+    records = list(records)
+    # one append at a time, and no reader in between: two appends reading the same frame
+    # would both count their rows in the aggregates while only one frame is kept
+    with DATA_CACHE.lock:
+        current = maint_df()
+        # build the new frame first: if a record is rejected, the aggregates and index stay untouched
+        updated = maintenance_store.append(current, records)
+        store = rca_store()
+        store.add_many(records)
+        history = maintenance_history()
+        history.add(records, first_row=len(current))
+        DATA_CACHE.set_dataset("maintenance", updated)
+        # carry the updated aggregates and index over to the new version instead of rebuilding them
+        DATA_CACHE.derived("maintenance", "rca_store", lambda: store)
+        DATA_CACHE.derived("maintenance", "history_index", lambda: history)
+    return updated
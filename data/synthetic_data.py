@@ -1,68 +1,127 @@
+# data/synthetic_data.py
+"""
+Synthetic vehicles and maintenance logs, from the 20-vehicle demo up to load-test scale.
+
+CATALOG, CITIES and COMPONENTS are the one source of makes / models, city hubs
+and maintenance findings; data/fleet_data builds the dashboard's fixed demo
+fleet and log from them too.
+
+SyntheticFleetGenerator samples millions of vehicles and tens of millions of
+maintenance records with NumPy, one chunk of vehicles at a time, and writes them
+to Parquet or Arrow (pyarrow) or NPZ files chunk by chunk, so the full dataset is
+never held in memory. Every chunk has its own seed derived from the generator's
+seed, so a given (seed, chunk_size) always produces the same data.
+
+    python -m data.synthetic_data --vehicles 2000000 --records-per-vehicle 10 --out synthetic_fleet --format parquet
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime
+from importlib.util import find_spec
+
+import numpy as np
+import pandas as pd
+
+CATALOG = [
+    # ---- Hero (2W) ----
+    ("Hero", "Splendor Plus", "2W"),
+    ("Hero", "Glamour", "2W"),
+    ("Hero", "Xtreme 160R", "2W"),
+    ("Hero", "Xpulse 200", "2W"),
+    ("Hero", "Maestro Edge", "2W"),
+    ("Hero", "Destini 125", "2W"),
+    # ---- Mahindra (4W) ----
+    ("Mahindra", "XUV700", "4W"),
+    ("Mahindra", "Scorpio N", "4W"),
+    ("Mahindra", "Thar", "4W"),
+    ("Mahindra", "Bolero Neo", "4W"),
+    ("Mahindra", "XUV300", "4W"),
+    ("Mahindra", "Bolero", "4W"),
+    ("Mahindra", "Marazzo", "4W"),
+    # ---- Tata (4W) ----
+    ("Tata", "Harrier", "4W"),
+    ("Tata", "Safari", "4W"),
+    ("Tata", "Nexon EV", "4W"),
+    # ---- Hyundai (4W) ----
+    ("Hyundai", "Creta", "4W"),
+    ("Hyundai", "Venue", "4W"),
+    ("Hyundai", "i20", "4W"),
+    # ---- Kia (4W) ----
+    ("Kia", "Seltos", "4W"),
+    ("Kia", "Sonet", "4W"),
+    # ---- Maruti (4W) ----
+    ("Maruti", "Swift", "4W"),
+    ("Maruti", "Baleno", "4W"),
+    # ---- Honda (4W + 2W) ----
+    ("Honda", "City", "4W"),
+    ("Honda", "CB Shine", "2W"),
+    # ---- Others ----
+    ("Royal Enfield", "Classic 350", "2W"),
+    ("Bajaj", "Pulsar 150", "2W"),
+    ("TVS", "Apache RTR 160", "2W"),
+    ("MG", "ZS EV", "4W"),
+    ("Toyota", "Innova Crysta", "4W"),
+]
+
+CITIES = [
+    "Mumbai", "Pune", "Delhi", "Nagpur", "Bengaluru", "Chennai", "Jaipur",
+    "Lucknow", "Hyderabad", "Indore", "Surat", "Ranchi", "Chandigarh",
+    "Ahmedabad", "Kolkata",
+]
+
+# component -> (issue, rca_tag, capa_action)
+COMPONENTS = {
+    "Brakes": ("Brake pad wear", "City stop-go traffic", "Upgrade pad material; better cooling slots"),
+    "Battery": ("Cranking issue", "Short trips / accessories", "Higher CCA rating; smart alternator profile"),
+    "Engine": ("Overheating", "Low coolant / oil quality", "Improved cooling routing; sensor calibration"),
+    "Tyres": ("Uneven wear", "Improper alignment", "Factory alignment spec update"),
+    "Suspension": ("Noise on bumps", "Bad roads", "Reinforced bushings"),
+}
+
+# what build_synthetic_vehicles returns at any n: plain columns, like data.fleet_data.vehicles_df()
+# (whose fixed demo fleet keeps its own V001..V020 ids)
+VEHICLE_DTYPES = {
+    "id": object, "make": object, "model": object, "year": np.int64,
+    "city": object, "segment": object, "avg_km_per_day": np.int64,
+}
+
+
+def _id_format(n: int) -> str:
+    return f"V%0{max(4, len(str(n)))}d"
+
+
+def vehicle_id(i: int, n: int) -> str:
+    """Id of the i-th of n vehicles (1-based): V0001, V0002, ... widened as n needs."""
+    return _id_format(n) % i
+
+
 def build_synthetic_vehicles(n=20):
     """
-    Build up to 20 synthetic vehicles mixing Hero / Mahindra / Tata / Hyundai / Kia / Maruti / Honda /
+    Build n synthetic vehicles mixing Hero / Mahindra / Tata / Hyundai / Kia / Maruti / Honda /
     TVS / Bajaj / Royal Enfield / Toyota / MG.
     """
 
     base_year = datetime.now().year
 
-    all_vehicles = [
-        # ---- Hero (2W) ----
-        ("Hero", "Splendor Plus", "2W"),
-        ("Hero", "Glamour", "2W"),
-        ("Hero", "Xtreme 160R", "2W"),
-        ("Hero", "Xpulse 200", "2W"),
-
-        # ---- Mahindra (4W) ----
-        ("Mahindra", "XUV700", "4W"),
-        ("Mahindra", "Scorpio N", "4W"),
-        ("Mahindra", "Thar", "4W"),
-        ("Mahindra", "Bolero Neo", "4W"),
-
-        # ---- Tata (4W) ----
-        ("Tata", "Harrier", "4W"),
-        ("Tata", "Safari", "4W"),
-
-        # ---- Hyundai (4W) ----
-        ("Hyundai", "Creta", "4W"),
-        ("Hyundai", "Venue", "4W"),
-
-        # ---- Kia (4W) ----
-        ("Kia", "Seltos", "4W"),
-        ("Kia", "Sonet", "4W"),
-
-        # ---- Maruti (4W) ----
-        ("Maruti", "Swift", "4W"),
-        ("Maruti", "Baleno", "4W"),
-
-        # ---- Honda (4W + 2W) ----
-        ("Honda", "City", "4W"),
-        ("Honda", "CB Shine", "2W"),
-
-        # ---- Others ----
-        ("Royal Enfield", "Classic 350", "2W"),
-        ("Bajaj", "Pulsar 150", "2W"),
-        ("TVS", "Apache RTR 160", "2W"),
-        ("MG", "ZS EV", "4W"),
-        ("Toyota", "Innova Crysta", "4W")
-    ]
-
-    # Ensure n does not exceed 20
-    n = min(n, len(all_vehicles))
+    all_vehicles = CATALOG
+
+    # beyond the catalogue size, use the vectorized generator below
+    if n > len(all_vehicles):
+        return SyntheticFleetGenerator(n, chunk_size=n).vehicle_chunk(0).astype(VEHICLE_DTYPES)
 
     # Random selection of vehicle list
     selected = random.sample(all_vehicles, n)
 
-    cities = [
-        "Mumbai", "Pune", "Delhi", "Nagpur", "Bengaluru", "Chennai", "Jaipur",
-        "Lucknow", "Hyderabad", "Indore", "Surat", "Ranchi", "Chandigarh",
-        "Ahmedabad", "Kolkata"
-    ]
+    cities = CITIES
 
     vehicles = []
     for i, (make, model, seg) in enumerate(selected, start=1):
         vehicles.append({
-            "id": f"V{str(i).zfill(4)}",
+            "id": vehicle_id(i, n),
             "make": make,
             "model": model,
             "year": base_year - random.randint(0, 10),
@@ -71,4 +130,245 @@ def build_synthetic_vehicles(n=20):
             "avg_km_per_day": random.randint(20, 100)
         })
 
-    return pd.DataFrame(vehicles)
+    return pd.DataFrame(vehicles).astype(VEHICLE_DTYPES)
+
+
+# ------------------ LOAD-TEST SCALE ------------------ #
+class SyntheticFleetGenerator:
+    """
+    Vehicles in chunks of `chunk_size`, and for each vehicle chunk its maintenance
+    records: a Poisson number per vehicle (mean `records_per_vehicle`), sorted by
+    vehicle and date, over the last `history_days` days.
+    """
+
+    def __init__(self, n_vehicles: int, records_per_vehicle: float = 10.0, seed: int = 42,
+                 chunk_size: int = 250_000, history_days: int = 730, today=None):
+        self.n_vehicles = n_vehicles
+        self.records_per_vehicle = records_per_vehicle
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.history_days = history_days
+        self.today = np.datetime64(today or datetime.now().date(), "D")
+        self.base_year = datetime.now().year
+        self.n_chunks = (n_vehicles + chunk_size - 1) // chunk_size
+        # one independent stream per chunk: the same chunk comes out the same however it is consumed
+        self._seeds = np.random.SeedSequence(seed).spawn(self.n_chunks)
+
+        self.makes = pd.Index(sorted({m for m, _, _ in CATALOG}))
+        self.models = pd.Index([model for _, model, _ in CATALOG])
+        self._catalog_make = self.makes.get_indexer([m for m, _, _ in CATALOG])
+        self._catalog_seg = np.array([seg == "4W" for _, _, seg in CATALOG])
+        self.components = list(COMPONENTS)
+
+    def _ids(self, start: int, stop: int) -> list:
+        fmt = _id_format(self.n_vehicles)
+        return [fmt % i for i in range(start + 1, stop + 1)]
+
+    def _vehicle_arrays(self, chunk: int, rng):
+        start = chunk * self.chunk_size
+        stop = min(self.n_vehicles, start + self.chunk_size)
+        n = stop - start
+        model = rng.integers(0, len(CATALOG), n)
+        return start, stop, {
+            "model_code": model,
+            "year": (self.base_year - rng.integers(0, 11, n)).astype(np.int16),
+            "city_code": rng.integers(0, len(CITIES), n),
+            "avg_km_per_day": rng.integers(20, 101, n).astype(np.int16),
+        }
+
+    def vehicle_chunk(self, chunk: int) -> pd.DataFrame:
+        rng = np.random.default_rng(self._seeds[chunk])
+        start, stop, a = self._vehicle_arrays(chunk, rng)
+        model = a["model_code"]
+        return pd.DataFrame({
+            "id": self._ids(start, stop),
+            "make": pd.Categorical.from_codes(self._catalog_make[model], categories=self.makes),
+            "model": pd.Categorical.from_codes(model, categories=self.models),
+            "year": a["year"],
+            "city": pd.Categorical.from_codes(a["city_code"], categories=CITIES),
+            "segment": pd.Categorical.from_codes(self._catalog_seg[model].astype(np.int8), categories=["2W", "4W"]),
+            "avg_km_per_day": a["avg_km_per_day"],
+        })
+
+    def maintenance_chunk(self, chunk: int) -> pd.DataFrame:
+        rng = np.random.default_rng(self._seeds[chunk])
+        start, stop, _ = self._vehicle_arrays(chunk, rng)  # same draws as vehicle_chunk, then the records
+        n = stop - start
+        counts = rng.poisson(self.records_per_vehicle, n)
+        total = int(counts.sum())
+        vehicle = np.repeat(np.arange(n, dtype=np.int32), counts)
+        age_days = rng.integers(1, self.history_days + 1, total)
+        # newest last within each vehicle
+        order = np.lexsort((-age_days, vehicle))
+        vehicle, age_days = vehicle[order], age_days[order]
+        comp = rng.integers(0, len(self.components), total).astype(np.int8)
+        lookup = lambda i: [COMPONENTS[c][i] for c in self.components]  # noqa: E731
+        return pd.DataFrame({
+            "vehicle_id": pd.Categorical.from_codes(vehicle, categories=self._ids(start, stop)),
+            "date": self.today - age_days.astype("timedelta64[D]"),
+            "component": pd.Categorical.from_codes(comp, categories=self.components),
+            "issue": pd.Categorical.from_codes(comp, categories=lookup(0)),
+            "severity": rng.integers(1, 6, total).astype(np.int8),
+            "cost": rng.integers(800, 20001, total).astype(np.int32),
+            "rca_tag": pd.Categorical.from_codes(comp, categories=lookup(1)),
+            "capa_action": pd.Categorical.from_codes(comp, categories=lookup(2)),
+        })
+
+    def iter_vehicle_chunks(self):
+        for chunk in range(self.n_chunks):
+            yield self.vehicle_chunk(chunk)
+
+    def iter_maintenance_chunks(self):
+        for chunk in range(self.n_chunks):
+            yield self.maintenance_chunk(chunk)
+
+
+# ------------------ CHUNKED WRITERS ------------------ #
+def _have_pyarrow() -> bool:
+    return find_spec("pyarrow") is not None
+
+
+class _ChunkWriter:
+    """Appends DataFrame chunks to <out_dir>/<name>.parquet / .arrow, or to <name>/part-NNNNN.npz."""
+
+    def __init__(self, out_dir: str, name: str, fmt: str):
+        self.fmt = fmt
+        self.rows = 0
+        self._writer = None
+        self._schema = None
+        if fmt == "npz":
+            self.path = os.path.join(out_dir, name)
+            os.makedirs(self.path, exist_ok=True)
+            self._part = 0
+        else:
+            self.path = os.path.join(out_dir, f"{name}.{fmt}")
+
+    def write(self, df: pd.DataFrame):
+        self.rows += len(df)
+        if self.fmt == "npz":
+            arrays = {}
+            for col in df.columns:
+                s = df[col]
+                if isinstance(s.dtype, pd.CategoricalDtype):
+                    arrays[f"{col}.codes"] = s.cat.codes.to_numpy()
+                    arrays[f"{col}.categories"] = np.asarray(s.cat.categories, dtype=str)
+                elif s.dtype == object or isinstance(s.dtype, pd.StringDtype):  # pandas 3 infers str columns
+                    arrays[col] = s.to_numpy(dtype=str)
+                else:
+                    arrays[col] = s.to_numpy()
+            np.savez(os.path.join(self.path, f"part-{self._part:05d}.npz"), **arrays)
+            self._part += 1
+            return
+
+        import pyarrow as pa
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if self._writer is None:
+            fields = []
+            for f in table.schema:
+                if pa.types.is_dictionary(f.type):
+                    # the IPC file format cannot replace a dictionary between batches, and the
+                    # vehicle-id categories differ per chunk: store them as plain values there
+                    f = f.with_type(f.type.value_type if self.fmt == "arrow"
+                                    else pa.dictionary(pa.int32(), f.type.value_type))
+                fields.append(f)
+            self._schema = pa.schema(fields, metadata=table.schema.metadata)
+            if self.fmt == "parquet":
+                import pyarrow.parquet as pq
+
+                self._writer = pq.ParquetWriter(self.path, self._schema, compression="zstd")
+            else:
+                import pyarrow.ipc as ipc
+
+                self._writer = ipc.new_file(self.path, self._schema)
+        # chunks differ in dictionary index width; write them all with the file's schema
+        table = table.cast(self._schema)
+        self._writer.write_table(table)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def write_dataset(gen: SyntheticFleetGenerator, out_dir: str, fmt: str = "auto", log=None):
+    """Write vehicles and maintenance records chunk by chunk; returns the manifest (also saved as manifest.json)."""
+    if fmt == "auto":
+        fmt = "parquet" if _have_pyarrow() else "npz"
+    if fmt in ("parquet", "arrow") and not _have_pyarrow():
+        raise RuntimeError(f"{fmt} output needs pyarrow; use --format npz")
+    os.makedirs(out_dir, exist_ok=True)
+
+    start = time.perf_counter()
+    vehicles = _ChunkWriter(out_dir, "vehicles", fmt)
+    maintenance = _ChunkWriter(out_dir, "maintenance", fmt)
+    try:
+        for chunk in range(gen.n_chunks):
+            vehicles.write(gen.vehicle_chunk(chunk))
+            maintenance.write(gen.maintenance_chunk(chunk))
+            if log:
+                log(f"chunk {chunk + 1}/{gen.n_chunks}: {vehicles.rows:,} vehicles, "
+                    f"{maintenance.rows:,} records, {time.perf_counter() - start:.1f}s")
+    finally:
+        vehicles.close()
+        maintenance.close()
+
+    manifest = {
+        "format": fmt,
+        "seed": gen.seed,
+        "chunk_size": gen.chunk_size,
+        "today": str(gen.today),
+        "vehicles": {"rows": vehicles.rows, "path": os.path.relpath(vehicles.path, out_dir)},
+        "maintenance": {"rows": maintenance.rows, "path": os.path.relpath(maintenance.path, out_dir)},
+        "elapsed_s": round(time.perf_counter() - start, 3),
+    }
+    with open(os.path.join(out_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def iter_dataset_chunks(out_dir: str, name: str):
+    """Read a written table ("vehicles" or "maintenance") back one chunk at a time."""
+    with open(os.path.join(out_dir, "manifest.json"), "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    path = os.path.join(out_dir, manifest[name]["path"])
+    fmt = manifest["format"]
+    if fmt == "npz":
+        for part in sorted(os.listdir(path)):
+            with np.load(os.path.join(path, part)) as z:
+                cols = {}
+                for key in z.files:
+                    col, _, kind = key.partition(".")
+                    if kind == "categories":
+                        continue
+                    if kind == "codes":
+                        cols[col] = pd.Categorical.from_codes(z[key], categories=z[f"{col}.categories"])
+                    else:
+                        cols[col] = z[key]
+                yield pd.DataFrame(cols)
+    elif fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        pf = pq.ParquetFile(path)
+        for i in range(pf.num_row_groups):
+            yield pf.read_row_group(i).to_pandas()
+    else:
+        import pyarrow.ipc as ipc
+
+        with ipc.open_file(path) as reader:
+            for i in range(reader.num_record_batches):
+                yield reader.get_batch(i).to_pandas()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic fleet and maintenance log for load tests.")
+    parser.add_argument("--vehicles", type=int, default=1_000_000)
+    parser.add_argument("--records-per-vehicle", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-size", type=int, default=250_000, help="vehicles per chunk")
+    parser.add_argument("--out", default="synthetic_fleet")
+    parser.add_argument("--format", choices=["auto", "parquet", "arrow", "npz"], default="auto")
+    args = parser.parse_args()
+
+    gen = SyntheticFleetGenerator(args.vehicles, args.records_per_vehicle, args.seed, args.chunk_size)
+    manifest = write_dataset(gen, args.out, args.format, log=lambda msg: print(msg, file=sys.stderr))
+    print(json.dumps(manifest, indent=2))
@@ -0,0 +1,408 @@
+# run_api_server.py
+"""
+Headless JSON API over the agents, for gateways and other services.
+
+    python run_api_server.py --port 8080 --db vehicle_database.json
+
+    POST /analyze       one telematics payload -> master_orchestrate result
+    POST /score         one vehicle's telematics -> risk score (micro-batched),
+                        or {"vehicles": [...]} -> one score per vehicle
+    POST /brake-event   {"vehicle_id", "brake_sensor_mm", "city"} -> brake flow
+    GET  /health, /stats
+
+A single asyncio loop speaks HTTP/1.1 with keep-alive and never runs agent code
+itself. Single-vehicle score requests that arrive within --batch-delay-ms of each
+other are scored together with DataAnalysisAgent.analyze_fleet on a worker thread
+(up to --batch-size per batch); /analyze and /brake-event run on their own thread
+pools. master_orchestrate must not run on the agent DAG's shared pool: it submits
+its nodes there and would wait on itself.
+"""
+import argparse
+import asyncio
+import json
+import math
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from http import HTTPStatus
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from run_batch_analysis import PAYLOAD_DEFAULTS, REQUIRED_KEYS
+
+MAX_HEADER_BYTES = 64 * 1024
+MAX_BODY_BYTES = 8 * 1024 * 1024
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _json_safe(obj):
+    """NaN / inf are not JSON: send them as null."""
+    if isinstance(obj, float):  # also numpy float64
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {k: _json_safe(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_json_safe(v) for v in obj]
+    return obj
+
+
+def _json_default(obj):
+    if isinstance(obj, (date, datetime)):
+        return obj.isoformat()
+    if hasattr(obj, "to_dict"):  # DataFrame
+        return _json_safe(obj.to_dict(orient="records"))
+    if hasattr(obj, "item"):  # numpy scalar
+        return _json_safe(obj.item())
+    raise TypeError(f"not JSON serializable: {type(obj).__name__}")
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def _check_telematics(payload) -> Dict[str, Any]:
+    if not isinstance(payload, dict):
+        raise HttpError(400, "payload is not a JSON object")
+    missing = [k for k in REQUIRED_KEYS if k not in payload]
+    if missing:
+        raise HttpError(400, f"missing keys: {', '.join(missing)}")
+    # checked here, not in the batch: one bad row must not fail the requests scored with it
+    invalid = [k for k in REQUIRED_KEYS if not _is_number(payload[k])]
+    if invalid:
+        raise HttpError(400, f"not finite numbers: {', '.join(invalid)}")
+    return payload
+
+
+# ------------------ MICRO-BATCHING ------------------ #
+class ScoreBatcher:
+    """
+    Collects single-vehicle score requests on the event loop and scores them in
+    batches on `executor`: a batch goes out when it reaches max_batch or max_delay_s
+    after its first request, whichever comes first.
+    """
+
+    def __init__(self, agent, executor: ThreadPoolExecutor, max_batch: int = 512, max_delay_s: float = 0.002):
+        self.agent = agent
+        self.executor = executor
+        self.max_batch = max_batch
+        self.max_delay_s = max_delay_s
+        self._pending: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.batches = 0
+        self.scored = 0
+        self.largest_batch = 0
+        self.fallbacks = 0
+
+    async def score(self, telematics: Dict[str, Any]) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((telematics, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay_s, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        self.batches += 1
+        self.scored += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+        done = asyncio.get_running_loop().run_in_executor(self.executor, self.score_each, [row for row, _ in batch])
+
+        def resolve(task):
+            if task.cancelled():  # shutdown: nobody will score these rows
+                for _, future in batch:
+                    future.cancel()
+                return
+            error = task.exception()
+            results = None if error else task.result()
+            for i, (_, future) in enumerate(batch):
+                if future.done():  # the client went away
+                    continue
+                outcome = error or results[i]
+                if isinstance(outcome, Exception):
+                    future.set_exception(outcome)
+                else:
+                    future.set_result(outcome)
+
+        done.add_done_callback(resolve)
+
+    def score_each(self, rows: List[Dict[str, Any]]) -> List[Any]:
+        """
+        score_rows() for a micro-batch of unrelated requests. If the batch fails, its rows
+        are scored one at a time, so only the offending request gets the exception.
+        """
+        try:
+            return self.score_rows(rows)
+        except Exception:
+            if len(rows) == 1:
+                raise
+        self.fallbacks += 1
+        results: List[Any] = []
+        for row in rows:
+            try:
+                results.append(self.score_rows([row])[0])
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def score_rows(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Score telematics dicts with one analyze_fleet call (runs on a worker thread)."""
+        import pandas as pd
+
+        columns = {c: [row[c] for row in rows] for c in self.agent.TELEMATICS_COLUMNS}
+        columns["vehicle_id"] = [row.get("vehicle_id") for row in rows]
+        scores = self.agent.analyze_fleet(pd.DataFrame(columns))
+        return [
+            {"vehicle_id": vid, "risk_score": float(score), "risk_band": str(band), "likely_components": list(components)}
+            for vid, score, band, components in zip(
+                columns["vehicle_id"], scores["risk_score"], scores["risk_band"], scores["likely_components"]
+            )
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "scored": self.scored,
+            "mean_batch": round(self.scored / self.batches, 2) if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+            "fallbacks": self.fallbacks,
+            "pending": len(self._pending),
+        }
+
+
+# ------------------ SERVICE ------------------ #
+class ApiServer:
+    def __init__(self, db_file: str = "vehicle_database.json", orchestrate_threads: int = 4, score_threads: int = 1,
+                 brake_threads: int = 2, max_batch: int = 512, max_delay_s: float = 0.002,
+                 owner_response: str = "no", tts: str = "null"):
+        from agents.agentic_layer import DataAnalysisAgent, UebaMonitor
+        from agents.integrator import SimpleOrchestrator
+        from agents.voice_agent import VoiceAgentServer, VoiceAI_Agent
+        from data.fleet_data import maint_df, vehicles_df
+
+        # build the shared datasets before the first request instead of inside it
+        vehicles_df()
+        maint_df()
+
+        # dedicated pools: the agent DAG's shared pool is for the DAG's own nodes
+        self.orchestrate_pool = ThreadPoolExecutor(orchestrate_threads, thread_name_prefix="api-orchestrate")
+        self.score_pool = ThreadPoolExecutor(score_threads, thread_name_prefix="api-score")
+        self.brake_pool = ThreadPoolExecutor(brake_threads, thread_name_prefix="api-brake")
+
+        self.batcher = ScoreBatcher(DataAnalysisAgent(UebaMonitor()), self.score_pool, max_batch, max_delay_s)
+        self.brakes = SimpleOrchestrator(db_file)
+        # nobody is on the console: the owner's answer is fixed, speech goes to the chosen backend
+        self.brakes.voice = VoiceAI_Agent(VoiceAgentServer(backend=tts), auto_response=owner_response)
+
+        self.routes = {
+            ("GET", "/health"): self.health,
+            ("GET", "/stats"): self.stats,
+            ("POST", "/analyze"): self.analyze,
+            ("POST", "/score"): self.score,
+            ("POST", "/brake-event"): self.brake_event,
+        }
+        self.started = time.time()
+        self.requests = 0
+        self.errors = 0
+
+    # ------------------ handlers ------------------ #
+    async def health(self, body, query):
+        return {"status": "ok", "uptime_s": round(time.time() - self.started, 1)}
+
+    async def stats(self, body, query):
+        from services.result_cache import ORCHESTRATION_CACHE
+
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "score_batches": self.batcher.stats(),
+            "orchestration_cache": ORCHESTRATION_CACHE.stats(),
+        }
+
+    async def analyze(self, body, query):
+        payload = _check_telematics(body)
+        for key, value in PAYLOAD_DEFAULTS.items():
+            payload.setdefault(key, value)
+        include_forecast = query.get("forecast", ["0"])[0] in ("1", "true", "yes")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.orchestrate_pool, self._orchestrate, payload, include_forecast)
+
+    @staticmethod
+    def _orchestrate(payload, include_forecast: bool):
+        from agents.agentic_layer import master_orchestrate
+
+        res = master_orchestrate(payload)
+        analysis = dict(res["analysis"])  # the result may be the cached one: copy before trimming
+        if not include_forecast:
+            analysis.pop("forecast", None)
+        return {
+            "vehicle_id": payload.get("vehicle_id"),
+            "analysis": analysis,
+            "diagnosis": res["diagnosis"],
+            "schedule": res["schedule"],
+            "voice_script": res["voice_script"],
+            "feedback_plan": res["feedback_plan"],
+            "manufacturing": res["manufacturing"],
+            "ueba_anomalies": len(res["ueba"]["anomalies"]),
+        }
+
+    async def score(self, body, query):
+        if isinstance(body, dict) and "vehicles" in body:
+            vehicles = body["vehicles"]
+            if not isinstance(vehicles, list):
+                raise HttpError(400, "vehicles must be a list")
+            rows = [_check_telematics(v) for v in vehicles]
+            if not rows:
+                return {"results": []}
+            # already a batch: score it as one
+            loop = asyncio.get_running_loop()
+            return {"results": await loop.run_in_executor(self.score_pool, self.batcher.score_rows, rows)}
+        return await self.batcher.score(_check_telematics(body))
+
+    async def brake_event(self, body, query):
+        if not isinstance(body, dict) or "vehicle_id" not in body or "brake_sensor_mm" not in body:
+            raise HttpError(400, "expected vehicle_id and brake_sensor_mm")
+        if not _is_number(body["brake_sensor_mm"]):
+            raise HttpError(400, "brake_sensor_mm must be a finite number")
+        mm = float(body["brake_sensor_mm"])
+        loop = asyncio.get_running_loop()
+        flow = await loop.run_in_executor(
+            self.brake_pool, self.brakes.process_brake_event, body["vehicle_id"], mm, body.get("city", "Unknown")
+        )
+        if "error" in flow:  # the only failure process_brake_event reports is an unknown vehicle
+            raise HttpError(404, f"{flow['error']}: {body['vehicle_id']}")
+        return flow
+
+    # ------------------ HTTP ------------------ #
+    async def dispatch(self, method: str, target: str, raw: bytes) -> Tuple[int, Any]:
+        url = urlsplit(target)
+        handler = self.routes.get((method, url.path))
+        if handler is None:
+            if any(path == url.path for _, path in self.routes):
+                raise HttpError(405, f"{method} not allowed on {url.path}")
+            raise HttpError(404, f"no route for {url.path}")
+        body = None
+        if raw:
+            try:
+                body = json.loads(raw)
+            except ValueError:
+                raise HttpError(400, "body is not valid JSON")
+        return 200, await handler(body, parse_qs(url.query))
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await self._respond(writer, 431, {"error": "request headers too large"}, keep_alive=False)
+                    break
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = lines[0].split(" ", 2)
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "malformed request line"}, keep_alive=False)
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(":")
+                    if name:
+                        headers[name.strip().lower()] = value.strip()
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                try:
+                    length = int(headers.get("content-length", "0"))
+                except ValueError:
+                    length = -1
+                if length < 0 or length > MAX_BODY_BYTES:
+                    await self._respond(writer, 413 if length > 0 else 400, {"error": "bad content length"}, keep_alive=False)
+                    break
+                try:
+                    raw = await reader.readexactly(length) if length else b""
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+
+                self.requests += 1
+                try:
+                    status, result = await self.dispatch(method, target, raw)
+                except HttpError as e:
+                    status, result = e.status, {"error": str(e)}
+                except Exception as e:
+                    status, result = 500, {"error": f"{type(e).__name__}: {e}"}
+                if status >= 400:
+                    self.errors += 1
+                await self._respond(writer, status, result, keep_alive)
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, status: int, result, keep_alive: bool):
+        try:
+            text = json.dumps(result, ensure_ascii=False, default=_json_default, allow_nan=False)
+        except ValueError:  # a NaN somewhere in the result
+            text = json.dumps(_json_safe(result), ensure_ascii=False, default=_json_default, allow_nan=False)
+        body = text.encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+    async def serve(self, host: str, port: int, ready: Optional[asyncio.Event] = None):
+        server = await asyncio.start_server(self.handle_connection, host, port, limit=MAX_HEADER_BYTES, backlog=1024)
+        addr = server.sockets[0].getsockname()
+        print(f"listening on http://{addr[0]}:{addr[1]}", file=sys.stderr)
+        if ready is not None:
+            ready.set()
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        for pool in (self.orchestrate_pool, self.score_pool, self.brake_pool):
+            pool.shutdown(wait=False)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="JSON HTTP API for vehicle analysis, fleet scoring and brake events.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--db", default="vehicle_database.json", help="vehicle store used by /brake-event")
+    parser.add_argument("--orchestrate-threads", type=int, default=4)
+    parser.add_argument("--score-threads", type=int, default=1)
+    parser.add_argument("--brake-threads", type=int, default=2)
+    parser.add_argument("--batch-size", type=int, default=512, help="most score requests scored together")
+    parser.add_argument("--batch-delay-ms", type=float, default=2.0, help="longest a score request waits for others")
+    parser.add_argument("--owner-response", default="no", help="answer assumed for the owner call on a worn-brake event")
+    parser.add_argument("--tts", default="null", choices=["null", "file", "auto", "cached", "pyttsx3"])
+    args = parser.parse_args()
+
+    api = ApiServer(args.db, args.orchestrate_threads, args.score_threads, args.brake_threads,
+                    args.batch_size, args.batch_delay_ms / 1000, args.owner_response, args.tts)
+    try:
+        asyncio.run(api.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        api.close()
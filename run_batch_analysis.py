@@ -0,0 +1,179 @@
+# run_batch_analysis.py
+"""
+Headless bulk analysis: stream telematics payloads from a JSONL file through
+master_orchestrate on a process pool and write one JSON result per line.
+
+    python run_batch_analysis.py fleet_payloads.jsonl -o results.jsonl --workers 8
+
+Input lines are parsed in the workers and only a bounded window of chunks is in
+flight, so memory stays flat however large the input is. Output keeps input
+order. Throughput and latency percentiles are printed to stderr at the end.
+With --maint-store the maintenance log is saved there once (if missing) and
+every worker memory-maps it instead of building its own copy.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from typing import Optional
+
+REQUIRED_KEYS = ("engine_temp", "brake_health", "battery_health", "tyre_pressure", "mileage", "year")
+PAYLOAD_DEFAULTS = {"make": "Unknown", "model": "Unknown", "owner_name": "Owner", "city": "Unknown"}
+
+_include_forecast = False
+
+
+def _init_worker(include_forecast: bool, maint_store: Optional[str] = None):
+    global _include_forecast
+    _include_forecast = include_forecast
+    if maint_store:
+        from data.fleet_data import MAINT_STORE_ENV
+        os.environ[MAINT_STORE_ENV] = maint_store
+    # build the shared datasets once per worker instead of on the first payload
+    from data.fleet_data import maint_df, vehicles_df
+    vehicles_df()
+    maint_df()
+
+
+def _json_default(obj):
+    if isinstance(obj, (date, datetime)):
+        return obj.isoformat()
+    if hasattr(obj, "to_dict"):  # DataFrame
+        return obj.to_dict(orient="records")
+    if hasattr(obj, "item"):  # numpy scalar
+        return obj.item()
+    raise TypeError(f"not JSON serializable: {type(obj).__name__}")
+
+
+def _analyze_line(line_no: int, raw: str):
+    from agents.agentic_layer import master_orchestrate
+
+    start = time.perf_counter()
+    try:
+        payload = json.loads(raw)
+        if not isinstance(payload, dict):
+            raise ValueError("payload is not a JSON object")
+        missing = [k for k in REQUIRED_KEYS if k not in payload]
+        if missing:
+            raise ValueError(f"missing keys: {', '.join(missing)}")
+        for key, value in PAYLOAD_DEFAULTS.items():
+            payload.setdefault(key, value)
+        res = master_orchestrate(payload, manufacturing=False)
+        analysis = dict(res["analysis"])
+        if not _include_forecast:
+            analysis.pop("forecast", None)
+        out = {
+            "line": line_no,
+            "vehicle_id": payload.get("vehicle_id"),
+            "analysis": analysis,
+            "diagnosis": res["diagnosis"],
+            "schedule": res["schedule"],
+            "voice_script": res["voice_script"],
+            "feedback_plan": res["feedback_plan"],
+            "ueba_anomalies": len(res["ueba"]["anomalies"]),
+        }
+    except Exception as e:
+        out = {"line": line_no, "error": f"{type(e).__name__}: {e}"}
+    latency = time.perf_counter() - start
+    out["latency_ms"] = round(latency * 1000, 3)
+    return latency, "error" in out, json.dumps(out, ensure_ascii=False, default=_json_default)
+
+
+def _analyze_chunk(chunk):
+    return [_analyze_line(line_no, raw) for line_no, raw in chunk]
+
+
+def _read_chunks(fh, chunk_size: int):
+    chunk = []
+    for line_no, raw in enumerate(fh, start=1):
+        if not raw.strip():
+            continue
+        chunk.append((line_no, raw))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _percentile(sorted_values, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(q / 100 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def run_batch(input_path: str, output_path: str, workers: int, chunk_size: int = 64,
+              max_in_flight: int = 0, include_forecast: bool = False, maint_store: Optional[str] = None):
+    max_in_flight = max_in_flight or workers * 2
+    if maint_store:
+        from data.fleet_data import maint_df
+        from services import maintenance_store
+
+        if not os.path.exists(os.path.join(maint_store, maintenance_store.SCHEMA_FILE)):
+            maintenance_store.save(maint_df(), maint_store)
+    latencies = array("d")
+    errors = 0
+    start = time.perf_counter()
+
+    src = sys.stdin if input_path == "-" else open(input_path, "r", encoding="utf-8")
+    dst = sys.stdout if output_path == "-" else open(output_path, "w", encoding="utf-8")
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(include_forecast, maint_store)) as pool:
+            in_flight = deque()
+
+            def drain_oldest():
+                nonlocal errors
+                for latency, failed, line in in_flight.popleft().result():
+                    latencies.append(latency)
+                    errors += failed
+                    dst.write(line + "\n")
+
+            for chunk in _read_chunks(src, chunk_size):
+                in_flight.append(pool.submit(_analyze_chunk, chunk))
+                if len(in_flight) >= max_in_flight:
+                    drain_oldest()
+            while in_flight:
+                drain_oldest()
+    finally:
+        if src is not sys.stdin:
+            src.close()
+        if dst is not sys.stdout:
+            dst.close()
+
+    elapsed = time.perf_counter() - start
+    ordered = sorted(latencies)
+    return {
+        "processed": len(ordered),
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_per_s": round(len(ordered) / elapsed, 1) if elapsed > 0 else 0.0,
+        "latency_ms": {
+            "p50": round(_percentile(ordered, 50) * 1000, 3),
+            "p95": round(_percentile(ordered, 95) * 1000, 3),
+            "p99": round(_percentile(ordered, 99) * 1000, 3),
+            "max": round(ordered[-1] * 1000, 3) if ordered else 0.0,
+        },
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk vehicle analysis over a JSONL file of telematics payloads.")
+    parser.add_argument("input", help="JSONL file with one payload per line ('-' for stdin)")
+    parser.add_argument("-o", "--output", default="batch_results.jsonl", help="JSONL results file ('-' for stdout)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=64, help="payloads per task sent to a worker")
+    parser.add_argument("--max-in-flight", type=int, default=0, help="chunks queued at once (default 2 x workers)")
+    parser.add_argument("--include-forecast", action="store_true", help="include the 30-day fleet forecast per result")
+    parser.add_argument("--maint-store", help="directory of a saved maintenance log to memory-map in every worker")
+    args = parser.parse_args()
+
+    stats = run_batch(args.input, args.output, args.workers, args.chunk_size, args.max_in_flight,
+                      args.include_forecast, args.maint_store)
+    print(json.dumps(stats, indent=2), file=sys.stderr)
@@ -0,0 +1,103 @@
+# services/data_cache.py
+"""
+Process-wide cache for the demo datasets and anything derived from them.
+
+Streamlit re-executes app.py on every widget click, so module-level state in the
+script is rebuilt each time. Modules imported from here live in sys.modules and are
+shared by every session in the server process, which makes this the place to keep
+VEHICLES_DF / MAINT_DF and derived results such as the manufacturing insights.
+
+Each dataset carries a version number. Derived entries are stored against the
+version they were computed from and are dropped when the dataset is replaced or
+invalidated, e.g. after new maintenance records arrive.
+"""
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class DataCache:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._datasets: Dict[str, Any] = {}
+        self._versions: Dict[str, int] = {}
+        self._derived: Dict[Tuple[str, Hashable], Tuple[int, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def dataset(self, name: str, builder: Callable[[], Any]):
+        """Return the cached dataset `name`, building it once with `builder()` if missing."""
+        with self._lock:
+            if name in self._datasets:
+                self.hits += 1
+                return self._datasets[name]
+            self.misses += 1
+            value = builder()
+            self._datasets[name] = value
+            self._versions[name] = self._versions.get(name, 0) + 1
+            return value
+
+    def set_dataset(self, name: str, value):
+        """Replace a dataset (e.g. after appending maintenance records) and drop its derived entries."""
+        with self._lock:
+            self._datasets[name] = value
+            self._versions[name] = self._versions.get(name, 0) + 1
+            self._drop_derived(name)
+
+    def invalidate(self, name: str):
+        """Forget a dataset and everything derived from it; the next dataset() call rebuilds it."""
+        with self._lock:
+            self._datasets.pop(name, None)
+            self._versions[name] = self._versions.get(name, 0) + 1
+            self._drop_derived(name)
+
+    @property
+    def lock(self) -> threading.RLock:
+        """
+        The cache's own (re-entrant) lock. Hold it across a read-modify-replace of a
+        dataset so no other thread sees, or replaces, the dataset half way through.
+        """
+        return self._lock
+
+    def version(self, name: str) -> int:
+        return self._versions.get(name, 0)
+
+    def is_current(self, name: str, value) -> bool:
+        """True if `value` is the object currently cached as dataset `name`."""
+        with self._lock:
+            return name in self._datasets and self._datasets[name] is value
+
+    def derived(self, name: str, key: Hashable, compute: Callable[[], Any],
+                valid: Optional[Callable[[Any], bool]] = None):
+        """
+        Return a result derived from dataset `name`, computing it once per dataset version.
+        `valid(value)` can reject a stored result for other reasons (e.g. it is from
+        yesterday); the recomputed one replaces it under the same key.
+        """
+        with self._lock:
+            version = self._versions.get(name, 0)
+            entry = self._derived.get((name, key))
+            if entry is not None and entry[0] == version and (valid is None or valid(entry[1])):
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            value = compute()
+            self._derived[(name, key)] = (version, value)
+            return value
+
+    def clear(self):
+        with self._lock:
+            for name in list(self._datasets):
+                self._versions[name] = self._versions.get(name, 0) + 1
+            self._datasets.clear()
+            self._derived.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "datasets": len(self._datasets), "derived": len(self._derived)}
+
+    def _drop_derived(self, name: str):
+        for key in [k for k in self._derived if k[0] == name]:
+            del self._derived[key]
+
+
+# shared instance used by app.py and the agents
+DATA_CACHE = DataCache()
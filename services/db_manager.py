@@ -1,9 +1,17 @@
 # services/db_manager.py
+import copy
 import json
 import os
+import threading
 import time
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
 
 DEFAULT_DB = {
     "MH-01-AB-1234": {
@@ -22,57 +30,419 @@ DEFAULT_DB = {
     }
 }
 
+# snapshot key holding the last journal sequence number folded into it
+JOURNAL_SEQ_KEY = "__journal_seq__"
+
+
+class _FileLock:
+    """Exclusive cross-process lock on `<db_file>.lock`, re-entrant within one manager."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._fh = None
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        if self._depth == 0:
+            if self._fh is None:
+                self._fh = open(self.path, "a+b")
+            if fcntl is not None:
+                fcntl.flock(self._fh.fileno(), fcntl.LOCK_EX)
+            else:
+                while True:
+                    try:
+                        self._fh.seek(0)
+                        msvcrt.locking(self._fh.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        # LK_LOCK gives up after ~10s; keep waiting
+                        continue
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc):
+        self._depth -= 1
+        if self._depth == 0:
+            if fcntl is not None:
+                fcntl.flock(self._fh.fileno(), fcntl.LOCK_UN)
+            else:
+                self._fh.seek(0)
+                msvcrt.locking(self._fh.fileno(), msvcrt.LK_UNLCK, 1)
+        self._thread_lock.release()
+
+    def close(self):
+        with self._thread_lock:
+            if self._fh is not None and self._depth == 0:
+                self._fh.close()
+                self._fh = None
+
+
+class _CommitBatch:
+    __slots__ = ("records", "done", "error")
+
+    def __init__(self):
+        self.records: List[Dict[str, Any]] = []
+        self.done = threading.Event()
+        self.error: Optional[BaseException] = None
+
+
+def _apply_record(data: Dict[str, Any], record: Dict[str, Any]):
+    vehicle_id = record["id"]
+    if record["op"] == "history":
+        if vehicle_id not in data:
+            # create minimal record if unknown
+            data[vehicle_id] = {
+                "owner": "Unknown",
+                "phone": "",
+                "model": "",
+                "status": "Unknown",
+                "history": []
+            }
+        entry = record["entry"]
+        data[vehicle_id]["history"].append(entry)
+        data[vehicle_id]["status"] = entry["action"] if entry["action"] else data[vehicle_id].get("status", "Updated")
+    elif record["op"] == "status":
+        if vehicle_id in data:
+            data[vehicle_id]["status"] = record["status"]
+
+
+def read_store(db_file: str) -> Dict[str, Any]:
+    """
+    The store's vehicles (snapshot plus journal) without touching the files: nothing
+    is created, compacted or truncated. Raises FileNotFoundError if there is no
+    snapshot and no journal.
+    """
+    path = Path(db_file)
+    journal = path.with_suffix(path.suffix + ".journal")
+    if not path.exists() and not journal.exists():
+        raise FileNotFoundError(db_file)
+    data: Dict[str, Any] = {}
+    if path.exists():
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    last_seq = int(data.pop(JOURNAL_SEQ_KEY, 0))
+    if journal.exists():
+        with open(journal, "rb") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break  # torn last line
+                if record.get("seq") is not None and record["seq"] <= last_seq:
+                    continue
+                _apply_record(data, record)
+    return data
+
+
 class DatabaseManager:
-    def __init__(self, db_file: str = "vehicle_database.json"):
+    """
+    JSON-file vehicle store, safe to share between threads and processes.
+
+    Every write takes an exclusive lock on `<db_file>.lock`, first picks up changes
+    made by other writers, then applies its own. Reads reload the data when the
+    files on disk have changed. Concurrent update_vehicle_history / set_status
+    calls from different threads are grouped: one thread writes the whole batch
+    while the others wait for it, so N concurrent bookings cost one durable write.
+
+    With journal=True every mutation is appended as one compact JSON line to
+    `<db_file>.journal` instead of rewriting the whole file. Journal writes are
+    flushed to the OS immediately and fsync'ed in groups: after `sync_every`
+    records, at most `sync_interval` seconds after the first unsynced one (a timer
+    covers a writer that goes idle), and on flush()/close(). After
+    `compact_every` records the journal is folded into a fresh snapshot.
+    Any journal left on disk is replayed on startup, in either mode. Journal
+    records are numbered and the snapshot remembers the last number it contains,
+    so a journal that outlived its compaction (crash before it was removed) is
+    not applied twice. A mutation reaches self.data only once it is on disk; if
+    the write fails, memory is left as it was.
+    """
+
+    def __init__(self, db_file: str = "vehicle_database.json", journal: bool = False,
+                 sync_every: int = 32, sync_interval: float = 1.0, compact_every: int = 1000):
         self.db_file = Path(db_file)
+        self.journal_file = self.db_file.with_suffix(self.db_file.suffix + ".journal")
+        self.journal = journal
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self.compact_every = compact_every
+        self._file_lock = _FileLock(self.db_file.with_suffix(self.db_file.suffix + ".lock"))
+        self._journal_fh = None
+        self._journal_records = 0
+        self._journal_offset = 0
+        self._journal_seq = 0
+        self._snapshot_sig = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._sync_timer: Optional[threading.Timer] = None
+        self._group_lock = threading.Lock()
+        self._pending = _CommitBatch()
+        self._writing = False
         self._ensure_db()
 
     def _ensure_db(self):
+        with self._file_lock:
+            self._load()
+
+    def _load(self):
+        """(Re)read the snapshot and replay the journal. Caller holds the file lock."""
+        self._close_journal()
+        self._journal_seq = 0
         if self.db_file.exists():
             try:
                 with open(self.db_file, "r", encoding="utf-8") as f:
                     self.data = json.load(f)
+                self._journal_seq = int(self.data.pop(JOURNAL_SEQ_KEY, 0))
             except Exception:
                 # if corrupted, create default
-                self.data = DEFAULT_DB.copy()
+                self.data = copy.deepcopy(DEFAULT_DB)
                 self.save()
         else:
             # create default file
-            self.data = DEFAULT_DB.copy()
+            self.data = copy.deepcopy(DEFAULT_DB)
             self.save()
+        self._snapshot_sig = self._stat_snapshot()
+        self._journal_offset = 0
+
+        replayed = self._replay_journal()
+        if replayed and not self.journal:
+            # fold a journal left behind by a journaling writer into the snapshot
+            self.compact()
+        else:
+            self._journal_records = replayed
 
     def save(self):
         tmp = self.db_file.with_suffix(".tmp")
-        with open(tmp, "w", encoding="utf-8") as f:
-            json.dump(self.data, f, indent=2, ensure_ascii=False)
-        os.replace(tmp, self.db_file)
+        with self._file_lock:
+            data = dict(self.data, **{JOURNAL_SEQ_KEY: self._journal_seq}) if self._journal_seq else self.data
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.db_file)
+            self._snapshot_sig = self._stat_snapshot()
+
+    # ------------------ change detection ------------------ #
+    def _stat_snapshot(self):
+        try:
+            st = os.stat(self.db_file)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _journal_size(self) -> int:
+        try:
+            return os.path.getsize(self.journal_file)
+        except OSError:
+            return 0
+
+    def _changed_on_disk(self) -> bool:
+        return self._stat_snapshot() != self._snapshot_sig or self._journal_size() != self._journal_offset
+
+    def _refresh(self):
+        """Pick up writes from other processes. Caller holds the file lock."""
+        if self._stat_snapshot() != self._snapshot_sig:
+            # another writer saved or compacted: start over from its snapshot
+            self._load()
+        elif self._journal_size() != self._journal_offset:
+            self._journal_records += self._replay_journal()
+
+    def reload_if_changed(self):
+        """Cheap stat check; reloads only if another writer touched the files."""
+        if self._changed_on_disk():
+            with self._file_lock:
+                self._refresh()
+
+    # ------------------ journal ------------------ #
+    def _replay_journal(self) -> int:
+        """Apply journal records past the already-applied offset. Caller holds the file lock."""
+        if not self.journal_file.exists():
+            self._journal_offset = 0
+            return 0
+        count = 0
+        good_bytes = self._journal_offset
+        with open(self.journal_file, "rb") as f:
+            f.seek(good_bytes)
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # torn last line from a crash mid-append; cut it off so new appends stay readable
+                    f.close()
+                    os.truncate(self.journal_file, good_bytes)
+                    break
+                good_bytes += len(line)
+                seq = record.get("seq")
+                if seq is not None:
+                    if seq <= self._journal_seq:
+                        continue  # already in the snapshot
+                    self._journal_seq = seq
+                self._apply(record)
+                count += 1
+        self._journal_offset = good_bytes
+        return count
+
+    def _apply(self, record: Dict[str, Any]):
+        _apply_record(self.data, record)
+
+    def _commit(self, record: Dict[str, Any]):
+        """
+        Queue a mutation and wait until it is persisted. The first thread to arrive
+        becomes the writer and keeps draining the queue; later arrivals wait for
+        the batch their record landed in (group commit).
+        """
+        with self._group_lock:
+            batch = self._pending
+            batch.records.append(record)
+            lead = not self._writing
+            if lead:
+                self._writing = True
+
+        if lead:
+            while True:
+                with self._group_lock:
+                    current = self._pending
+                    if not current.records:
+                        self._writing = False
+                        break
+                    self._pending = _CommitBatch()
+                try:
+                    self._write_batch(current.records)
+                except BaseException as e:
+                    current.error = e
+                current.done.set()
+        else:
+            batch.done.wait()
+
+        if batch.error is not None:
+            raise batch.error
+
+    def _write_batch(self, records: List[Dict[str, Any]]):
+        with self._file_lock:
+            self._refresh()
+            if not self.journal:
+                for record in records:
+                    self._apply(record)
+                try:
+                    self.save()
+                except BaseException:
+                    self._load()  # the snapshot on disk is still the previous state
+                    raise
+                return
+            first_seq = self._journal_seq
+            for i, record in enumerate(records, start=1):
+                record["seq"] = first_seq + i
+            payload = "".join(
+                json.dumps(r, ensure_ascii=False, separators=(",", ":")) + "\n" for r in records
+            ).encode("utf-8")
+            try:
+                if self._journal_fh is None:
+                    self._journal_fh = open(self.journal_file, "ab")
+                self._journal_fh.write(payload)
+                self._journal_fh.flush()
+            except BaseException:
+                # cut off whatever part of the batch made it out, so the journal ends on a whole record
+                if self._journal_fh is not None:
+                    try:
+                        self._journal_fh.close()
+                    except OSError:
+                        pass
+                    self._journal_fh = None
+                if self.journal_file.exists():
+                    os.truncate(self.journal_file, self._journal_offset)
+                raise
+            for record in records:
+                self._apply(record)
+            self._journal_seq = first_seq + len(records)
+            self._journal_offset += len(payload)
+            self._journal_records += len(records)
+            self._unsynced += len(records)
+            if self._unsynced >= self.sync_every or time.monotonic() - self._last_sync >= self.sync_interval:
+                self.flush()
+            elif self._unsynced and self._sync_timer is None:
+                self._sync_timer = threading.Timer(self.sync_interval, self._timed_flush)
+                self._sync_timer.daemon = True
+                self._sync_timer.start()
+            if self._journal_records >= self.compact_every:
+                self.compact()
+
+    def _timed_flush(self):
+        with self._file_lock:
+            self._sync_timer = None
+            self.flush()
+
+    def flush(self):
+        """fsync pending journal records (group commit)."""
+        if self._journal_fh is not None and self._unsynced:
+            os.fsync(self._journal_fh.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def compact(self):
+        """Write a full snapshot and drop the journal it now contains."""
+        with self._file_lock:
+            self._refresh()
+            self.flush()
+            self.save()
+            self._close_journal()
+            if self.journal_file.exists():
+                os.remove(self.journal_file)
+            self._journal_records = 0
+            self._journal_offset = 0
+
+    def _close_journal(self):
+        if self._journal_fh is not None:
+            self.flush()
+            self._journal_fh.close()
+            self._journal_fh = None
+
+    def close(self):
+        with self._file_lock:
+            if self._sync_timer is not None:
+                self._sync_timer.cancel()
+                self._sync_timer = None
+            self._close_journal()
+        self._file_lock.close()
 
     def get_vehicle(self, vehicle_id: str) -> Optional[Dict[str, Any]]:
+        self.reload_if_changed()
         return self.data.get(vehicle_id)
 
     def list_vehicles(self):
+        self.reload_if_changed()
         return list(self.data.keys())
 
-    def update_vehicle_history(self, vehicle_id: str, issue: str, action: str):
-        if vehicle_id not in self.data:
-            # create minimal record if unknown
-            self.data[vehicle_id] = {
-                "owner": "Unknown",
-                "phone": "",
-                "model": "",
-                "status": "Unknown",
-                "history": []
-            }
+    def update_vehicle_history(self, vehicle_id: str, issue: str, action: str, slot=None):
         entry = {
             "date": time.strftime("%Y-%m-%d %H:%M:%S"),
             "issue": issue,
             "action": action
         }
-        self.data[vehicle_id]["history"].append(entry)
-        self.data[vehicle_id]["status"] = action if action else self.data[vehicle_id].get("status", "Updated")
-        self.save()
+        if slot is not None:
+            # start of the booked service slot, kept apart from the booking date
+            entry["slot"] = slot if isinstance(slot, str) else slot.strftime("%Y-%m-%d %H:%M:%S")
+        self._commit({"op": "history", "id": vehicle_id, "entry": entry})
 
     def set_status(self, vehicle_id: str, status: str):
+        self.reload_if_changed()
         if vehicle_id in self.data:
-            self.data[vehicle_id]["status"] = status
-            self.save()
+            self._commit({"op": "status", "id": vehicle_id, "status": status})
+
+
+SQLITE_SUFFIXES = {".db", ".sqlite", ".sqlite3"}
+
+def open_database(db_file: str = "vehicle_database.json", backend: Optional[str] = None, **kwargs):
+    """
+    Open the vehicle store with the right backend. `backend` is "json" or "sqlite";
+    by default it is picked from the file suffix (.db / .sqlite / .sqlite3 -> SQLite).
+    Both backends expose get_vehicle, list_vehicles, update_vehicle_history and set_status.
+    """
+    if backend is None:
+        backend = "sqlite" if Path(db_file).suffix in SQLITE_SUFFIXES else "json"
+    if backend == "sqlite":
+        from services.sqlite_db import SqliteDatabaseManager
+        return SqliteDatabaseManager(db_file, **kwargs)
+    if backend == "json":
+        return DatabaseManager(db_file, **kwargs)
+    raise ValueError(f"unknown database backend: {backend}")
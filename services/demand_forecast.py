@@ -0,0 +1,104 @@
+# services/demand_forecast.py
+"""
+Workshop demand forecast per city hub, fitted from the maintenance history.
+
+For every hub the daily job counts of the last `history_days` are reduced to an
+exponentially weighted level (recent days count more), then multiplied by a
+fleet-wide day-of-week profile. Everything is a handful of NumPy array ops, so
+fitting is cheap; the fitted forecast is meant to be cached once per day and
+looked up by the agents and the dashboard.
+
+`expected_jobs` is a rate (mean jobs per day, usually fractional); `bays_needed`
+rounds it up to whole bay-days, which is the figure to plan capacity with.
+"""
+from datetime import date, timedelta
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+class DemandForecaster:
+    def __init__(self, horizon_days: int = 30, history_days: int = 365, half_life_days: float = 90.0):
+        self.horizon_days = horizon_days
+        self.history_days = history_days
+        self.half_life_days = half_life_days
+        self.hubs: List[str] = []
+        self.start_date: Optional[date] = None
+        self.expected = np.zeros((0, horizon_days))  # hubs x horizon
+
+    def fit(self, maint_df: pd.DataFrame, vehicles_df: pd.DataFrame, today: Optional[date] = None) -> "DemandForecaster":
+        today = today or date.today()
+        self.start_date = today + timedelta(days=1)
+
+        city_of = pd.Series(vehicles_df["city"].values, index=vehicles_df["id"].values)
+        vehicle_ids = maint_df["vehicle_id"]
+        if isinstance(vehicle_ids.dtype, pd.CategoricalDtype):
+            codes, ids = vehicle_ids.array.codes, vehicle_ids.cat.categories
+        else:
+            codes, ids = pd.factorize(vehicle_ids)
+        # one lookup per distinct vehicle; code -1 (no vehicle id) picks the trailing "Unknown"
+        code_city = np.append(pd.Series(ids).map(city_of).fillna("Unknown").to_numpy(dtype=object), "Unknown")
+        # hubs that have vehicles but no history yet get zero demand
+        self.hubs = sorted(set(code_city[np.unique(codes)]) | set(vehicles_df["city"].unique()))
+        hub_index = pd.Index(self.hubs).get_indexer(code_city)[codes]
+
+        today64 = np.datetime64(today, "D")
+        days_ago = (today64 - pd.to_datetime(maint_df["date"]).values.astype("datetime64[D]")).astype(np.int64)
+        in_window = (days_ago >= 1) & (days_ago <= self.history_days)
+
+        # daily counts as a (hubs x history_days) matrix; column 0 is yesterday
+        n_hubs = len(self.hubs)
+        flat = hub_index[in_window] * self.history_days + (days_ago[in_window] - 1)
+        counts = np.bincount(flat, minlength=n_hubs * self.history_days).reshape(n_hubs, self.history_days)
+
+        weights = 0.5 ** (np.arange(self.history_days) / self.half_life_days)
+        level = counts @ weights / weights.sum()
+
+        # fleet-wide weekday profile (pooled so sparse hubs still get a sensible shape)
+        past_weekdays = (today64 - np.arange(1, self.history_days + 1)).astype("datetime64[D]").view(np.int64)
+        past_weekdays = (past_weekdays + 3) % 7  # 1970-01-01 was a Thursday; 0 = Monday
+        per_weekday = np.bincount(past_weekdays, weights=counts.sum(axis=0), minlength=7)
+        days_per_weekday = np.bincount(past_weekdays, minlength=7)
+        rate = per_weekday / np.maximum(days_per_weekday, 1)
+        profile = rate / rate.mean() if rate.mean() > 0 else np.ones(7)
+
+        future = np.arange(1, self.horizon_days + 1)
+        future_weekdays = ((today64 + future).astype("datetime64[D]").view(np.int64) + 3) % 7
+        self.expected = level[:, None] * profile[future_weekdays][None, :]
+        return self
+
+    def dates(self) -> List[date]:
+        return [self.start_date + timedelta(days=d) for d in range(self.horizon_days)]
+
+    def hub_forecast(self, city: str) -> pd.DataFrame:
+        """Expected jobs per day for one hub (zeros for an unknown hub)."""
+        if city in self.hubs:
+            expected = self.expected[self.hubs.index(city)]
+        else:
+            expected = np.zeros(self.horizon_days)
+        return self._frame(expected)
+
+    def fleet_forecast(self) -> pd.DataFrame:
+        """Expected jobs per day summed over all hubs; this is what analyze() returns as "forecast"."""
+        return self._frame(self.expected.sum(axis=0))
+
+    def to_frame(self) -> pd.DataFrame:
+        """Long format: one row per (date, city)."""
+        return pd.DataFrame(
+            {
+                "date": np.tile(self.dates(), len(self.hubs)),
+                "city": np.repeat(self.hubs, self.horizon_days),
+                "expected_jobs": self.expected.ravel(),
+                "bays_needed": np.ceil(self.expected.ravel()).astype(np.int64),
+            }
+        )
+
+    def _frame(self, expected: np.ndarray) -> pd.DataFrame:
+        return pd.DataFrame(
+            {
+                "date": self.dates(),
+                "expected_jobs": expected,
+                "bays_needed": np.ceil(expected).astype(np.int64),
+            }
+        )
@@ -0,0 +1,256 @@
+# services/maintenance_history.py
+"""
+Per-vehicle index over the maintenance log.
+
+The log's rows are grouped by vehicle and sorted by date once; a vehicle's
+history is then the slice offsets[k]:offsets[k + 1] of the sorted arrays, found
+with one hash lookup instead of a boolean scan of the whole frame. Running sums
+of severity and cost over the sorted rows make the recent-window features
+(records, mean severity, total cost in the last `recent_days`, days since the
+last service) a few array reads per vehicle, for one vehicle or a whole fleet.
+
+Appended records go to a small per-vehicle tail that is folded into the sorted
+arrays once it grows past `merge_every` rows, so appending stays cheap and the
+index never has to be rebuilt from the frame.
+"""
+import threading
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+_EPOCH = np.datetime64("1970-01-01", "D")
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+_DAY_BITS = 20  # sort key = vehicle code << 20 | day, good until the year 4840
+
+
+def _day(value) -> int:
+    if isinstance(value, datetime):
+        value = value.date()
+    if isinstance(value, date):
+        return value.toordinal() - _EPOCH_ORDINAL
+    return int((np.datetime64(pd.Timestamp(value).date(), "D") - _EPOCH).astype(np.int64))
+
+
+class MaintenanceHistoryIndex:
+    def __init__(self, merge_every: int = 65536):
+        self.merge_every = merge_every
+        self._lock = threading.RLock()
+        self.ids = pd.Index([], dtype=object)
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self.rows = np.zeros(0, dtype=np.int64)  # frame positions, grouped by vehicle, oldest first
+        self.day = np.zeros(0, dtype=np.int64)  # days since 1970-01-01
+        self.severity = np.zeros(0, dtype=np.int8)
+        self.cost = np.zeros(0, dtype=np.int32)
+        self._severity_cum = np.zeros(1, dtype=np.int64)
+        self._cost_cum = np.zeros(1, dtype=np.int64)
+        self._key = np.zeros(0, dtype=np.int64)
+        # appended since the last merge: vehicle_id -> [(day, severity, cost, row)]
+        self._tail: Dict[Any, List[Tuple[int, int, int, int]]] = {}
+        self._tail_rows = 0
+        self._tail_columns = None  # the tail as arrays for features(), rebuilt after each add()
+        self.n_rows = 0
+
+    @classmethod
+    def from_frame(cls, maint_df: pd.DataFrame, merge_every: int = 65536) -> "MaintenanceHistoryIndex":
+        index = cls(merge_every)
+        vehicle_ids = maint_df["vehicle_id"]
+        if isinstance(vehicle_ids.dtype, pd.CategoricalDtype):
+            codes, ids = vehicle_ids.array.codes.astype(np.int64), vehicle_ids.cat.categories
+        else:
+            codes, ids = pd.factorize(vehicle_ids)
+        day = (pd.to_datetime(maint_df["date"]).values.astype("datetime64[D]") - _EPOCH).astype(np.int64)
+        index._build(
+            np.asarray(codes, dtype=np.int64),
+            pd.Index(ids),
+            day,
+            maint_df["severity"].to_numpy(),
+            maint_df["cost"].to_numpy(),
+            np.arange(len(maint_df), dtype=np.int64),
+        )
+        return index
+
+    def _build(self, codes, ids, day, severity, cost, rows):
+        keep = codes >= 0  # rows without a vehicle id are not anyone's history
+        codes, day, severity, cost, rows = codes[keep], day[keep], severity[keep], cost[keep], rows[keep]
+        key = (codes << _DAY_BITS) + day
+        order = np.argsort(key, kind="stable")
+        # object dtype keeps the hash table valid between lookups (Arrow-backed strings are converted per call)
+        self.ids = ids if ids.dtype == object else ids.astype(object)
+        self.offsets = np.zeros(len(ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(codes, minlength=len(ids)), out=self.offsets[1:])
+        self.rows = rows[order]
+        self.day = day[order]
+        self.severity = severity[order].astype(np.int8)
+        cost = np.asarray(cost, dtype=np.int64)[order]
+        fits = not len(cost) or (cost.min() >= np.iinfo(np.int32).min and cost.max() <= np.iinfo(np.int32).max)
+        self.cost = cost.astype(np.int32) if fits else cost  # the log widens past int32 too
+        self._severity_cum = np.concatenate([[0], np.cumsum(self.severity, dtype=np.int64)])
+        self._cost_cum = np.concatenate([[0], np.cumsum(self.cost, dtype=np.int64)])
+        self._key = key[order]
+        self._tail = {}
+        self._tail_rows = 0
+        self._tail_columns = None
+        self.n_rows = int(rows.max()) + 1 if len(rows) else 0
+
+    # ------------------ updates ------------------ #
+    def add(self, records: Iterable[Mapping[str, Any]], first_row: Optional[int] = None):
+        """
+        Index records appended to the log; `first_row` is the frame position of the
+        first one (defaults to right after the rows already indexed).
+        """
+        with self._lock:
+            row = self.n_rows if first_row is None else first_row
+            for record in records:
+                self._tail.setdefault(record["vehicle_id"], []).append(
+                    (_day(record["date"]), int(record["severity"]), int(record["cost"]), row)
+                )
+                row += 1
+                self._tail_rows += 1
+            self._tail_columns = None
+            self.n_rows = max(self.n_rows, row)
+            if self._tail_rows >= self.merge_every:
+                self._merge()
+
+    def _merge(self):
+        tail = [(vid, *entry) for vid, entries in self._tail.items() for entry in entries]
+        vids = [t[0] for t in tail]
+        new_ids = pd.Index(list(dict.fromkeys(v for v in vids if v not in self.ids)), dtype=object)
+        ids = self.ids.append(new_ids)
+        base_codes = np.repeat(np.arange(len(self.ids), dtype=np.int64), np.diff(self.offsets))
+        tail_codes = ids.get_indexer(vids).astype(np.int64)
+        n_rows = self.n_rows
+        self._build(
+            np.concatenate([base_codes, tail_codes]),
+            ids,
+            np.concatenate([self.day, [t[1] for t in tail]]).astype(np.int64),
+            np.concatenate([self.severity, [t[2] for t in tail]]),
+            np.concatenate([self.cost, [t[3] for t in tail]]),
+            np.concatenate([self.rows, [t[4] for t in tail]]).astype(np.int64),
+        )
+        self.n_rows = max(self.n_rows, n_rows)
+
+    def _tail_arrays(self):
+        if self._tail_columns is None:
+            vids = [vid for vid, entries in self._tail.items() for _ in entries]
+            values = np.array(
+                [entry[:3] for entries in self._tail.values() for entry in entries], dtype=np.int64
+            ).reshape(-1, 3)  # day, severity, cost
+            self._tail_columns = (pd.Index(vids, dtype=object), values[:, 0], values[:, 1], values[:, 2])
+        return self._tail_columns
+
+    # ------------------ lookups ------------------ #
+    def _codes(self, vehicle_ids: Sequence) -> np.ndarray:
+        if len(vehicle_ids) > 64:
+            return self.ids.get_indexer(vehicle_ids)
+        codes = np.empty(len(vehicle_ids), dtype=np.int64)
+        for i, vid in enumerate(vehicle_ids):
+            try:
+                codes[i] = self.ids.get_loc(vid)
+            except KeyError:
+                codes[i] = -1
+        return codes
+
+    def rows_for(self, vehicle_id) -> np.ndarray:
+        """Frame positions of one vehicle's records, oldest first."""
+        with self._lock:
+            k = self._codes([vehicle_id])[0]
+            base = self.rows[self.offsets[k]:self.offsets[k + 1]] if k >= 0 else self.rows[:0]
+            tail = self._tail.get(vehicle_id)
+            if not tail:
+                return base
+            merged = [(int(d), int(r)) for d, r in zip(self.day[self.offsets[k]:self.offsets[k + 1]], base)] if k >= 0 else []
+            merged += [(t[0], t[3]) for t in tail]
+            merged.sort()
+            return np.array([r for _, r in merged], dtype=np.int64)
+
+    def history(self, maint_df: pd.DataFrame, vehicle_id) -> pd.DataFrame:
+        """One vehicle's records from the indexed frame, oldest first."""
+        return maint_df.iloc[self.rows_for(vehicle_id)]
+
+    def vehicle_features(self, vehicle_id, today=None, recent_days: int = 365) -> Dict[str, Any]:
+        """features() for one vehicle as plain numbers; days_since_service is None without history."""
+        today_day = _day(today or date.today())
+        cutoff = today_day - recent_days
+        with self._lock:
+            k = int(self._codes([vehicle_id])[0])
+            start = stop = recent_start = 0
+            if k >= 0:
+                start, stop = int(self.offsets[k]), int(self.offsets[k + 1])
+                recent_start = int(np.searchsorted(self._key, (k << _DAY_BITS) + max(cutoff, 0)))
+            records, recent = stop - start, stop - recent_start
+            sev_sum = float(self._severity_cum[stop] - self._severity_cum[recent_start])
+            cost_sum = float(self._cost_cum[stop] - self._cost_cum[recent_start])
+            last_day = int(self.day[stop - 1]) if records else None
+            for d, sev, cost, _ in self._tail.get(vehicle_id, ()):
+                records += 1
+                if d >= cutoff:
+                    recent += 1
+                    sev_sum += sev
+                    cost_sum += cost
+                if last_day is None or d > last_day:
+                    last_day = d
+        return {
+            "records": records,
+            "recent_records": recent,
+            "recent_severity": sev_sum / recent if recent else 0.0,
+            "recent_cost": cost_sum,
+            "days_since_service": float(today_day - last_day) if last_day is not None else None,
+        }
+
+    def features(self, vehicle_ids: Sequence, today=None, recent_days: int = 365) -> Dict[str, np.ndarray]:
+        """
+        History features per vehicle, as arrays aligned with `vehicle_ids`:
+        records, recent_records, recent_severity (mean over the recent window, 0 if
+        none), recent_cost (sum) and days_since_service (NaN without history).
+        """
+        today_day = _day(today or date.today())
+        cutoff = today_day - recent_days
+        with self._lock:
+            k = self._codes(vehicle_ids)
+            known = k >= 0
+            kk = np.where(known, k, 0)
+            start = np.where(known, self.offsets[kk], 0)
+            stop = np.where(known, self.offsets[kk + 1], 0)
+            # rows are sorted by (vehicle, day): the recent window is a suffix of each slice
+            recent_start = np.where(known, np.searchsorted(self._key, (kk << _DAY_BITS) + max(cutoff, 0)), 0)
+
+            records = (stop - start).astype(np.int64)
+            recent = (stop - recent_start).astype(np.int64)
+            sev_sum = (self._severity_cum[stop] - self._severity_cum[recent_start]).astype(np.float64)
+            cost_sum = (self._cost_cum[stop] - self._cost_cum[recent_start]).astype(np.float64)
+            last_day = np.full(len(k), np.nan)
+            has = records > 0
+            last_day[has] = self.day[stop[has] - 1]
+
+            if self._tail:
+                # fold the tail in per distinct requested vehicle; code n collects ids that are NaN
+                query_codes, query_ids = pd.factorize(pd.Index(vehicle_ids, dtype=object))
+                n = len(query_ids)
+                query_codes = np.where(query_codes >= 0, query_codes, n)
+                tail_vids, tail_day, tail_sev, tail_cost = self._tail_arrays()
+                pos = pd.Index(query_ids).get_indexer(tail_vids)
+                hit = pos >= 0
+                in_recent = hit & (tail_day >= cutoff)
+                pos_hit, pos_recent = pos[hit], pos[in_recent]
+                records += np.bincount(pos_hit, minlength=n + 1)[query_codes]
+                recent += np.bincount(pos_recent, minlength=n + 1)[query_codes]
+                sev_sum += np.bincount(pos_recent, weights=tail_sev[in_recent], minlength=n + 1)[query_codes]
+                cost_sum += np.bincount(pos_recent, weights=tail_cost[in_recent], minlength=n + 1)[query_codes]
+                tail_last = np.full(n + 1, np.nan)
+                np.fmax.at(tail_last, pos_hit, tail_day[hit].astype(np.float64))
+                last_day = np.fmax(last_day, tail_last[query_codes])
+
+        recent_severity = np.where(recent > 0, sev_sum / np.maximum(recent, 1), 0.0)
+        return {
+            "records": records,
+            "recent_records": recent,
+            "recent_severity": recent_severity,
+            "recent_cost": cost_sum,
+            "days_since_service": today_day - last_day,
+        }
+
+    def stats(self) -> Dict[str, int]:
+        return {"vehicles": len(self.ids) + sum(1 for v in self._tail if v not in self.ids),
+                "rows": len(self.rows) + self._tail_rows, "tail_rows": self._tail_rows}
@@ -0,0 +1,142 @@
+# services/maintenance_store.py
+"""
+Compact in-memory layout for the maintenance log.
+
+The log repeats a handful of long strings (component, issue, RCA tag, CAPA
+action) on every row and the dates arrive as Python date objects. compact()
+turns those into categoricals, `date` into datetime64[s] and severity / cost
+into int8 / int32, which is several times smaller and what the aggregations
+(RCA store, demand forecast) group on anyway.
+
+save() writes a compacted log as one .npy file per column (codes + categories
+for categoricals) and load(mmap=True) maps them read-only, so worker processes
+that load the same directory share one copy of the rows through the page cache.
+append() returns a new in-memory frame; the mapped files are never modified.
+"""
+import json
+import os
+from typing import Any, Dict, Iterable, Mapping
+
+import numpy as np
+import pandas as pd
+
+COMPACT_DTYPES = {
+    "vehicle_id": "category",
+    "date": "datetime64[s]",
+    "component": "category",
+    "issue": "category",
+    "severity": "int8",
+    "cost": "int32",
+    "rca_tag": "category",
+    "capa_action": "category",
+}
+SCHEMA_FILE = "schema.json"
+
+
+def _compact_column(s: pd.Series, dtype: str) -> pd.Series:
+    if dtype == "category":
+        return s if isinstance(s.dtype, pd.CategoricalDtype) else s.astype("category")
+    if dtype.startswith("datetime64"):
+        return pd.to_datetime(s).astype(dtype)
+    info = np.iinfo(dtype)
+    if s.dtype == dtype or s.empty:
+        return s.astype(dtype)
+    if s.min() < info.min or s.max() > info.max:
+        return s.astype("int64")  # does not fit: keep the values, not the width
+    return s.astype(dtype)
+
+
+def compact(df: pd.DataFrame) -> pd.DataFrame:
+    """The same rows with COMPACT_DTYPES applied; columns not listed there are kept as they are."""
+    return pd.DataFrame(
+        {col: _compact_column(df[col], COMPACT_DTYPES[col]) if col in COMPACT_DTYPES else df[col] for col in df.columns},
+        index=pd.RangeIndex(len(df)),
+    )
+
+
+def is_compact(df: pd.DataFrame) -> bool:
+    for col, dtype in COMPACT_DTYPES.items():
+        if col not in df.columns:
+            continue
+        if dtype == "category":
+            if not isinstance(df[col].dtype, pd.CategoricalDtype):
+                return False
+        elif df[col].dtype != dtype:
+            return False
+    return True
+
+
+def append(df: pd.DataFrame, records: Iterable[Mapping[str, Any]]) -> pd.DataFrame:
+    """
+    New frame with `records` appended. Categoricals keep their existing codes and
+    only grow by the values they have not seen, so appending never re-encodes the log.
+    """
+    new = pd.DataFrame(list(records))
+    if new.empty:
+        return df
+    new = compact(new.reindex(columns=df.columns))
+    cols = {}
+    for col in df.columns:
+        old, add = df[col], new[col]
+        if isinstance(old.dtype, pd.CategoricalDtype):
+            cats = old.cat.categories
+            unseen = pd.Index(add.dropna().unique()).difference(cats)
+            if len(unseen):
+                cats = cats.append(unseen)
+            codes = np.concatenate([
+                old.array.codes.astype(np.int32),
+                cats.get_indexer(add.astype(object)).astype(np.int32),
+            ])
+            cols[col] = pd.Categorical.from_codes(codes, categories=cats)
+        else:
+            values = add.to_numpy()
+            dtype = old.dtype
+            if dtype.kind in "iu" and values.dtype.kind in "iu":
+                info = np.iinfo(dtype)
+                if values.min() < info.min or values.max() > info.max:
+                    dtype = np.dtype("int64")  # same rule as compact(): keep the values, not the width
+            cols[col] = np.concatenate([old.to_numpy().astype(dtype, copy=False), values.astype(dtype)])
+    return pd.DataFrame(cols)
+
+
+def save(df: pd.DataFrame, directory: str):
+    """Write a maintenance log as one .npy per column plus schema.json."""
+    df = df if is_compact(df) else compact(df)
+    os.makedirs(directory, exist_ok=True)
+    schema = []
+    for col in df.columns:
+        s = df[col]
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            np.save(os.path.join(directory, f"{col}.codes.npy"), s.array.codes)
+            np.save(os.path.join(directory, f"{col}.categories.npy"), np.asarray(s.cat.categories, dtype=str))
+            schema.append({"name": col, "kind": "category"})
+        else:
+            values = s.to_numpy()
+            if values.dtype == object:
+                values = values.astype(str)
+            np.save(os.path.join(directory, f"{col}.npy"), values)
+            schema.append({"name": col, "kind": str(values.dtype)})
+    with open(os.path.join(directory, SCHEMA_FILE), "w", encoding="utf-8") as f:
+        json.dump({"rows": len(df), "columns": schema}, f, indent=2)
+
+
+def load(directory: str, mmap: bool = True) -> pd.DataFrame:
+    """Load a saved log; with mmap the row data stays in the files and is shared between processes."""
+    with open(os.path.join(directory, SCHEMA_FILE), "r", encoding="utf-8") as f:
+        schema = json.load(f)
+    mode = "r" if mmap else None
+    cols: Dict[str, Any] = {}
+    for spec in schema["columns"]:
+        col = spec["name"]
+        if spec["kind"] == "category":
+            codes = np.load(os.path.join(directory, f"{col}.codes.npy"), mmap_mode=mode)
+            cats = np.load(os.path.join(directory, f"{col}.categories.npy"))
+            cols[col] = pd.Categorical.from_codes(codes, categories=pd.Index(cats))
+        else:
+            cols[col] = np.load(os.path.join(directory, f"{col}.npy"), mmap_mode=mode)
+    return pd.DataFrame(cols, copy=False)
+
+
+def memory_bytes(df: pd.DataFrame) -> int:
+    """Resident size of the frame's columns, counting string payloads."""
+    return int(df.memory_usage(deep=True, index=False).sum())
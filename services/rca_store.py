@@ -0,0 +1,107 @@
+# services/rca_store.py
+"""
+Running RCA / CAPA aggregates per component for the manufacturing feedback loop.
+
+Instead of re-grouping the whole maintenance log on every request, the store keeps
+per-component count, severity sum, cost sum, RCA-tag counts and a representative
+CAPA action (the first one seen). Adding a record is O(1); reading the top
+components only touches the handful of component entries.
+"""
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+
+class ComponentStats:
+    __slots__ = ("count", "severity_sum", "cost_sum", "rca_counts", "capa_action")
+
+    def __init__(self):
+        self.count = 0
+        self.severity_sum = 0
+        self.cost_sum = 0
+        self.rca_counts: Counter = Counter()
+        self.capa_action: Optional[str] = None
+
+    @property
+    def avg_severity(self) -> float:
+        return self.severity_sum / self.count if self.count else 0.0
+
+    @property
+    def avg_cost(self) -> float:
+        return self.cost_sum / self.count if self.count else 0.0
+
+    def top_rca(self) -> str:
+        if not self.rca_counts:
+            return "NA"
+        return self.rca_counts.most_common(1)[0][0]
+
+
+class RcaAggregateStore:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, ComponentStats] = {}
+
+    @classmethod
+    def from_frame(cls, maint_df) -> "RcaAggregateStore":
+        """Bootstrap from an existing maintenance DataFrame with one vectorized pass per column."""
+        store = cls()
+        if maint_df.empty:
+            return store
+        by_comp = maint_df.groupby("component", sort=False, observed=True)
+        totals = by_comp.agg(
+            count=("component", "size"),
+            severity_sum=("severity", "sum"),
+            cost_sum=("cost", "sum"),
+            capa_action=("capa_action", "first"),
+        )
+        # to_dict() hands back native Python numbers, so later O(1) updates stay plain ints
+        for comp, row in totals.to_dict("index").items():
+            stats = store._stats[comp] = ComponentStats()
+            stats.count = row["count"]
+            stats.severity_sum = row["severity_sum"]
+            stats.cost_sum = row["cost_sum"]
+            stats.capa_action = row["capa_action"]
+        rca = maint_df.groupby(["component", "rca_tag"], sort=False, observed=True).size()
+        for (comp, tag), n in rca.items():
+            store._stats[comp].rca_counts[tag] += int(n)
+        return store
+
+    def add(self, record: Mapping[str, Any]):
+        """Fold one maintenance record (same keys as a MAINT_DF row) into the aggregates."""
+        with self._lock:
+            stats = self._stats.get(record["component"])
+            if stats is None:
+                stats = self._stats[record["component"]] = ComponentStats()
+            stats.count += 1
+            stats.severity_sum += record["severity"]
+            stats.cost_sum += record["cost"]
+            if record.get("rca_tag") is not None:
+                stats.rca_counts[record["rca_tag"]] += 1
+            if stats.capa_action is None:
+                stats.capa_action = record.get("capa_action")
+
+    def add_many(self, records: Iterable[Mapping[str, Any]]):
+        for record in records:
+            self.add(record)
+
+    def components(self) -> List[str]:
+        return list(self._stats)
+
+    def get(self, component: str) -> Optional[ComponentStats]:
+        return self._stats.get(component)
+
+    def top_components(self, n: int = 3) -> List[Dict[str, Any]]:
+        """Components ordered by average severity (highest first), ties broken by name."""
+        with self._lock:
+            ranked = sorted(self._stats.items(), key=lambda kv: (-kv[1].avg_severity, kv[0]))
+            return [
+                {
+                    "component": comp,
+                    "avg_severity": stats.avg_severity,
+                    "avg_cost": stats.avg_cost,
+                    "count": stats.count,
+                    "top_rca": stats.top_rca(),
+                    "capa_action": stats.capa_action or "",
+                }
+                for comp, stats in ranked[:n]
+            ]
@@ -0,0 +1,102 @@
+# services/result_cache.py
+"""
+Memo of full pipeline results (master_orchestrate) keyed by the payload.
+
+The dashboard re-runs the pipeline on the same payload whenever the user asks
+to "analyze" or "check" again. Results are keyed by a SHA-256 of the payload in
+canonical form (sorted keys, integral floats as ints, NumPy scalars unwrapped)
+plus the versions of the datasets they were computed from. An entry is only
+served on the calendar day it was computed, because slots, SLA dates and the
+forecast move with the date; past `max_entries` the least recently used entry
+is dropped. Hits hand back the stored result itself, so treat it as read-only.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Callable, Dict, Hashable, Mapping, Optional, Tuple
+
+
+_PLAIN = (str, int, type(None))
+
+
+def _canonical(value):
+    if isinstance(value, _PLAIN):
+        return value
+    if isinstance(value, float):  # also numpy float64
+        return int(value) if value.is_integer() else value
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if hasattr(value, "item"):  # other numpy scalars
+        return _canonical(value.item())
+    return value
+
+
+def payload_key(payload: Mapping[str, Any]) -> str:
+    """Same key for payloads that differ only in key order or 45000 vs 45000.0."""
+    text = json.dumps(_canonical(payload), sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # (payload hash, context) -> (day computed, result), least recently used first
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[date, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+
+    def get_or_compute(self, payload: Mapping[str, Any], compute: Callable[[], Any], context: Hashable = None,
+                       validate: Optional[Callable[[Any], bool]] = None, today: Optional[date] = None):
+        """
+        Cached result for (payload, context) from today, else compute() and store it.
+        `validate(result)` can reject a hit whose side effects no longer hold.
+        Returns (result, hit).
+        """
+        key = (payload_key(payload), context)
+        today = today or date.today()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] == today and (validate is None or validate(entry[1])):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1], True
+                del self._entries[key]
+                self.expired += 1
+            self.misses += 1
+
+        result = compute()  # outside the lock: concurrent misses on the same payload both compute
+        with self._lock:
+            self._entries[key] = (today, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return result, False
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+# shared instance used by master_orchestrate
+ORCHESTRATION_CACHE = ResultCache()
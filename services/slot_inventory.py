@@ -0,0 +1,319 @@
+# services/slot_inventory.py
+"""
+Workshop slot inventory shared by the scheduling agents.
+
+Every city hub has a few service bays, each offering the same daily slot times
+with a fixed capacity. Per hub, the slots that still have room sit in a min-heap
+ordered by (start, bay), so "earliest free slot" is the heap top and a
+reservation or release is O(log n). Days are added lazily as bookings reach
+them, and slots that have started or filled up are dropped from the heap as they
+surface. All changes go through one lock, so concurrent callers never book the
+same seat twice.
+
+A vehicle holds at most one reservation: booking it again returns its existing
+slot if that still meets the deadline, otherwise the old slot is released first.
+assign_batch() seats a whole fleet scan at once, by urgency rather than by
+arrival order.
+"""
+import heapq
+import threading
+from bisect import bisect_right
+from datetime import date, datetime, time as dtime, timedelta
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+DEFAULT_SLOT_TIMES = ("09:30", "13:30", "17:30")
+
+
+class Reservation(NamedTuple):
+    hub: str
+    start: datetime
+    bay: int
+    vehicle_id: Optional[str] = None
+
+    @property
+    def label(self) -> str:
+        return self.start.strftime("%d %b – %I:%M %p")
+
+
+class _Hub:
+    __slots__ = ("bays", "heap", "remaining", "days_until")
+
+    def __init__(self, bays: int):
+        self.bays = bays
+        self.heap: List[Tuple[datetime, int]] = []  # (start, bay) with remaining > 0, plus stale entries
+        self.remaining: Dict[Tuple[datetime, int], int] = {}
+        self.days_until: Optional[date] = None  # last day whose slots have been created
+
+
+class SlotInventory:
+    def __init__(self, bays_per_hub: int = 2, capacity_per_slot: int = 1,
+                 slot_times=DEFAULT_SLOT_TIMES, lead_days: int = 1, max_days: int = 365,
+                 hub_bays: Optional[Dict[str, int]] = None):
+        """
+        lead_days: first bookable day relative to today (1 = tomorrow).
+        max_days: how far ahead an open-ended search may go before giving up.
+        hub_bays: per-city bay counts overriding bays_per_hub.
+        """
+        self.bays_per_hub = bays_per_hub
+        self.capacity_per_slot = capacity_per_slot
+        self.slot_times = [dtime.fromisoformat(t) for t in slot_times]
+        self.lead_days = lead_days
+        self.max_days = max_days
+        self.hub_bays = dict(hub_bays or {})
+        self._hubs: Dict[str, _Hub] = {}
+        self._by_vehicle: Dict[str, Reservation] = {}
+        self._lock = threading.RLock()
+        self.reservations = 0
+        self.releases = 0
+
+    # ------------------ internals ------------------ #
+    def _hub(self, hub: str) -> _Hub:
+        h = self._hubs.get(hub)
+        if h is None:
+            h = self._hubs[hub] = _Hub(self.hub_bays.get(hub, self.bays_per_hub))
+        return h
+
+    def _extend(self, h: _Hub, through: date, first_day: date):
+        """Create the slots of every day up to `through` that does not exist yet."""
+        day = first_day if h.days_until is None else max(first_day, h.days_until + timedelta(days=1))
+        while day <= through:
+            for t in self.slot_times:
+                start = datetime.combine(day, t)
+                for bay in range(1, h.bays + 1):
+                    h.remaining[(start, bay)] = self.capacity_per_slot
+                    heapq.heappush(h.heap, (start, bay))
+            h.days_until = day
+            day += timedelta(days=1)
+
+    def _first_day(self, now: datetime) -> date:
+        return now.date() + timedelta(days=self.lead_days)
+
+    def _top(self, h: _Hub, not_before: datetime) -> Optional[Tuple[datetime, int]]:
+        """Earliest slot with room at or after `not_before`, discarding stale heap entries."""
+        heap = h.heap
+        while heap:
+            key = heap[0]
+            if key[0] < not_before:
+                heapq.heappop(heap)
+                h.remaining.pop(key, None)  # started slots can no longer be booked or released into
+                continue
+            if h.remaining.get(key, 0) <= 0:
+                heapq.heappop(heap)
+                continue
+            return key
+        return None
+
+    def _find(self, h: _Hub, deadline: Optional[date], now: datetime):
+        first_day = self._first_day(now)
+        not_before = datetime.combine(first_day, dtime.min)
+        last_day = deadline if deadline is not None else now.date() + timedelta(days=self.max_days)
+        if deadline is not None:
+            self._extend(h, deadline, first_day)
+        while True:
+            key = self._top(h, not_before)
+            if key is not None:
+                return key if key[0].date() <= last_day else None
+            # nothing free in the created range: open the next week, up to the limit
+            nxt = first_day if h.days_until is None else h.days_until + timedelta(days=1)
+            if nxt > last_day:
+                return None
+            self._extend(h, min(last_day, nxt + timedelta(days=6)), first_day)
+
+    def _release(self, res: Reservation):
+        h = self._hubs.get(res.hub)
+        if h is None:
+            return
+        key = (res.start, res.bay)
+        left = h.remaining.get(key)
+        if left is None:
+            return
+        h.remaining[key] = left + 1
+        if left == 0:
+            heapq.heappush(h.heap, key)
+        self.releases += 1
+
+    # ------------------ API ------------------ #
+    def earliest(self, hub: str, deadline: Optional[date] = None, now: Optional[datetime] = None) -> Optional[Reservation]:
+        """Earliest free slot at `hub` on or before `deadline` without booking it."""
+        with self._lock:
+            key = self._find(self._hub(hub), deadline, now or datetime.now())
+            return Reservation(hub, key[0], key[1]) if key else None
+
+    def reserve(self, hub: str, deadline: Optional[date] = None, vehicle_id: Optional[str] = None,
+                now: Optional[datetime] = None) -> Optional[Reservation]:
+        """
+        Book the earliest free slot at `hub` on or before `deadline` (any day if None).
+        Returns None when nothing is free in that window.
+        """
+        now = now or datetime.now()
+        with self._lock:
+            held = self._by_vehicle.get(vehicle_id) if vehicle_id is not None else None
+            if held is not None:
+                if held.hub == hub and held.start >= now and (deadline is None or held.start.date() <= deadline):
+                    return held
+            h = self._hub(hub)
+            key = self._find(h, deadline, now)
+            if key is None:
+                return held if held is not None and held.hub == hub and held.start >= now else None
+            if held is not None:
+                self.release(held)
+                key = self._find(h, deadline, now)  # the released seat may now be the earliest
+            h.remaining[key] -= 1
+            res = Reservation(hub, key[0], key[1], vehicle_id)
+            if vehicle_id is not None:
+                self._by_vehicle[vehicle_id] = res
+            self.reservations += 1
+            return res
+
+    def free_slots(self, hub: str, deadline: Optional[date] = None, limit: int = 6,
+                   now: Optional[datetime] = None) -> List[Reservation]:
+        """
+        Up to `limit` free slot times at `hub` in time order, e.g. alternatives to offer
+        the owner. One entry per start time (its lowest free bay): the other bays of a
+        time are the same offer.
+        """
+        now = now or datetime.now()
+        with self._lock:
+            h = self._hub(hub)
+            first = self._find(h, deadline, now)
+            if first is None:
+                return []
+            out = []
+            day = first[0].date()
+            last_day = deadline if deadline is not None else h.days_until
+            while day <= last_day and len(out) < limit:
+                for t in self.slot_times:
+                    start = datetime.combine(day, t)
+                    if start < first[0]:
+                        continue
+                    for bay in range(1, h.bays + 1):
+                        if h.remaining.get((start, bay), 0) > 0:
+                            out.append(Reservation(hub, start, bay))
+                            break
+                day += timedelta(days=1)
+            return out[:limit]
+
+    def _free_seats(self, h: _Hub, need: int, now: datetime) -> List[Tuple[datetime, int]]:
+        """Free seats in time order (a slot with room for two appears twice), at least `need` if possible."""
+        first_day = self._first_day(now)
+        last_day = now.date() + timedelta(days=self.max_days)
+        seats = []
+        day = first_day
+        while len(seats) < need and day <= last_day:
+            if h.days_until is None or day > h.days_until:
+                self._extend(h, min(last_day, day + timedelta(days=6)), first_day)
+            for t in self.slot_times:
+                start = datetime.combine(day, t)
+                for bay in range(1, h.bays + 1):
+                    left = h.remaining.get((start, bay), 0)
+                    if left > 0:
+                        seats.extend([(start, bay)] * left)
+            day += timedelta(days=1)
+        return seats
+
+    def assign_batch(self, requests, now: Optional[datetime] = None) -> List[Optional[Reservation]]:
+        """
+        Book seats for many vehicles in one pass. `requests` is a sequence of
+        (vehicle_id, hub, deadline, priority) with priority 0 the most urgent.
+
+        Per hub this is Moore-Hodgson for unit-length jobs: take vehicles in deadline
+        order and, whenever more are accepted than there are seats up to the current
+        deadline, give up the least urgent one. The accepted set is the one that keeps
+        the most urgent vehicles within their SLA (Critical before High before Moderate).
+        It is first packed as late as its deadlines allow, so the vehicles that cannot
+        make their SLA get the earliest seats left over, most urgent first; the accepted
+        set then takes the remaining seats in deadline order, which never moves one past
+        its deadline. Vehicles that already hold a seat are rescheduled. Returns one
+        Reservation (or None if no seat is left within max_days) per request, in input
+        order.
+        """
+        now = now or datetime.now()
+        out: List[Optional[Reservation]] = [None] * len(requests)
+        by_hub: Dict[str, List[int]] = {}
+        for i, req in enumerate(requests):
+            by_hub.setdefault(req[1], []).append(i)
+
+        with self._lock:
+            for vehicle_id, *_ in requests:
+                held = self._by_vehicle.get(vehicle_id) if vehicle_id is not None else None
+                if held is not None:
+                    self.release(held)
+
+            for hub, idxs in by_hub.items():
+                h = self._hub(hub)
+                seats = self._free_seats(h, len(idxs), now)
+                seat_days = [start.date() for start, _ in seats]
+
+                idxs.sort(key=lambda i: (requests[i][2], requests[i][3]))
+                accepted = []  # max-heap on (priority, deadline): the first vehicle to give up on top
+                late = []
+                for i in idxs:
+                    _, _, deadline, priority = requests[i]
+                    heapq.heappush(accepted, (-priority, -deadline.toordinal(), -i))
+                    if len(accepted) > bisect_right(seat_days, deadline):
+                        late.append(-heapq.heappop(accepted)[2])
+                on_time = sorted((-e[2] for e in accepted), key=lambda i: (requests[i][2], requests[i][3]))
+
+                # pack the on-time vehicles as late as possible; prev[k] leads to the last free seat <= k
+                prev = list(range(len(seats)))
+
+                def last_free(k):
+                    root = k
+                    while root >= 0 and prev[root] != root:
+                        root = prev[root]
+                    while k >= 0 and prev[k] != k:
+                        prev[k], k = root, prev[k]
+                    return root
+
+                held_late = set()
+                for i in reversed(on_time):
+                    k = last_free(bisect_right(seat_days, requests[i][2]) - 1)
+                    held_late.add(k)
+                    prev[k] = k - 1
+
+                late.sort(key=lambda i: (requests[i][3], requests[i][2]))
+                free = (k for k in range(len(seats)) if k not in held_late)
+                plan = list(zip(late, free))
+                taken = {k for _, k in plan}
+                rest = [k for k in range(len(seats)) if k not in taken]
+                plan += zip(on_time, rest)
+                for i, k in plan:
+                    seat = seats[k]
+                    h.remaining[seat] -= 1
+                    res = out[i] = Reservation(hub, seat[0], seat[1], requests[i][0])
+                    if res.vehicle_id is not None:
+                        self._by_vehicle[res.vehicle_id] = res
+                    self.reservations += 1
+        return out
+
+    def release(self, res: Reservation):
+        """Give a reserved seat back; it becomes bookable again if it has not started."""
+        with self._lock:
+            if res.vehicle_id is not None and self._by_vehicle.get(res.vehicle_id) == res:
+                del self._by_vehicle[res.vehicle_id]
+            self._release(res)
+
+    def reservation_for(self, vehicle_id: str) -> Optional[Reservation]:
+        with self._lock:
+            return self._by_vehicle.get(vehicle_id)
+
+    def remaining(self, hub: str, start: datetime, bay: int) -> int:
+        with self._lock:
+            h = self._hub(hub)
+            if h.days_until is None or start.date() > h.days_until:
+                valid = start.time() in self.slot_times and 1 <= bay <= h.bays
+                return self.capacity_per_slot if valid else 0
+            return h.remaining.get((start, bay), 0)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hubs": len(self._hubs),
+                "vehicles_booked": len(self._by_vehicle),
+                "reservations": self.reservations,
+                "releases": self.releases,
+            }
+
+
+# shared instance used by app.py and the agents
+SLOT_INVENTORY = SlotInventory()
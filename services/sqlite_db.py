@@ -0,0 +1,242 @@
+# services/sqlite_db.py
+"""
+SQLite backend with the same API as DatabaseManager (get_vehicle, list_vehicles,
+update_vehicle_history, set_status).
+
+Vehicles and history entries live in their own tables, indexed on vehicle_id,
+status and history date. Bookings also record the date of the booked slot
+(slot_date, indexed), so queries such as "all vehicles with a service scheduled
+this week" run in SQLite instead of loading the whole store into memory.
+Databases created before slot_date existed are migrated on open.
+
+One-shot migration from the JSON store:
+    python -m services.sqlite_db vehicle_database.json vehicle_database.db
+"""
+import json
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from services.db_manager import DEFAULT_DB, read_store
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS vehicles (
+    vehicle_id TEXT PRIMARY KEY,
+    owner      TEXT NOT NULL DEFAULT '',
+    phone      TEXT NOT NULL DEFAULT '',
+    model      TEXT NOT NULL DEFAULT '',
+    status     TEXT NOT NULL DEFAULT '',
+    extra      TEXT NOT NULL DEFAULT '{}'
+);
+CREATE TABLE IF NOT EXISTS history (
+    id         INTEGER PRIMARY KEY AUTOINCREMENT,
+    vehicle_id TEXT NOT NULL REFERENCES vehicles(vehicle_id),
+    date       TEXT NOT NULL,
+    issue      TEXT,
+    action     TEXT,
+    slot_date  TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_vehicles_status ON vehicles(status);
+CREATE INDEX IF NOT EXISTS idx_history_vehicle_date ON history(vehicle_id, date);
+CREATE INDEX IF NOT EXISTS idx_history_date ON history(date);
+"""
+# after the migration below, which adds the column to older databases
+SLOT_INDEX = "CREATE INDEX IF NOT EXISTS idx_history_slot_date ON history(slot_date)"
+SLOT_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+VEHICLE_COLUMNS = ("owner", "phone", "model", "status")
+
+
+def _slot_text(slot) -> Optional[str]:
+    if slot is None or isinstance(slot, str):
+        return slot
+    return slot.strftime(SLOT_FORMAT)
+
+
+def slot_from_action(action: Optional[str], booked: str) -> Optional[str]:
+    """
+    Slot date of a history entry written by SchedulingAgent.book_service before
+    slots were stored ("Scheduled Service (Mon 05 Jan - 09:30 AM, bay 1)"). The
+    text has no year: it is the first one that puts the slot on or after `booked`.
+    """
+    if not action or not action.startswith("Scheduled Service ("):
+        return None
+    try:
+        when = datetime.strptime(action[len("Scheduled Service ("):].split(",", 1)[0], "%a %d %b - %I:%M %p")
+        booked_at = datetime.strptime(booked[:10], "%Y-%m-%d")
+    except ValueError:
+        return None
+    for year in (booked_at.year, booked_at.year + 1):
+        try:
+            slot = when.replace(year=year)
+        except ValueError:  # 29 Feb
+            continue
+        if slot.date() >= booked_at.date():
+            return slot.strftime(SLOT_FORMAT)
+    return None
+
+
+class SqliteDatabaseManager:
+    def __init__(self, db_file: str = "vehicle_database.db", seed: bool = True):
+        self.db_file = Path(db_file)
+        # one connection per manager, shared by Streamlit session threads behind a lock
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.db_file), check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._ensure_db(seed)
+
+    def _ensure_db(self, seed: bool):
+        with self._lock, self.conn:
+            self.conn.executescript(SCHEMA)
+            columns = {r["name"] for r in self.conn.execute("PRAGMA table_info(history)")}
+            if "slot_date" not in columns:
+                self.conn.execute("ALTER TABLE history ADD COLUMN slot_date TEXT")
+                rows = self.conn.execute(
+                    "SELECT id, date, action FROM history WHERE substr(action, 1, 19) = 'Scheduled Service ('"
+                ).fetchall()
+                self.conn.executemany(
+                    "UPDATE history SET slot_date = ? WHERE id = ?",
+                    [(slot_from_action(r["action"], r["date"]), r["id"]) for r in rows],
+                )
+            self.conn.execute(SLOT_INDEX)
+            empty = self.conn.execute("SELECT 1 FROM vehicles LIMIT 1").fetchone() is None
+        if empty and seed:
+            self.import_records(DEFAULT_DB)
+
+    def import_records(self, data: Dict[str, Dict[str, Any]]):
+        """Bulk insert vehicles (JSON-store layout: id -> {owner, ..., history: [...]}) in one transaction."""
+        with self._lock, self.conn:
+            for vehicle_id, rec in data.items():
+                extra = {k: v for k, v in rec.items() if k not in VEHICLE_COLUMNS and k != "history"}
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO vehicles (vehicle_id, owner, phone, model, status, extra) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (vehicle_id, *(rec.get(c, "") for c in VEHICLE_COLUMNS), json.dumps(extra, ensure_ascii=False)),
+                )
+                self.conn.execute("DELETE FROM history WHERE vehicle_id = ?", (vehicle_id,))
+                self.conn.executemany(
+                    "INSERT INTO history (vehicle_id, date, issue, action, slot_date) VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (vehicle_id, h.get("date", ""), h.get("issue"), h.get("action"),
+                         h.get("slot") or slot_from_action(h.get("action"), h.get("date", "")))
+                        for h in rec.get("history", [])
+                    ],
+                )
+
+    def _vehicle_dict(self, row: sqlite3.Row) -> Dict[str, Any]:
+        rec = {c: row[c] for c in VEHICLE_COLUMNS}
+        rec.update(json.loads(row["extra"]))
+        return rec
+
+    # ------------------ DatabaseManager API ------------------ #
+    def get_vehicle(self, vehicle_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self.conn.execute("SELECT * FROM vehicles WHERE vehicle_id = ?", (vehicle_id,)).fetchone()
+            if row is None:
+                return None
+            history = self.conn.execute(
+                "SELECT date, issue, action, slot_date AS slot FROM history WHERE vehicle_id = ? ORDER BY date, id",
+                (vehicle_id,),
+            ).fetchall()
+        rec = self._vehicle_dict(row)
+        # same entry shape as the JSON store: "slot" only on entries that booked one
+        rec["history"] = [{k: h[k] for k in h.keys() if k != "slot" or h[k] is not None} for h in history]
+        return rec
+
+    def list_vehicles(self):
+        with self._lock:
+            return [r[0] for r in self.conn.execute("SELECT vehicle_id FROM vehicles ORDER BY rowid")]
+
+    def update_vehicle_history(self, vehicle_id: str, issue: str, action: str, slot=None):
+        """`slot`: start of the booked service slot (datetime or 'YYYY-MM-DD HH:MM:SS'), if this entry books one."""
+        date = time.strftime("%Y-%m-%d %H:%M:%S")
+        with self._lock, self.conn:
+            # create minimal record if unknown
+            self.conn.execute(
+                "INSERT OR IGNORE INTO vehicles (vehicle_id, owner, status) VALUES (?, 'Unknown', 'Unknown')",
+                (vehicle_id,),
+            )
+            self.conn.execute(
+                "INSERT INTO history (vehicle_id, date, issue, action, slot_date) VALUES (?, ?, ?, ?, ?)",
+                (vehicle_id, date, issue, action, _slot_text(slot)),
+            )
+            if action:
+                self.conn.execute("UPDATE vehicles SET status = ? WHERE vehicle_id = ?", (action, vehicle_id))
+
+    def set_status(self, vehicle_id: str, status: str):
+        with self._lock, self.conn:
+            self.conn.execute("UPDATE vehicles SET status = ? WHERE vehicle_id = ?", (status, vehicle_id))
+
+    def save(self):
+        # every mutation is already committed; kept for API compatibility
+        pass
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    # ------------------ indexed queries ------------------ #
+    def vehicles_with_status(self, status: str, prefix: bool = False) -> List[str]:
+        """Vehicle ids whose status equals `status` (or starts with it when prefix=True)."""
+        with self._lock:
+            if prefix:
+                # range scan on idx_vehicles_status
+                rows = self.conn.execute(
+                    "SELECT vehicle_id FROM vehicles WHERE status >= ? AND status < ?",
+                    (status, status + "\U0010ffff"),
+                )
+            else:
+                rows = self.conn.execute("SELECT vehicle_id FROM vehicles WHERE status = ?", (status,))
+            return [r[0] for r in rows]
+
+    def history_between(self, start: str, end: str, action_prefix: Optional[str] = None,
+                        vehicle_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        History entries with start <= date < end (dates as 'YYYY-MM-DD[ HH:MM:SS]' strings),
+        optionally limited to one vehicle and/or actions starting with `action_prefix`.
+        """
+        sql = "SELECT vehicle_id, date, issue, action FROM history WHERE date >= ? AND date < ?"
+        args: List[Any] = [start, end]
+        if vehicle_id is not None:
+            sql += " AND vehicle_id = ?"
+            args.append(vehicle_id)
+        if action_prefix:
+            sql += " AND substr(action, 1, ?) = ?"
+            args += [len(action_prefix), action_prefix]
+        sql += " ORDER BY date, id"
+        with self._lock:
+            return [dict(r) for r in self.conn.execute(sql, args)]
+
+    def scheduled_between(self, start: str, end: str) -> List[str]:
+        """Distinct vehicles with a booked service slot in [start, end) (range scan on idx_history_slot_date)."""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT DISTINCT vehicle_id FROM history WHERE slot_date >= ? AND slot_date < ? ORDER BY vehicle_id",
+                (start, end),
+            )
+            return [r[0] for r in rows]
+
+
+def migrate_json_to_sqlite(json_file: str = "vehicle_database.json",
+                           sqlite_file: str = "vehicle_database.db") -> SqliteDatabaseManager:
+    """
+    Copy the JSON store (snapshot plus any pending journal) into a SQLite database.
+    The source is only read; a missing source raises FileNotFoundError.
+    """
+    data = read_store(json_file)
+    target = SqliteDatabaseManager(sqlite_file, seed=False)
+    target.import_records(data)
+    return target
+
+
+if __name__ == "__main__":
+    src = sys.argv[1] if len(sys.argv) > 1 else "vehicle_database.json"
+    dst = sys.argv[2] if len(sys.argv) > 2 else "vehicle_database.db"
+    db = migrate_json_to_sqlite(src, dst)
+    print(f"Migrated {len(db.list_vehicles())} vehicles from {src} to {dst}")
@@ -0,0 +1,135 @@
+# services/tts_cache.py
+"""
+Content-addressed on-disk cache of synthesized speech.
+
+Most replies repeat word for word (the assistant's help text, booking
+confirmations), so each distinct (text, voice, rate) is rendered to an audio
+file once and played from disk afterwards. Files are named by the SHA-256 of
+the normalised text and the voice settings, the directory is bounded by
+max_bytes and the least recently used files are evicted first. An existing
+directory is picked up on start, oldest access first.
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+DEFAULT_CACHE_DIR = ".tts_cache"
+AUDIO_SUFFIX = ".wav"
+TMP_MARKER = ".tmp"  # renders in progress: <key>.wav.<pid>.<thread>.tmp.wav
+STALE_TMP_S = 3600
+
+
+def utterance_key(text: str, voice: Optional[str], rate: int) -> str:
+    normalised = " ".join(text.split())
+    return hashlib.sha256(f"{voice or ''}\0{rate}\0{normalised}".encode("utf-8")).hexdigest()
+
+
+class AudioCache:
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, max_bytes: int = 256 << 20):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, int]" = OrderedDict()  # key -> size, least recently used first
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+        self._scan()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + AUDIO_SUFFIX)
+
+    def _scan(self):
+        found = []
+        now = time.time()
+        for entry in os.scandir(self.directory):
+            if not entry.is_file() or not entry.name.endswith(AUDIO_SUFFIX):
+                continue
+            st = entry.stat()
+            if TMP_MARKER in entry.name:
+                # not a cache entry; another process may still be rendering it, so only old ones are removed
+                if now - st.st_mtime > STALE_TMP_S:
+                    try:
+                        os.remove(entry.path)
+                    except OSError:
+                        pass
+                continue
+            found.append((st.st_atime, entry.name[: -len(AUDIO_SUFFIX)], st.st_size))
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self.bytes += size
+        self._evict()
+
+    def _evict(self):
+        while self.bytes > self.max_bytes and len(self._entries) > 1:
+            key, size = self._entries.popitem(last=False)
+            self.bytes -= size
+            self.evictions += 1
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            if key not in self._entries:
+                return None
+            path = self._path(key)
+            if not os.path.exists(path):  # removed behind our back
+                self.bytes -= self._entries.pop(key)
+                return None
+            self._entries.move_to_end(key)
+        try:
+            os.utime(path)  # keeps the LRU order across restarts
+        except OSError:
+            pass
+        return path
+
+    def get_or_render(self, text: str, voice: Optional[str], rate: int,
+                      render: Callable[[str, str], None]) -> Optional[str]:
+        """
+        Path of the audio for this utterance, calling render(text, path) to create it
+        on a miss. Returns None if the renderer produced nothing.
+        """
+        key = utterance_key(text, voice, rate)
+        path = self.get(key)
+        if path is not None:
+            with self._lock:
+                self.hits += 1
+            return path
+
+        with self._lock:
+            self.misses += 1
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}{TMP_MARKER}{AUDIO_SUFFIX}"  # the driver picks the format by suffix
+        try:
+            render(text, tmp)
+            if not os.path.exists(tmp) or os.path.getsize(tmp) == 0:
+                return None
+            os.replace(tmp, path)  # readers never see a half-written file
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        size = os.path.getsize(path)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old
+            self._entries[key] = size
+            self.bytes += size
+            self._evict()
+        return path
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,275 @@
+# services/tts_worker.py
+"""
+One long-lived speech worker per process.
+
+pyttsx3 engines are not thread-safe, so starting a thread per reply that calls
+runAndWait() on a shared engine both races and piles up threads under load.
+Here a single daemon thread owns the engine and takes utterances from a small
+bounded queue:
+
+- a new reply on the same channel replaces the one still waiting (superseded),
+- utterances older than max_age_s when their turn comes are dropped (stale),
+- when the queue is full the oldest waiting utterance makes room (overflow),
+
+so producers never block, the thread count stays at one and a burst of replies
+only ever costs the latest few. The backend is pluggable: pyttsx3 for real
+speech (by default through the on-disk audio cache, so repeated replies are
+not synthesized again), a file sink that appends transcripts, or a no-op for
+headless servers.
+"""
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional, Tuple
+
+from services.tts_cache import AudioCache
+
+
+# ------------------ BACKENDS ------------------ #
+class NullBackend:
+    name = "null"
+
+    def say(self, text: str):
+        pass
+
+    def close(self):
+        pass
+
+
+class FileSinkBackend:
+    """Appends one line per utterance to a transcript file."""
+
+    name = "file"
+
+    def __init__(self, path: str = "tts_transcript.log"):
+        self.path = path
+
+    def say(self, text: str):
+        with open(self.path, "a", encoding="utf-8") as fh:
+            fh.write(f"{time.strftime('%Y-%m-%d %H:%M:%S')}\t{' '.join(text.split())}\n")
+
+    def close(self):
+        pass
+
+
+class Pyttsx3Backend:
+    name = "pyttsx3"
+
+    def __init__(self, rate: int = 150, voice: Optional[str] = None):
+        import pyttsx3  # only in the worker thread that owns the engine
+
+        self.engine = pyttsx3.init()
+        self.engine.setProperty("rate", rate)
+        if voice:
+            self.engine.setProperty("voice", voice)
+
+    def say(self, text: str):
+        self.engine.say(text)
+        self.engine.runAndWait()
+
+    def close(self):
+        try:
+            self.engine.stop()
+        except Exception:
+            pass
+
+
+def play_file(path: str) -> bool:
+    """Play an audio file with the platform's command-line player, if there is one."""
+    if sys.platform == "win32":
+        import winsound
+
+        winsound.PlaySound(path, winsound.SND_FILENAME)
+        return True
+    for player in ("afplay", "paplay", "aplay"):
+        exe = shutil.which(player)
+        if exe:
+            subprocess.run([exe, path], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+            return True
+    return False
+
+
+class CachedAudioBackend(Pyttsx3Backend):
+    """
+    Renders each distinct utterance to a file once (services.tts_cache) and plays
+    repeats from disk. Without an audio player the files are still produced, e.g.
+    for the dashboard to stream to the browser.
+    """
+
+    name = "cached"
+
+    def __init__(self, rate: int = 150, voice: Optional[str] = None, cache=None):
+        super().__init__(rate, voice)
+        self.rate = rate
+        self.voice = voice
+        self.cache = cache or shared_audio_cache()
+        self.last_path: Optional[str] = None
+
+    def _render(self, text: str, path: str):
+        self.engine.save_to_file(text, path)
+        self.engine.runAndWait()
+
+    def say(self, text: str):
+        path = self.last_path = self.cache.get_or_render(text, self.voice, self.rate, self._render)
+        if path is None or not play_file(path):
+            super().say(text)  # no file, or no player for it: speak directly
+
+
+def make_backend(kind: str = "auto", rate: int = 150, voice: Optional[str] = None, sink_path: Optional[str] = None):
+    """
+    'cached' (pyttsx3 rendered through the audio cache), 'pyttsx3', 'file', 'null'
+    or 'auto' (cached if pyttsx3 initialises, else no-op).
+    """
+    if kind == "null":
+        return NullBackend()
+    if kind == "file":
+        return FileSinkBackend(sink_path or "tts_transcript.log")
+    try:
+        if kind == "pyttsx3":
+            return Pyttsx3Backend(rate, voice)
+        return CachedAudioBackend(rate, voice)
+    except Exception as e:
+        if kind in ("pyttsx3", "cached"):
+            raise
+        print("pyttsx3 unavailable, speech disabled:", e)
+        return NullBackend()
+
+
+# ------------------ WORKER ------------------ #
+class _Utterance:
+    __slots__ = ("text", "channel", "queued_at", "done")
+
+    def __init__(self, text: str, channel: str, done: Optional[threading.Event]):
+        self.text = text
+        self.channel = channel
+        self.queued_at = time.monotonic()
+        self.done = done
+
+
+class SpeechWorker:
+    def __init__(self, backend_factory: Callable[[], object], maxsize: int = 4, max_age_s: float = 15.0):
+        self.backend_factory = backend_factory
+        self.maxsize = maxsize
+        self.max_age_s = max_age_s
+        self._queue: deque = deque()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self.backend = None
+        self.stats = {
+            "queued": 0,
+            "spoken": 0,
+            "silent": 0,  # handed to a NullBackend (e.g. 'auto' without pyttsx3): nothing was played
+            "superseded": 0,
+            "stale": 0,
+            "overflow": 0,
+            "failed": 0,
+        }
+
+    def _start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="speech-worker", daemon=True)
+            self._thread.start()
+
+    def submit(self, text: str, channel: str = "reply", done: Optional[threading.Event] = None) -> bool:
+        """Queue an utterance without blocking; returns False if the worker is closed."""
+        item = _Utterance(text, channel, done)
+        dropped = []
+        with self._cond:
+            if self._closed:
+                return False
+            for queued in self._queue:
+                if queued.channel == channel:
+                    self._queue.remove(queued)
+                    self.stats["superseded"] += 1
+                    dropped.append(queued)
+                    break
+            if len(self._queue) >= self.maxsize:
+                dropped.append(self._queue.popleft())
+                self.stats["overflow"] += 1
+            self._queue.append(item)
+            self.stats["queued"] += 1
+            self._start()
+            self._cond.notify()
+        for d in dropped:
+            if d.done is not None:
+                d.done.set()
+        return True
+
+    def say(self, text: str, channel: str = "reply") -> bool:
+        return self.submit(text, channel)
+
+    def speak(self, text: str, timeout: Optional[float] = None, channel: str = "reply") -> bool:
+        """Queue an utterance and wait until it has been spoken (or dropped)."""
+        done = threading.Event()
+        if not self.submit(text, channel, done):
+            return False
+        return done.wait(timeout)
+
+    def _run(self):
+        try:
+            self.backend = self.backend_factory()
+        except Exception as e:
+            print("TTS backend failed to start:", e)
+            self.backend = NullBackend()
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if not self._queue:
+                    break
+                item = self._queue.popleft()
+            try:
+                if time.monotonic() - item.queued_at > self.max_age_s:
+                    self.stats["stale"] += 1
+                    continue
+                self.backend.say(item.text)
+                self.stats["silent" if isinstance(self.backend, NullBackend) else "spoken"] += 1
+            except Exception as e:
+                self.stats["failed"] += 1
+                print("TTS speak failed:", e)
+            finally:
+                if item.done is not None:
+                    item.done.set()
+        self.backend.close()
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._queue)
+
+    def close(self, timeout: Optional[float] = 5.0):
+        """Speak what is queued, then stop the thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+_AUDIO_CACHE: Optional[AudioCache] = None
+
+
+def shared_audio_cache() -> AudioCache:
+    global _AUDIO_CACHE
+    with _WORKERS_LOCK:
+        if _AUDIO_CACHE is None:
+            _AUDIO_CACHE = AudioCache()
+        return _AUDIO_CACHE
+
+
+# shared workers, one per backend configuration, so Streamlit reruns reuse the same thread
+_WORKERS: Dict[Tuple, SpeechWorker] = {}
+_WORKERS_LOCK = threading.Lock()
+
+
+def shared_speech_worker(kind: str = "auto", rate: int = 150, voice: Optional[str] = None,
+                         sink_path: Optional[str] = None) -> SpeechWorker:
+    key = (kind, rate, voice, sink_path)
+    with _WORKERS_LOCK:
+        worker = _WORKERS.get(key)
+        if worker is None:
+            worker = _WORKERS[key] = SpeechWorker(lambda: make_backend(kind, rate, voice, sink_path))
+        return worker
@@ -0,0 +1,182 @@
+# services/ueba_events.py
+"""
+Compact, bounded event store for the UEBA monitor.
+
+Events live in parallel typed arrays (float timestamp, small-int codes for
+agent / action / resource / vehicle, one anomaly byte), about 20 bytes per event instead
+of a dict with a formatted time string and a meta dict. The arrays grow up to
+`capacity` and are then reused as a ring buffer, so a long-running monitor holds
+at most `capacity` events and logging does constant work. Optional meta dicts
+are kept only for the events that have one. Vehicle ids are open-ended, so their
+codes are reference-counted by the events holding them and recycled once the
+last such event is overwritten; the vehicle table is bounded by `capacity` too.
+
+A running anomaly count and an index of the anomalous events still in the
+buffer are maintained on every append, so neither needs a scan.
+"""
+import threading
+from array import array
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+# resources each agent normally touches; anything else is flagged as an anomaly
+DEFAULT_BASELINE_ACCESS: Dict[str, Set[str]] = {
+    "DataAnalysisAgent": {"telematics_stream", "maintenance_db"},
+    "DiagnosisAgent": {"analysis_results"},
+    "CustomerEngagementAgent": {"customer_profile", "analysis_results"},
+    "SchedulingAgent": {"scheduler_api", "customer_profile"},
+    "FeedbackAgent": {"feedback_db", "customer_profile"},
+    "ManufacturingInsightsAgent": {"maintenance_db", "rca_capa_db"},
+}
+
+
+class CodeTable:
+    """Interns strings to small ints (and back). Not thread-safe: callers hold their own lock."""
+
+    def __init__(self):
+        self.codes: Dict[str, int] = {}
+        self.names: List[Optional[str]] = []
+        self._free: List[int] = []  # released codes, reused before new ones
+
+    def code(self, name: str) -> int:
+        c = self.codes.get(name)
+        if c is None:
+            if self._free:
+                c = self._free.pop()
+                self.names[c] = name
+            else:
+                c = len(self.names)
+                self.names.append(name)
+            self.codes[name] = c
+        return c
+
+    def release(self, code: int):
+        """Forget a code that nothing refers to any more; it is handed out again later."""
+        name = self.names[code]
+        if name is not None:
+            del self.codes[name]
+            self.names[code] = None
+            self._free.append(code)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def lookup(self, name: str) -> Optional[int]:
+        return self.codes.get(name)
+
+
+class UebaEventRing:
+    def __init__(self, capacity: int = 4096):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.agents = CodeTable()
+        self.actions = CodeTable()
+        self.resources = CodeTable()
+        self.vehicles = CodeTable()
+        self._ts = array("d")
+        self._agent = array("H")
+        self._action = array("H")
+        self._resource = array("H")
+        self._vehicle = array("i")  # -1 when the event has no vehicle
+        self._anomaly = bytearray()
+        self._meta: Dict[int, Dict[str, Any]] = {}  # slot -> meta, only for events that carry one
+        self._vehicle_refs: Dict[int, int] = {}  # vehicle code -> held events with it
+        self._anomaly_seqs: deque = deque()  # sequence numbers of anomalies still in the buffer, oldest first
+        self._lock = threading.Lock()
+        self.total = 0  # events ever appended
+        self.total_anomalies = 0
+        self.anomaly_count = 0  # anomalies currently held
+
+    def __len__(self) -> int:
+        return min(self.total, self.capacity)
+
+    @property
+    def first_seq(self) -> int:
+        """Sequence number of the oldest event still held."""
+        return self.total - len(self)
+
+    def append(self, ts: float, agent: str, action: str, resource: str, anomaly: bool,
+               meta: Optional[Dict[str, Any]] = None, vehicle_id: Optional[str] = None) -> int:
+        """Store one event and return its sequence number."""
+        with self._lock:
+            seq = self.total
+            slot = seq % self.capacity
+            if seq >= self.capacity:
+                # release the overwritten event's vehicle first, so its code can be reused right away
+                old = self._vehicle[slot]
+                if old >= 0:
+                    left = self._vehicle_refs[old] - 1
+                    if left:
+                        self._vehicle_refs[old] = left
+                    else:
+                        del self._vehicle_refs[old]
+                        self.vehicles.release(old)
+            a, c, r = self.agents.code(agent), self.actions.code(action), self.resources.code(resource)
+            v = -1
+            if vehicle_id is not None:
+                v = self.vehicles.code(vehicle_id)
+                self._vehicle_refs[v] = self._vehicle_refs.get(v, 0) + 1
+            if seq < self.capacity:
+                self._ts.append(ts)
+                self._agent.append(a)
+                self._action.append(c)
+                self._resource.append(r)
+                self._vehicle.append(v)
+                self._anomaly.append(anomaly)
+            else:
+                # overwrite the oldest event
+                if self._anomaly[slot]:
+                    self.anomaly_count -= 1
+                    self._anomaly_seqs.popleft()
+                self._meta.pop(slot, None)
+                self._ts[slot] = ts
+                self._agent[slot] = a
+                self._action[slot] = c
+                self._resource[slot] = r
+                self._vehicle[slot] = v
+                self._anomaly[slot] = anomaly
+            if meta:
+                self._meta[slot] = meta
+            if anomaly:
+                self.anomaly_count += 1
+                self.total_anomalies += 1
+                self._anomaly_seqs.append(seq)
+            self.total = seq + 1
+            self._on_append(seq, slot)
+            return seq
+
+    def _on_append(self, seq: int, slot: int):
+        """Hook for subclasses that maintain extra indexes; called with the lock held."""
+
+    def event(self, seq: int) -> Dict[str, Any]:
+        """Expand one held event into the dict shape the dashboard shows."""
+        slot = seq % self.capacity
+        ts = self._ts[slot]
+        v = self._vehicle[slot]
+        return {
+            "seq": seq,
+            "time": datetime.fromtimestamp(ts).strftime("%H:%M:%S"),
+            "ts": ts,
+            "agent": self.agents.names[self._agent[slot]],
+            "action": self.actions.names[self._action[slot]],
+            "resource": self.resources.names[self._resource[slot]],
+            "vehicle_id": self.vehicles.names[v] if v >= 0 else None,
+            "anomaly": bool(self._anomaly[slot]),
+            "meta": self._meta.get(slot, {}),
+        }
+
+    def events(self) -> Iterator[Dict[str, Any]]:
+        """Held events, oldest first."""
+        with self._lock:
+            seqs = range(self.first_seq, self.total)
+        for seq in seqs:
+            yield self.event(seq)
+
+    def anomaly_seqs(self) -> List[int]:
+        with self._lock:
+            return list(self._anomaly_seqs)
+
+    def anomalies(self) -> List[Dict[str, Any]]:
+        return [self.event(seq) for seq in self.anomaly_seqs()]
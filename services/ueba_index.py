@@ -0,0 +1,238 @@
+# services/ueba_index.py
+"""
+Secondary indexes over UEBA events for agent / resource / vehicle / time queries.
+
+IndexedUebaEvents is a UebaEventRing that also keeps, for every agent, resource
+and vehicle code and for every time bucket, the ascending list of sequence
+numbers of the events it holds. A query starts from the smallest matching list
+and checks the remaining conditions on the columns, so "anomalies by
+SchedulingAgent on telematics_stream in the last hour" touches only the events
+of that agent (or that hour), never the whole buffer. Single-key counts come
+from the list lengths.
+
+Events evicted from the ring are dropped from the lists lazily: stale entries
+always sit at the front of a list, are skipped with a bisect, and are compacted
+away once per `capacity` appends.
+"""
+import math
+from bisect import bisect_left, bisect_right, insort
+from typing import Any, Dict, Iterable, List, Optional
+
+from services.ueba_events import UebaEventRing
+
+
+class _Postings:
+    """Ascending sequence numbers; entries before `head` are known to be evicted."""
+
+    __slots__ = ("seqs", "head")
+
+    def __init__(self):
+        self.seqs: List[int] = []
+        self.head = 0
+
+    def live(self, first_seq: int) -> int:
+        """Advance past evicted entries and return the index of the first live one."""
+        self.head = bisect_left(self.seqs, first_seq, lo=self.head)
+        return self.head
+
+    def compact(self, first_seq: int):
+        start = self.live(first_seq)
+        if start:
+            del self.seqs[:start]
+            self.head = 0
+
+    def count(self, first_seq: int) -> int:
+        return len(self.seqs) - self.live(first_seq)
+
+
+class IndexedUebaEvents(UebaEventRing):
+    def __init__(self, capacity: int = 4096, bucket_s: float = 60.0):
+        super().__init__(capacity)
+        self.bucket_s = bucket_s
+        self._by_agent: Dict[int, _Postings] = {}
+        self._by_resource: Dict[int, _Postings] = {}
+        self._by_vehicle: Dict[int, _Postings] = {}
+        self._buckets: Dict[int, _Postings] = {}
+        self._bucket_keys: List[int] = []  # sorted
+        self._since_compact = 0
+
+    # ------------------ maintenance ------------------ #
+    def _on_append(self, seq: int, slot: int):
+        for index, code in (
+            (self._by_agent, self._agent[slot]),
+            (self._by_resource, self._resource[slot]),
+            (self._by_vehicle, self._vehicle[slot]),
+        ):
+            if code < 0:
+                continue
+            postings = index.get(code)
+            if postings is None:
+                postings = index[code] = _Postings()
+            postings.seqs.append(seq)
+
+        key = math.floor(self._ts[slot] / self.bucket_s)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = _Postings()
+            if not self._bucket_keys or key > self._bucket_keys[-1]:
+                self._bucket_keys.append(key)
+            else:
+                insort(self._bucket_keys, key)
+        bucket.seqs.append(seq)
+
+        self._since_compact += 1
+        if self._since_compact >= self.capacity:
+            self._compact()
+
+    def _compact(self):
+        """Drop evicted entries everywhere; amortised O(1) per append."""
+        first = self.first_seq
+        for index in (self._by_agent, self._by_resource, self._by_vehicle, self._buckets):
+            for code in list(index):
+                postings = index[code]
+                postings.compact(first)
+                if not postings.seqs:
+                    del index[code]
+        self._bucket_keys = [k for k in self._bucket_keys if k in self._buckets]
+        self._since_compact = 0
+
+    # ------------------ queries ------------------ #
+    def _candidates(self, agent, resource, vehicle_id, anomaly, since, until):
+        """Smallest seq source for the filters, or None if some filter cannot match."""
+        first = self.first_seq
+        sources = []
+        for index, table, value in (
+            (self._by_agent, self.agents, agent),
+            (self._by_resource, self.resources, resource),
+            (self._by_vehicle, self.vehicles, vehicle_id),
+        ):
+            if value is None:
+                continue
+            code = table.lookup(value)
+            postings = index.get(code) if code is not None else None
+            if postings is None:
+                return None
+            start = postings.live(first)
+            sources.append((len(postings.seqs) - start, postings.seqs, start))
+        if anomaly:
+            sources.append((self.anomaly_count, self._anomaly_seqs, 0))
+        if since is not None or until is not None:
+            lo = 0 if since is None else bisect_left(self._bucket_keys, math.floor(since / self.bucket_s))
+            hi = len(self._bucket_keys) if until is None else bisect_right(self._bucket_keys, math.floor(until / self.bucket_s))
+            buckets = [self._buckets[k] for k in self._bucket_keys[lo:hi]]
+            size = sum(b.count(first) for b in buckets)
+            sources.append((size, buckets, None))
+        if not sources:
+            return [range(first, self.total)]
+        size, seqs, start = min(sources, key=lambda s: s[0])
+        if start is None:  # time buckets: several lists
+            return [b.seqs[b.head:] for b in seqs]
+        if isinstance(seqs, list):
+            return [seqs[start:]]
+        return [list(seqs)]
+
+    def _match(self, seq, agent_c, resource_c, vehicle_c, anomaly, since, until) -> bool:
+        slot = seq % self.capacity
+        if agent_c is not None and self._agent[slot] != agent_c:
+            return False
+        if resource_c is not None and self._resource[slot] != resource_c:
+            return False
+        if vehicle_c is not None and self._vehicle[slot] != vehicle_c:
+            return False
+        if anomaly is not None and bool(self._anomaly[slot]) != anomaly:
+            return False
+        ts = self._ts[slot]
+        if since is not None and ts < since:
+            return False
+        if until is not None and ts > until:
+            return False
+        return True
+
+    def _seqs(self, agent=None, resource=None, vehicle_id=None, anomaly=None, since=None, until=None) -> List[int]:
+        with self._lock:
+            sources = self._candidates(agent, resource, vehicle_id, anomaly, since, until)
+            if sources is None:
+                return []
+            agent_c = self.agents.lookup(agent) if agent is not None else None
+            resource_c = self.resources.lookup(resource) if resource is not None else None
+            vehicle_c = self.vehicles.lookup(vehicle_id) if vehicle_id is not None else None
+            first = self.first_seq
+            found = [
+                seq
+                for source in sources
+                for seq in source
+                if seq >= first and self._match(seq, agent_c, resource_c, vehicle_c, anomaly, since, until)
+            ]
+        if len(sources) > 1:
+            found.sort()
+        return found
+
+    def query(self, agent: Optional[str] = None, resource: Optional[str] = None, vehicle_id: Optional[str] = None,
+              anomaly: Optional[bool] = None, since: Optional[float] = None, until: Optional[float] = None,
+              limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Events matching every given filter (equality on agent / resource / vehicle_id /
+        anomaly, `since <= ts <= until` in epoch seconds), oldest first. With `limit`
+        only the most recent `limit` matches are returned.
+        """
+        seqs = self._seqs(agent, resource, vehicle_id, anomaly, since, until)
+        if limit is not None:
+            seqs = seqs[-limit:] if limit else []
+        return [self.event(seq) for seq in seqs]
+
+    def count(self, agent: Optional[str] = None, resource: Optional[str] = None, vehicle_id: Optional[str] = None,
+              anomaly: Optional[bool] = None, since: Optional[float] = None, until: Optional[float] = None) -> int:
+        """Number of matching events; a single equality filter is answered from index metadata."""
+        filters = [f for f in (agent, resource, vehicle_id) if f is not None]
+        if since is None and until is None:
+            if not filters and anomaly is None:
+                return len(self)
+            if not filters and anomaly:
+                return self.anomaly_count
+            if len(filters) == 1 and anomaly is None:
+                with self._lock:
+                    for index, table, value in (
+                        (self._by_agent, self.agents, agent),
+                        (self._by_resource, self.resources, resource),
+                        (self._by_vehicle, self.vehicles, vehicle_id),
+                    ):
+                        if value is not None:
+                            code = table.lookup(value)
+                            postings = index.get(code) if code is not None else None
+                            return postings.count(self.first_seq) if postings is not None else 0
+        return len(self._seqs(agent, resource, vehicle_id, anomaly, since, until))
+
+    def counts_by(self, field: str) -> Dict[str, int]:
+        """Live event count per agent, resource or vehicle_id, straight from the index."""
+        index, table = {
+            "agent": (self._by_agent, self.agents),
+            "resource": (self._by_resource, self.resources),
+            "vehicle_id": (self._by_vehicle, self.vehicles),
+        }[field]
+        with self._lock:
+            first = self.first_seq
+            # a released vehicle code has no name until it is reused (and no live events)
+            counts = {table.names[code]: p.count(first) for code, p in index.items() if table.names[code] is not None}
+        return {name: n for name, n in counts.items() if n}
+
+    def ingest(self, records: Iterable[Dict[str, Any]], baseline_access: Optional[Dict[str, set]] = None) -> int:
+        """
+        Load UEBA log records (e.g. services.ueba_stream.iter_records over data/ueba_log.json).
+        With `baseline_access` the anomaly flag is recomputed from it; otherwise the
+        record's own "anomaly" field is used.
+        """
+        from services.ueba_stream import _timestamp
+
+        n = 0
+        for rec in records:
+            agent = rec.get("agent", "")
+            resource = rec.get("resource", "")
+            if baseline_access is not None:
+                anomaly = resource not in baseline_access.get(agent, ())
+            else:
+                anomaly = bool(rec.get("anomaly"))
+            ts = _timestamp(rec.get("time"))
+            self.append(ts if ts is not None else 0.0, agent, rec.get("action", ""), resource, anomaly,
+                        vehicle_id=rec.get("vehicle_id"))
+            n += 1
+        return n
@@ -0,0 +1,181 @@
+# services/ueba_stream.py
+"""
+Offline UEBA analysis of large agent-activity logs in constant memory.
+
+Accepts either one big JSON array (like data/ueba_log.json) or JSON Lines, and
+decodes records incrementally from a fixed-size read buffer, so nothing close to
+the full file is ever held. Every record is checked against the monitor's
+baseline access map, and a sliding time window per (agent, resource) pair flags
+bursts of access above a rate limit.
+
+    python -m services.ueba_stream data/ueba_log.json --window 60 --max-events 20 --findings findings.jsonl
+"""
+import argparse
+import json
+import sys
+from collections import Counter, deque
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, Optional, Set, TextIO, Tuple
+
+from services.ueba_events import DEFAULT_BASELINE_ACCESS
+
+READ_SIZE = 1 << 16
+MAX_RECORD_CHARS = 1 << 20
+_SEPARATORS = " \t\r\n,[]"
+
+
+def iter_records(fh: TextIO, read_size: int = READ_SIZE, max_record_chars: int = MAX_RECORD_CHARS) -> Iterator[Dict[str, Any]]:
+    """
+    Yield JSON objects from a JSON array or a JSON Lines stream, one at a time.
+    Array brackets, commas and whitespace between objects are skipped, so both
+    formats go through the same decoder.
+    """
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+    while True:
+        # skip separators between records
+        while pos < len(buf) and buf[pos] in _SEPARATORS:
+            pos += 1
+        if pos >= len(buf):
+            if eof:
+                return
+            buf = fh.read(read_size)
+            pos = 0
+            eof = not buf
+            continue
+        try:
+            record, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            if len(buf) - pos > max_record_chars:
+                raise ValueError(f"record larger than {max_record_chars} characters")
+            # record straddles the buffer edge: keep the unread tail and read more
+            chunk = fh.read(read_size)
+            eof = not chunk
+            buf = buf[pos:] + chunk
+            pos = 0
+            continue
+        pos = end
+        yield record
+
+
+def _timestamp(value) -> Optional[float]:
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value).timestamp()
+        except ValueError:
+            return None
+    return None
+
+
+class RateWindow:
+    """
+    Per (agent, resource) sliding window. Each deque holds at most max_events + 1
+    timestamps, which is all that is needed to tell whether the limit is exceeded.
+    """
+
+    def __init__(self, window_s: float, max_events: int):
+        self.window_s = window_s
+        self.max_events = max_events
+        self._windows: Dict[Tuple[str, str], deque] = {}
+
+    def hit(self, key: Tuple[str, str], ts: float) -> int:
+        """Record an access; returns the number of accesses in the window (capped at max_events + 1)."""
+        win = self._windows.get(key)
+        if win is None:
+            win = self._windows[key] = deque(maxlen=self.max_events + 1)
+        while win and ts - win[0] > self.window_s:
+            win.popleft()
+        win.append(ts)
+        return len(win)
+
+
+class UebaStreamAnalyzer:
+    def __init__(self, baseline_access: Optional[Dict[str, Set[str]]] = None,
+                 window_s: float = 60.0, max_events: int = 20):
+        # the monitor's baseline, without importing the agent layer (and pandas) for it
+        self.baseline_access = DEFAULT_BASELINE_ACCESS if baseline_access is None else baseline_access
+        self.rate = RateWindow(window_s, max_events)
+        self.records = 0
+        self.findings = Counter()  # kind -> count
+        self.by_pair = Counter()  # (agent, resource) -> accesses
+        self.flagged_pairs = Counter()  # (agent, resource) -> findings
+
+    def check(self, record: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """Update the running statistics with one record and yield its findings."""
+        self.records += 1
+        agent = record.get("agent", "")
+        resource = record.get("resource", "")
+        key = (agent, resource)
+        self.by_pair[key] += 1
+
+        kinds = []
+        if resource not in self.baseline_access.get(agent, ()):
+            kinds.append("baseline")
+        if record.get("anomaly"):
+            kinds.append("recorded")
+        ts = _timestamp(record.get("time"))
+        if ts is not None and self.rate.hit(key, ts) > self.rate.max_events:
+            kinds.append("rate")
+
+        for kind in kinds:
+            self.findings[kind] += 1
+            self.flagged_pairs[key] += 1
+            yield {
+                "record": self.records,
+                "kind": kind,
+                "time": record.get("time"),
+                "agent": agent,
+                "action": record.get("action"),
+                "resource": resource,
+                "vehicle_id": record.get("vehicle_id"),
+            }
+
+    def run(self, records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        for record in records:
+            yield from self.check(record)
+
+    def summary(self, top: int = 10) -> Dict[str, Any]:
+        return {
+            "records": self.records,
+            "findings": dict(self.findings),
+            "top_flagged_pairs": [
+                {"agent": a, "resource": r, "findings": n, "accesses": self.by_pair[(a, r)]}
+                for (a, r), n in self.flagged_pairs.most_common(top)
+            ],
+        }
+
+
+def analyze_file(path: str, findings_out: Optional[TextIO] = None, **kwargs) -> Dict[str, Any]:
+    analyzer = UebaStreamAnalyzer(**kwargs)
+    with open(path, "r", encoding="utf-8") as fh:
+        for finding in analyzer.run(iter_records(fh)):
+            if findings_out is not None:
+                findings_out.write(json.dumps(finding, ensure_ascii=False) + "\n")
+    return analyzer.summary()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stream a UEBA log (JSON array or JSONL) and report anomalies.")
+    parser.add_argument("path")
+    parser.add_argument("--window", type=float, default=60.0, help="rate window in seconds")
+    parser.add_argument("--max-events", type=int, default=20, help="accesses per window before a pair is flagged")
+    parser.add_argument("--findings", help="write one JSON line per finding to this file ('-' for stdout)")
+    args = parser.parse_args()
+
+    out = None
+    if args.findings == "-":
+        out = sys.stdout
+    elif args.findings:
+        out = open(args.findings, "w", encoding="utf-8")
+    try:
+        summary = analyze_file(args.path, out, window_s=args.window, max_events=args.max_events)
+    finally:
+        if out is not None and out is not sys.stdout:
+            out.close()
+    print(json.dumps(summary, indent=2), file=sys.stderr)
@@ -0,0 +1,55 @@
+# tests/test_agent_dag.py
+import threading
+
+import pytest
+
+from agents.agent_dag import AgentDAG
+
+
+def _dag(calls):
+    lock = threading.Lock()
+
+    def record(name, value):
+        with lock:
+            calls.append(name)
+        return value
+
+    dag = AgentDAG()
+    dag.node("a", lambda x: record("a", x + 1), inputs=["x"])
+    dag.node("b", lambda a: record("b", a * 2), inputs=["a"])
+    dag.node("c", lambda a, b: record("c", a + b), inputs=["a", "b"])
+    dag.node("side", lambda: record("side", "expensive"))
+    return dag
+
+
+def test_run_executes_every_node_in_dependency_order():
+    calls = []
+    run = _dag(calls).run(x=1)
+    assert run.values == {"a": 2, "b": 4, "c": 6, "side": "expensive"}
+    assert calls.index("a") < calls.index("b") < calls.index("c")
+    assert set(run.timings) == {"a", "b", "c", "side"}
+
+
+def test_run_skips_nodes_the_requested_outputs_do_not_need():
+    calls = []
+    run = _dag(calls).run(outputs=["b"], x=1)
+    assert sorted(calls) == ["a", "b"]
+    assert run["b"] == 4 and "side" not in run.values and "c" not in run.values
+    assert set(run.timings) == {"a", "b"}
+
+
+def test_run_rejects_unknown_outputs_and_cycles():
+    with pytest.raises(ValueError):
+        _dag([]).run(outputs=["nope"], x=1)
+    dag = AgentDAG()
+    dag.node("p", lambda q: q, inputs=["q"])
+    dag.node("q", lambda p: p, inputs=["p"])
+    with pytest.raises(ValueError):
+        dag.run()
+
+
+def test_node_errors_propagate():
+    dag = AgentDAG()
+    dag.node("boom", lambda: 1 / 0)
+    with pytest.raises(ZeroDivisionError):
+        dag.run()
@@ -0,0 +1,42 @@
+# tests/test_agentic_layer.py
+from datetime import datetime, timedelta
+
+from agents.agentic_layer import SchedulingAgent, UebaMonitor
+from services.slot_inventory import SlotInventory
+
+
+def _schedule(sla_days):
+    agent = SchedulingAgent(UebaMonitor(), SlotInventory(bays_per_hub=2))
+    return agent, agent.schedule("Pune", {"sla_days": sla_days})
+
+
+def test_schedule_offers_every_time_up_to_the_sla_date():
+    _, out = _schedule(2)
+    days = {datetime.now().date() + timedelta(days=d) for d in (1, 2)}
+    assert len(out["all_slots"]) == 6
+    assert {label.split(" –")[0] for label in out["all_slots"]} == {d.strftime("%d %b") for d in days}
+    assert out["sla_met"] and out["proposed_slot"] == out["all_slots"][0]
+
+
+def test_schedule_caps_alternatives_at_a_week_and_reserves_nothing():
+    agent, out = _schedule(15)
+    assert len(out["all_slots"]) == 3 * SchedulingAgent.ALTERNATIVE_DAYS
+    assert agent.inventory.stats()["reservations"] == 0
+
+
+PAYLOAD = {
+    "vehicle_id": "V001", "owner_name": "Asha", "make": "Tata", "model": "Nexon", "city": "Pune",
+    "engine_temp": 104, "brake_health": 40, "battery_health": 70, "tyre_pressure": 29, "mileage": 60000, "year": 2019,
+}
+
+
+def test_orchestrate_skips_manufacturing_insights_unless_asked():
+    from agents.agentic_layer import master_orchestrate
+
+    lean = master_orchestrate(dict(PAYLOAD), use_cache=False, manufacturing=False)
+    assert "manufacturing" not in lean and "manufacturing" not in lean["timings"]
+    assert lean["schedule"]["proposed_slot"] and lean["voice_script"]
+
+    full = master_orchestrate(dict(PAYLOAD), use_cache=False)
+    assert full["manufacturing"]["bullets"] and "manufacturing" in full["timings"]
+    assert full["schedule"]["proposed_slot"] == lean["schedule"]["proposed_slot"]
@@ -0,0 +1,117 @@
+# tests/test_api_server.py
+import asyncio
+import math
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pytest
+
+from agents.agentic_layer import DataAnalysisAgent, UebaMonitor
+from run_api_server import ApiServer, HttpError, ScoreBatcher, _check_telematics
+
+ROW = {"engine_temp": 104, "brake_health": 40, "battery_health": 70, "tyre_pressure": 29, "mileage": 60000, "year": 2019}
+
+
+def _rows(n):
+    return [dict(ROW, vehicle_id=f"V{i:03d}", brake_health=20 + i) for i in range(n)]
+
+
+class _FlakyAgent:
+    """analyze_fleet fails for any batch that contains vehicle "BAD"."""
+
+    TELEMATICS_COLUMNS = DataAnalysisAgent.TELEMATICS_COLUMNS
+
+    def __init__(self):
+        self.agent = DataAnalysisAgent(UebaMonitor())
+        self.calls = 0
+
+    def analyze_fleet(self, frame):
+        self.calls += 1
+        if (frame["vehicle_id"] == "BAD").any():
+            raise ValueError("sensor fault")
+        return self.agent.analyze_fleet(frame)
+
+
+async def _score_all(batcher, rows):
+    return await asyncio.wait_for(
+        asyncio.gather(*(batcher.score(r) for r in rows), return_exceptions=True), timeout=10
+    )
+
+
+def test_concurrent_requests_are_scored_in_one_batch():
+    rows = _rows(20)
+    with ThreadPoolExecutor(1) as pool:
+        batcher = ScoreBatcher(DataAnalysisAgent(UebaMonitor()), pool, max_batch=64, max_delay_s=0.05)
+        results = asyncio.run(_score_all(batcher, rows))
+        expected = batcher.score_rows(rows)
+    assert batcher.stats()["batches"] == 1 and batcher.stats()["largest_batch"] == 20
+    assert results == expected
+    assert [r["vehicle_id"] for r in results] == [r["vehicle_id"] for r in rows]
+
+
+def test_batches_split_at_max_batch():
+    with ThreadPoolExecutor(1) as pool:
+        batcher = ScoreBatcher(DataAnalysisAgent(UebaMonitor()), pool, max_batch=8, max_delay_s=0.05)
+        results = asyncio.run(_score_all(batcher, _rows(20)))
+    assert len(results) == 20 and batcher.stats()["batches"] == 3 and batcher.stats()["largest_batch"] == 8
+
+
+def test_a_failing_row_only_fails_its_own_request():
+    rows = _rows(5)
+    rows[2]["vehicle_id"] = "BAD"
+    agent = _FlakyAgent()
+    with ThreadPoolExecutor(1) as pool:
+        batcher = ScoreBatcher(agent, pool, max_batch=64, max_delay_s=0.05)
+        results = asyncio.run(_score_all(batcher, rows))
+    assert isinstance(results[2], ValueError)
+    assert [r["vehicle_id"] for i, r in enumerate(results) if i != 2] == ["V000", "V001", "V003", "V004"]
+    assert batcher.stats()["fallbacks"] == 1 and agent.calls == 1 + len(rows)
+
+
+class _ShutDownExecutor(ThreadPoolExecutor):
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        future.cancel()
+        return future
+
+
+def test_cancelled_batch_cancels_its_requests():
+    errors = []
+
+    async def main():
+        asyncio.get_running_loop().set_exception_handler(lambda loop, context: errors.append(context))
+        batcher = ScoreBatcher(DataAnalysisAgent(UebaMonitor()), _ShutDownExecutor(1), max_delay_s=0.001)
+        return await _score_all(batcher, _rows(3))
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, asyncio.CancelledError) for r in results)
+    assert errors == []
+
+
+@pytest.mark.parametrize("value", [math.nan, math.inf, True, "12"])
+def test_telematics_must_be_finite_numbers(value):
+    with pytest.raises(HttpError) as info:
+        _check_telematics(dict(ROW, brake_health=value))
+    assert info.value.status == 400
+
+
+@pytest.fixture
+def api(tmp_path):
+    server = ApiServer(str(tmp_path / "vehicles.json"))
+    yield server
+    server.close()
+
+
+@pytest.mark.parametrize("value", ["nan", float("nan"), float("inf"), True, False, "2.5", None])
+def test_brake_event_rejects_non_finite_and_non_numeric_readings(api, value):
+    body = {"vehicle_id": "MH-01-AB-1234", "brake_sensor_mm": value}
+    with pytest.raises(HttpError) as info:
+        asyncio.run(api.brake_event(body, {}))
+    assert info.value.status == 400
+
+
+def test_brake_event_runs_the_flow_for_a_valid_reading(api):
+    flow = asyncio.run(api.brake_event({"vehicle_id": "MH-01-AB-1234", "brake_sensor_mm": 7.5}, {}))
+    assert flow["status"] == "no_issue"
+    with pytest.raises(HttpError) as info:
+        asyncio.run(api.brake_event({"vehicle_id": "NOPE", "brake_sensor_mm": 7}, {}))
+    assert info.value.status == 404
@@ -0,0 +1,50 @@
+# tests/test_brake_stream.py
+import numpy as np
+import pytest
+
+from agents.brake_stream import BrakeEventStream
+from agents.diagnosis_simple import BRAKE_ISSUE, BRAKE_PAD_MIN_MM
+
+
+def _reference(readings, hysteresis_mm=0.25):
+    """One reading at a time: worn below the limit, ok from limit + hysteresis, else unchanged."""
+    worn, out = {}, []
+    for seq, (vid, mm) in enumerate(readings):
+        before = worn.get(vid, False)
+        now = True if mm < BRAKE_PAD_MIN_MM else False if mm >= BRAKE_PAD_MIN_MM + hysteresis_mm else before
+        worn[vid] = now
+        if now != before:
+            out.append((vid, BRAKE_ISSUE if now else None, seq))
+    return out
+
+
+def test_hovering_sensor_does_not_flap():
+    stream = BrakeEventStream(window=3)
+    readings = [("V1", 3.5), ("V1", 2.9), ("V1", 3.1), ("V1", 2.95), ("V1", 3.2), ("V1", 3.3), ("V1", 3.1)]
+    events = [(t.vehicle_id, t.issue, t.seq) for t in stream.run(readings)]
+    assert events == [("V1", BRAKE_ISSUE, 1), ("V1", None, 5)]
+    assert not stream.is_worn("V1")
+
+
+def test_band_reading_for_a_new_vehicle_keeps_it_ok():
+    stream = BrakeEventStream()
+    assert list(stream.run([("V9", 3.1), ("V9", 3.2)])) == []
+    assert not stream.is_worn("V9")
+
+
+@pytest.mark.parametrize("window", [1, 5, 64, 4096])
+def test_windows_match_reading_by_reading(window):
+    rng = np.random.default_rng(11)
+    vids = [f"V{v}" for v in rng.integers(0, 40, 3000)]
+    mm = np.round(rng.uniform(2.5, 3.6, 3000), 2)  # mostly around the limit and inside the band
+    readings = list(zip(vids, mm.tolist()))
+    stream = BrakeEventStream(window=window)
+    got = [(t.vehicle_id, t.issue, t.seq) for t in stream.run(readings)]
+    assert got == _reference(readings)
+    assert stream.stats()["readings"] == 3000 and stream.stats()["transitions"] == len(got)
+
+
+def test_dict_readings_carry_their_city():
+    stream = BrakeEventStream()
+    (event,) = stream.run([{"vehicle_id": "V1", "brake_sensor_mm": 2.0, "city": "Pune"}])
+    assert event.city == "Pune" and event.brake_sensor_mm == 2.0
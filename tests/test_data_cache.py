@@ -0,0 +1,83 @@
+# tests/test_data_cache.py
+from datetime import date, timedelta
+
+import numpy as np
+
+from services.data_cache import DataCache
+from services.result_cache import ResultCache, payload_key
+
+
+def test_dataset_is_built_once_and_rebuilt_after_invalidate():
+    cache, builds = DataCache(), []
+    build = lambda: builds.append(1) or len(builds)  # noqa: E731
+    assert cache.dataset("maintenance", build) == 1
+    assert cache.dataset("maintenance", build) == 1
+    v1 = cache.version("maintenance")
+    cache.invalidate("maintenance")
+    assert cache.version("maintenance") > v1
+    assert cache.dataset("maintenance", build) == 2
+    assert len(builds) == 2
+
+
+def test_derived_results_follow_their_dataset_version():
+    cache, computed = DataCache(), []
+
+    def compute():
+        computed.append(1)
+        return len(computed)
+
+    cache.dataset("maintenance", lambda: "log v1")
+    cache.dataset("vehicles", lambda: "fleet")
+    assert cache.derived("maintenance", "insights", compute) == 1
+    assert cache.derived("maintenance", "insights", compute) == 1
+    # another dataset changing does not touch it
+    cache.set_dataset("vehicles", "fleet v2")
+    assert cache.derived("maintenance", "insights", compute) == 1
+    cache.set_dataset("maintenance", "log v2")
+    assert cache.derived("maintenance", "insights", compute) == 2
+    cache.invalidate("maintenance")
+    assert cache.derived("maintenance", "insights", compute) == 3
+    # valid() rejects a stored value and the new one replaces it
+    assert cache.derived("maintenance", "insights", compute, valid=lambda v: v > 3) == 4
+    assert cache.derived("maintenance", "insights", compute, valid=lambda v: v > 3) == 4
+    assert cache.is_current("maintenance", None) is False
+
+
+def test_payload_key_ignores_key_order_and_integral_floats():
+    a = {"mileage": 45000, "year": 2022, "nested": {"x": 1.0, "y": [1, 2.5]}}
+    b = {"nested": {"y": [1, 2.5], "x": 1}, "year": np.int64(2022), "mileage": 45000.0}
+    assert payload_key(a) == payload_key(b)
+    assert payload_key(a) != payload_key(dict(a, mileage=45001))
+
+
+def test_result_cache_hits_only_for_same_day_context_and_valid_results():
+    cache, runs = ResultCache(), []
+    compute = lambda: runs.append(1) or {"run": len(runs)}  # noqa: E731
+    today = date(2026, 1, 5)
+    payload = {"vehicle_id": "V001", "mileage": 1000}
+
+    first, hit = cache.get_or_compute(payload, compute, context=(1, 1), today=today)
+    assert not hit and first == {"run": 1}
+    again, hit = cache.get_or_compute(dict(payload, mileage=1000.0), compute, context=(1, 1), today=today)
+    assert hit and again is first
+
+    # new dataset versions, a new day or a rejected result all recompute
+    assert not cache.get_or_compute(payload, compute, context=(1, 2), today=today)[1]
+    assert not cache.get_or_compute(payload, compute, context=(1, 1), today=today + timedelta(days=1))[1]
+    result, hit = cache.get_or_compute(payload, compute, context=(1, 1), today=today + timedelta(days=1),
+                                       validate=lambda r: False)
+    assert not hit and result == {"run": 4}
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 4 and stats["expired"] == 2
+
+
+def test_result_cache_evicts_least_recently_used():
+    cache = ResultCache(max_entries=2)
+    today = date(2026, 1, 5)
+    for vid in ("A", "B"):
+        cache.get_or_compute({"v": vid}, lambda: vid, today=today)
+    assert cache.get_or_compute({"v": "A"}, lambda: "A2", today=today) == ("A", True)  # A is now newest
+    cache.get_or_compute({"v": "C"}, lambda: "C", today=today)  # evicts B
+    assert cache.get_or_compute({"v": "A"}, lambda: "A3", today=today) == ("A", True)
+    assert cache.get_or_compute({"v": "B"}, lambda: "B2", today=today) == ("B2", False)
+    assert cache.stats()["evictions"] == 2
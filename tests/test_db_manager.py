@@ -0,0 +1,141 @@
+# tests/test_db_manager.py
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from services import db_manager
+from services.db_manager import JOURNAL_SEQ_KEY, DatabaseManager
+
+VID = "MH-01-AB-1234"
+
+
+@pytest.fixture
+def db_file(tmp_path):
+    return str(tmp_path / "vehicles.json")
+
+
+def _history(db, vid=VID):
+    return [h["issue"] for h in db.get_vehicle(vid)["history"]]
+
+
+def test_journal_is_replayed_after_a_crash(db_file):
+    db = DatabaseManager(db_file, journal=True, compact_every=10**6)
+    for i in range(5):
+        db.update_vehicle_history(VID, f"issue {i}", "Booked")
+    # no close(): the process dies with the records only in the journal
+    reopened = DatabaseManager(db_file)
+    assert _history(reopened) == [f"issue {i}" for i in range(5)]
+    # a non-journaling writer folds the journal into the snapshot
+    assert not os.path.exists(db_file + ".journal")
+    with open(db_file, encoding="utf-8") as f:
+        assert JOURNAL_SEQ_KEY in json.load(f)
+    assert JOURNAL_SEQ_KEY not in reopened.list_vehicles()
+
+
+def test_journal_surviving_its_compaction_is_not_applied_twice(db_file):
+    db = DatabaseManager(db_file, journal=True, compact_every=10**6)
+    for i in range(3):
+        db.update_vehicle_history(VID, f"issue {i}", "Booked")
+    db.flush()
+    with open(db_file + ".journal", "rb") as f:
+        journal = f.read()
+    db.compact()
+    # crash between writing the snapshot and removing the journal
+    with open(db_file + ".journal", "wb") as f:
+        f.write(journal)
+    reopened = DatabaseManager(db_file, journal=True)
+    assert _history(reopened) == ["issue 0", "issue 1", "issue 2"]
+    reopened.update_vehicle_history(VID, "issue 3", "Booked")
+    reopened.close()
+    assert _history(DatabaseManager(db_file)) == ["issue 0", "issue 1", "issue 2", "issue 3"]
+
+
+def test_torn_last_journal_line_is_dropped(db_file):
+    db = DatabaseManager(db_file, journal=True, compact_every=10**6)
+    db.update_vehicle_history(VID, "whole", "Booked")
+    db.close()
+    with open(db_file + ".journal", "ab") as f:
+        f.write(b'{"op":"history","id":"MH-01')
+    reopened = DatabaseManager(db_file, journal=True)
+    assert _history(reopened) == ["whole"]
+    reopened.update_vehicle_history(VID, "after", "Booked")
+    reopened.close()
+    assert _history(DatabaseManager(db_file)) == ["whole", "after"]
+
+
+def test_failed_journal_write_leaves_memory_and_journal_unchanged(db_file, monkeypatch):
+    db = DatabaseManager(db_file, journal=True, compact_every=10**6)
+    db.update_vehicle_history(VID, "kept", "Booked")
+    size = os.path.getsize(db_file + ".journal")
+
+    class FullDisk:
+        def __init__(self, fh):
+            self.fh = fh
+
+        def write(self, data):
+            self.fh.write(data[:10])
+            raise OSError(28, "No space left on device")
+
+        def __getattr__(self, name):
+            return getattr(self.fh, name)
+
+    db._journal_fh = FullDisk(db._journal_fh)
+    with pytest.raises(OSError):
+        db.update_vehicle_history(VID, "lost", "Booked")
+    assert _history(db) == ["kept"]
+    assert os.path.getsize(db_file + ".journal") == size
+    db.update_vehicle_history(VID, "next", "Booked")
+    db.close()
+    assert _history(DatabaseManager(db_file)) == ["kept", "next"]
+
+
+def test_failed_snapshot_save_leaves_memory_unchanged(db_file, monkeypatch):
+    db = DatabaseManager(db_file)
+    db.update_vehicle_history(VID, "kept", "Booked")
+
+    def fail(*args):
+        raise OSError(5, "I/O error")
+
+    monkeypatch.setattr(db_manager.os, "replace", fail)
+    with pytest.raises(OSError):
+        db.update_vehicle_history(VID, "lost", "Booked")
+    monkeypatch.undo()
+    assert _history(db) == ["kept"]
+
+
+def test_idle_writer_is_synced_within_the_interval(db_file, monkeypatch):
+    synced = []
+    real_fsync = os.fsync
+    monkeypatch.setattr(db_manager.os, "fsync", lambda fd: (synced.append(fd), real_fsync(fd)))
+    db = DatabaseManager(db_file, journal=True, sync_every=1000, sync_interval=0.05, compact_every=10**6)
+    synced.clear()
+    db.update_vehicle_history(VID, "one", "Booked")
+    deadline = time.monotonic() + 2
+    while db._unsynced and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert synced and db._unsynced == 0
+    db.close()
+
+
+def test_concurrent_writers_lose_nothing(db_file):
+    a = DatabaseManager(db_file, journal=True, compact_every=50)
+    b = DatabaseManager(db_file)  # a second writer on the same files, as another process would be
+    threads, per_thread = 8, 25
+
+    def worker(t):
+        db = a if t % 2 else b
+        for i in range(per_thread):
+            db.update_vehicle_history(VID, f"{t}-{i}", "Booked")
+
+    pool = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    for th in pool:
+        th.start()
+    for th in pool:
+        th.join()
+    a.close()
+    b.close()
+    issues = _history(DatabaseManager(db_file))
+    assert sorted(issues) == sorted(f"{t}-{i}" for t in range(threads) for i in range(per_thread))
@@ -0,0 +1,46 @@
+# tests/test_demand_forecast.py
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from services.demand_forecast import DemandForecaster
+
+TODAY = date(2026, 1, 5)
+
+
+def _fit():
+    vehicles = pd.DataFrame({"id": ["V1", "V2", "V3"], "city": ["Pune", "Pune", "Delhi"]})
+    # one job every third day in Pune, one a week in Delhi
+    days = [TODAY - timedelta(days=d) for d in range(1, 366)]
+    maint = pd.DataFrame(
+        {
+            "vehicle_id": ["V1" if i % 3 == 0 else "V3" for i in range(len(days))],
+            "date": days,
+        }
+    )
+    maint = maint[[i % 3 == 0 or i % 7 == 0 for i in range(len(days))]]
+    return DemandForecaster().fit(maint, vehicles, today=TODAY)
+
+
+def test_expected_jobs_is_a_rate_and_bays_needed_rounds_it_up():
+    fc = _fit()
+    fleet = fc.fleet_forecast()
+    assert len(fleet) == 30 and fleet["date"].iloc[0] == TODAY + timedelta(days=1)
+    # a sparse history gives a fractional daily rate...
+    assert (fleet["expected_jobs"] % 1 != 0).all() and fleet["expected_jobs"].min() < 1
+    # ...and a whole number of bays that covers it
+    assert fleet["bays_needed"].dtype == np.int64
+    assert (fleet["bays_needed"] == np.ceil(fleet["expected_jobs"])).all()
+    assert fleet["bays_needed"].min() == 1
+
+
+def test_hub_frames_agree_with_the_fleet_total():
+    fc = _fit()
+    long = fc.to_frame()
+    assert set(long["city"]) == {"Delhi", "Pune"}
+    per_day = long.groupby("date")["expected_jobs"].sum().to_numpy()
+    np.testing.assert_allclose(per_day, fc.fleet_forecast()["expected_jobs"].to_numpy())
+    pune = fc.hub_forecast("Pune")
+    assert (pune["bays_needed"] >= pune["expected_jobs"]).all()
+    assert (fc.hub_forecast("Nowhere")[["expected_jobs", "bays_needed"]] == 0).all().all()
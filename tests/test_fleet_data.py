@@ -0,0 +1,59 @@
+# tests/test_fleet_data.py
+import threading
+from datetime import date
+
+import numpy as np
+import pytest
+
+from data.fleet_data import (
+    append_maintenance_records, build_maintenance_logs, maint_df, maintenance_history, rca_store,
+)
+from services.data_cache import DATA_CACHE
+
+
+@pytest.fixture
+def small_log():
+    DATA_CACHE.set_dataset("maintenance", build_maintenance_logs().iloc[:5].reset_index(drop=True))
+    yield
+    DATA_CACHE.invalidate("maintenance")
+
+
+def _record(vid, i):
+    return {
+        "vehicle_id": vid, "date": date(2026, 1, 1 + i % 28), "component": "Brakes", "issue": "Brake pad wear",
+        "severity": 1 + i % 5, "cost": 1000 + i, "rca_tag": "City stop-go traffic",
+        "capa_action": "Upgrade pad material; better cooling slots",
+    }
+
+
+def test_concurrent_appends_keep_log_aggregates_and_index_in_step(small_log):
+    threads, per_thread = 8, 40
+    start = threading.Barrier(threads)
+
+    def worker(t):
+        start.wait()
+        for i in range(per_thread):
+            append_maintenance_records([_record(f"T{t}", i)])
+
+    pool = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    for th in pool:
+        th.start()
+    for th in pool:
+        th.join()
+
+    frame = maint_df()
+    assert len(frame) == 5 + threads * per_thread
+    assert sum(rca_store().get(c).count for c in rca_store().components()) == len(frame)
+    history = maintenance_history()
+    rows = np.concatenate([history.rows_for(v) for v in frame["vehicle_id"].unique()])
+    assert sorted(rows.tolist()) == list(range(len(frame)))
+    for t in range(threads):
+        assert sorted(history.history(frame, f"T{t}")["cost"]) == [1000 + i for i in range(per_thread)]
+
+
+def test_rejected_append_leaves_aggregates_untouched(small_log):
+    before = sum(rca_store().get(c).count for c in rca_store().components())
+    with pytest.raises(Exception):
+        append_maintenance_records([dict(_record("X", 0), severity="bad")])
+    assert len(maint_df()) == 5
+    assert sum(rca_store().get(c).count for c in rca_store().components()) == before
@@ -0,0 +1,87 @@
+# tests/test_maintenance_history.py
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from services.maintenance_history import MaintenanceHistoryIndex
+
+TODAY = date(2026, 1, 1)
+
+
+def _log(n=400, vehicles=20, seed=3):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "vehicle_id": [f"V{v:03d}" for v in rng.integers(1, vehicles + 1, n)],
+            "date": [TODAY - timedelta(days=int(d)) for d in rng.integers(1, 900, n)],
+            "severity": rng.integers(1, 6, n),
+            "cost": rng.integers(500, 20000, n),
+        }
+    )
+
+
+def _tail(seed=4, n=120):
+    rng = np.random.default_rng(seed)
+    return [
+        {
+            "vehicle_id": f"V{int(v):03d}" if v else "V999",  # V999 only exists in the tail
+            "date": TODAY - timedelta(days=int(d)),
+            "severity": int(s),
+            "cost": int(c),
+        }
+        for v, d, s, c in zip(rng.integers(0, 21, n), rng.integers(0, 700, n), rng.integers(1, 6, n), rng.integers(500, 20000, n))
+    ]
+
+
+def _expected(df, vid):
+    rows = df[df["vehicle_id"] == vid]
+    recent = rows[pd.to_datetime(rows["date"]) >= pd.Timestamp(TODAY - timedelta(days=365))]
+    return {
+        "records": len(rows),
+        "recent_records": len(recent),
+        "recent_severity": recent["severity"].mean() if len(recent) else 0.0,
+        "recent_cost": float(recent["cost"].sum()),
+        "days_since_service": (pd.Timestamp(TODAY) - pd.to_datetime(rows["date"]).max()).days if len(rows) else np.nan,
+    }
+
+
+def test_fleet_features_fold_the_tail_like_a_rebuild():
+    base = _log()
+    tail = _tail()
+    index = MaintenanceHistoryIndex.from_frame(base)
+    index.add(tail)
+    assert index.stats()["tail_rows"] == len(tail)
+
+    full = pd.concat([base, pd.DataFrame(tail)], ignore_index=True)
+    # duplicates, a tail-only vehicle and an unknown id
+    query = [f"V{v:03d}" for v in range(1, 21)] + ["V999", "V005", "NOPE"]
+    features = index.features(query, today=TODAY)
+    for i, vid in enumerate(query):
+        expected = _expected(full, vid)
+        for name, value in expected.items():
+            np.testing.assert_allclose(features[name][i], value, err_msg=f"{vid} {name}")
+        single = index.vehicle_features(vid, today=TODAY)
+        assert single["records"] == expected["records"]
+        assert np.isclose(single["recent_cost"], expected["recent_cost"])
+
+
+def test_merge_keeps_features_and_row_order():
+    base = _log()
+    tail = _tail()
+    lazy = MaintenanceHistoryIndex.from_frame(base)
+    lazy.add(tail)
+    merged = MaintenanceHistoryIndex.from_frame(base, merge_every=50)
+    merged.add(tail)
+    assert merged.stats()["tail_rows"] == 0
+
+    query = [f"V{v:03d}" for v in range(1, 21)] + ["V999"]
+    a, b = lazy.features(query, today=TODAY), merged.features(query, today=TODAY)
+    for name in a:
+        np.testing.assert_allclose(a[name], b[name], err_msg=name)
+    full = pd.concat([base, pd.DataFrame(tail)], ignore_index=True)
+    for vid in ("V003", "V999"):
+        rows = merged.rows_for(vid)
+        assert list(rows) == list(lazy.rows_for(vid))
+        assert list(full.iloc[rows]["vehicle_id"].unique()) == [vid]
+        assert pd.to_datetime(full.iloc[rows]["date"]).is_monotonic_increasing
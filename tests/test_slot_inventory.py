@@ -0,0 +1,40 @@
+# tests/test_slot_inventory.py
+from datetime import datetime, timedelta
+
+from services.slot_inventory import SlotInventory
+
+NOW = datetime(2026, 1, 5, 8, 0)
+
+
+def test_assign_batch_seats_late_critical_before_on_time_moderate():
+    # 2 bays x 3 times = 6 seats a day: only 12 of the Critical vehicles fit their 2-day SLA
+    inventory = SlotInventory(bays_per_hub=2)
+    today = NOW.date()
+    critical = [(f"C{i:02d}", "Pune", today + timedelta(days=2), 0) for i in range(30)]
+    moderate = [(f"M{i:02d}", "Pune", today + timedelta(days=15), 2) for i in range(60)]
+    booked = inventory.assign_batch(critical + moderate, now=NOW)
+
+    assert all(r is not None for r in booked)
+    assert len({(r.start, r.bay) for r in booked}) == 90
+    crit_days = sorted((r.start.date() - today).days for r in booked[:30])
+    mod_days = [(r.start.date() - today).days for r in booked[30:]]
+    # every Moderate vehicle still makes its SLA ...
+    assert max(mod_days) <= 15
+    # ... and the Critical ones that miss theirs are seated right after, not behind the Moderates
+    assert crit_days[:12] == [1] * 6 + [2] * 6
+    assert max(crit_days) == 5
+
+
+def test_assign_batch_without_contention_books_earliest_seats():
+    inventory = SlotInventory(bays_per_hub=2)
+    today = NOW.date()
+    booked = inventory.assign_batch([(f"M{i}", "Pune", today + timedelta(days=15), 2) for i in range(6)], now=NOW)
+    assert {(r.start.date() - today).days for r in booked} == {1}
+
+
+def test_free_slots_lists_each_time_once():
+    inventory = SlotInventory(bays_per_hub=2)
+    inventory.reserve("Pune", now=NOW)  # 09:30 bay 1 taken, bay 2 still free
+    slots = inventory.free_slots("Pune", NOW.date() + timedelta(days=2), limit=10, now=NOW)
+    assert [s.start.hour for s in slots] == [9, 13, 17, 9, 13, 17]
+    assert slots[0].bay == 2
@@ -0,0 +1,79 @@
+# tests/test_sqlite_db.py
+import os
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from agents.scheduler_agent import SchedulingAgent
+from services.db_manager import DatabaseManager
+from services.slot_inventory import SlotInventory
+from services.sqlite_db import SqliteDatabaseManager, migrate_json_to_sqlite
+
+VID = "MH-01-AB-1234"
+
+
+def test_booked_slot_is_returned_like_the_json_store(tmp_path):
+    stores = [DatabaseManager(str(tmp_path / "v.json")), SqliteDatabaseManager(str(tmp_path / "v.db"))]
+    for db in stores:
+        SchedulingAgent(db, SlotInventory()).book_service(VID, "Brake pad wear", city="Pune")
+        db.update_vehicle_history(VID, "Follow-up call", "")
+    json_history, sqlite_history = (db.get_vehicle(VID)["history"] for db in stores)
+    assert [set(h) for h in json_history] == [set(h) for h in sqlite_history]
+    assert json_history[0]["slot"] == sqlite_history[0]["slot"]
+    assert "slot" not in sqlite_history[1]
+
+
+def test_scheduled_between_filters_on_the_slot_date(tmp_path):
+    db = SqliteDatabaseManager(str(tmp_path / "v.db"))
+    slot = datetime.now() + timedelta(days=10)
+    db.update_vehicle_history(VID, "Brake pad wear", "Scheduled Service", slot=slot)
+    today = datetime.now().strftime("%Y-%m-%d")
+    slot_day = slot.strftime("%Y-%m-%d")
+    next_day = (slot + timedelta(days=1)).strftime("%Y-%m-%d")
+    assert db.scheduled_between(today, (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")) == []
+    assert db.scheduled_between(slot_day, next_day) == [VID]
+
+
+def test_old_database_gets_an_indexed_backfilled_slot_date(tmp_path):
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE vehicles (vehicle_id TEXT PRIMARY KEY, owner TEXT NOT NULL DEFAULT '',
+            phone TEXT NOT NULL DEFAULT '', model TEXT NOT NULL DEFAULT '', status TEXT NOT NULL DEFAULT '',
+            extra TEXT NOT NULL DEFAULT '{}');
+        CREATE TABLE history (id INTEGER PRIMARY KEY AUTOINCREMENT, vehicle_id TEXT NOT NULL,
+            date TEXT NOT NULL, issue TEXT, action TEXT);
+        INSERT INTO vehicles (vehicle_id) VALUES ('A'), ('B');
+        INSERT INTO history (vehicle_id, date, issue, action) VALUES
+            ('A', '2026-12-30 10:00:00', 'x', 'Scheduled Service (Tue 05 Jan - 09:30 AM, bay 1)'),
+            ('B', '2026-03-01 10:00:00', 'x', 'Healthy');
+    """)
+    conn.commit()
+    conn.close()
+
+    db = SqliteDatabaseManager(path)
+    assert db.get_vehicle("A")["history"][0]["slot"] == "2027-01-05 09:30:00"
+    assert "slot" not in db.get_vehicle("B")["history"][0]
+    assert db.scheduled_between("2027-01-01", "2027-01-08") == ["A"]
+    indexes = {r[1] for r in db.conn.execute("PRAGMA index_list(history)")}
+    assert "idx_history_slot_date" in indexes
+
+
+def test_migration_reads_the_json_store_without_touching_it(tmp_path):
+    src = str(tmp_path / "v.json")
+    writer = DatabaseManager(src, journal=True, compact_every=10**6)
+    writer.update_vehicle_history(VID, "journaled", "Booked")
+    writer.close()
+    before = {p: open(p, "rb").read() for p in (src, src + ".journal")}
+
+    target = migrate_json_to_sqlite(src, str(tmp_path / "v.db"))
+    assert [h["issue"] for h in target.get_vehicle(VID)["history"]] == ["journaled"]
+    assert {p: open(p, "rb").read() for p in before} == before
+
+
+def test_migration_of_a_missing_store_fails_without_creating_it(tmp_path):
+    src = str(tmp_path / "missing.json")
+    with pytest.raises(FileNotFoundError):
+        migrate_json_to_sqlite(src, str(tmp_path / "v.db"))
+    assert not os.path.exists(src)
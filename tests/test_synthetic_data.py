@@ -0,0 +1,87 @@
+# tests/test_synthetic_data.py
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data.fleet_data import build_maintenance_logs, build_synthetic_vehicles as build_demo_vehicles
+from data.synthetic_data import (
+    CATALOG, CITIES, COMPONENTS, VEHICLE_DTYPES, SyntheticFleetGenerator, build_synthetic_vehicles,
+    iter_dataset_chunks, write_dataset,
+)
+
+TODAY = date(2026, 1, 5)
+
+
+def _gen(chunk_size=40, seed=7):
+    return SyntheticFleetGenerator(100, records_per_vehicle=3, seed=seed, chunk_size=chunk_size, today=TODAY)
+
+
+def test_chunks_are_deterministic_and_independent_of_read_order():
+    a, b = _gen(), _gen()
+    assert a.n_chunks == 3
+    # read b's chunks backwards: each chunk has its own seed
+    for chunk in reversed(range(b.n_chunks)):
+        pd.testing.assert_frame_equal(a.vehicle_chunk(chunk), b.vehicle_chunk(chunk))
+        pd.testing.assert_frame_equal(a.maintenance_chunk(chunk), b.maintenance_chunk(chunk))
+    assert not a.vehicle_chunk(0).equals(_gen(seed=8).vehicle_chunk(0))
+
+
+def test_chunks_use_the_shared_catalog_and_id_format():
+    gen = _gen()
+    vehicles = pd.concat(gen.iter_vehicle_chunks(), ignore_index=True).astype(VEHICLE_DTYPES)
+    assert list(vehicles["id"]) == [f"V{i:04d}" for i in range(1, 101)]
+    catalog = {(make, model, seg) for make, model, seg in CATALOG}
+    assert set(zip(vehicles["make"], vehicles["model"], vehicles["segment"])) <= catalog
+    assert set(vehicles["city"]) <= set(CITIES)
+
+    maint = gen.maintenance_chunk(1)
+    assert set(maint["vehicle_id"].astype(str)) <= set(vehicles["id"][40:80])
+    assert all(COMPONENTS[c][0] == i for c, i in zip(maint["component"], maint["issue"]))
+    assert maint["date"].max() < np.datetime64(TODAY)
+
+
+def test_small_builder_keeps_plain_columns_and_four_digit_ids():
+    small = build_synthetic_vehicles(10)
+    large = build_synthetic_vehicles(len(CATALOG) + 5)
+    for df in (small, large):
+        assert dict(df.dtypes) == {c: np.dtype(t) for c, t in VEHICLE_DTYPES.items()}
+    assert sorted(small["id"]) == [f"V{i:04d}" for i in range(1, 11)]
+    assert large["id"].iloc[-1] == f"V{len(CATALOG) + 5:04d}"
+
+
+def test_demo_fleet_comes_from_the_catalog():
+    demo = build_demo_vehicles()
+    catalog = {(make, model, seg) for make, model, seg in CATALOG}
+    assert list(demo["id"]) == [f"V{i:03d}" for i in range(1, 21)]
+    assert set(zip(demo["make"], demo["model"], demo["segment"])) <= catalog
+    assert set(demo["city"]) <= set(CITIES)
+    log = build_maintenance_logs()
+    assert set(log["vehicle_id"].astype(str)) <= set(demo["id"])
+    assert set(log["component"].astype(str)) <= set(COMPONENTS)
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow", "npz"])
+def test_written_dataset_reads_back_chunk_by_chunk(tmp_path, fmt):
+    if fmt != "npz":
+        pytest.importorskip("pyarrow")
+    gen = _gen()
+    manifest = write_dataset(gen, str(tmp_path), fmt)
+    assert manifest["format"] == fmt and manifest["seed"] == 7
+
+    for name, build in (("vehicles", gen.vehicle_chunk), ("maintenance", gen.maintenance_chunk)):
+        chunks = list(iter_dataset_chunks(str(tmp_path), name))
+        assert len(chunks) == gen.n_chunks
+        assert sum(len(c) for c in chunks) == manifest[name]["rows"]
+        for chunk, back in enumerate(chunks):
+            expected = build(chunk)
+            assert list(back.columns) == list(expected.columns)
+            for col in expected.columns:
+                want, got = expected[col], back[col]
+                if isinstance(want.dtype, (pd.CategoricalDtype, pd.StringDtype)) or want.dtype == object:
+                    assert list(got.astype(str)) == list(want.astype(str)), (name, col)
+                else:
+                    np.testing.assert_array_equal(
+                        np.asarray(got).astype(want.dtype), want.to_numpy(), err_msg=f"{name} {col}"
+                    )
@@ -0,0 +1,57 @@
+# tests/test_tts_cache.py
+import os
+import time
+
+from services.tts_cache import TMP_MARKER, AudioCache, utterance_key
+
+
+def _renderer(calls, size=100):
+    def render(text, path):
+        calls.append(text)
+        with open(path, "wb") as fh:
+            fh.write(b"x" * size)
+
+    return render
+
+
+def test_repeats_are_served_from_disk(tmp_path):
+    cache, calls = AudioCache(str(tmp_path)), []
+    first = cache.get_or_render("Your  slot is\nbooked.", None, 150, _renderer(calls))
+    again = cache.get_or_render("Your slot is booked.", None, 150, _renderer(calls))  # same words, other spacing
+    assert first == again and os.path.getsize(first) == 100
+    assert calls == ["Your  slot is\nbooked."]
+    other = cache.get_or_render("Your slot is booked.", None, 180, _renderer(calls))  # another rate
+    assert other != first and len(calls) == 2
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2
+    assert not [n for n in os.listdir(tmp_path) if TMP_MARKER in n]
+
+
+def test_least_recently_used_files_are_evicted(tmp_path):
+    cache, calls = AudioCache(str(tmp_path), max_bytes=250), []
+    a = cache.get_or_render("a", None, 150, _renderer(calls))
+    b = cache.get_or_render("b", None, 150, _renderer(calls))
+    cache.get_or_render("a", None, 150, _renderer(calls))  # a is now newer than b
+    cache.get_or_render("c", None, 150, _renderer(calls))
+    assert os.path.exists(a) and not os.path.exists(b)
+    assert cache.stats()["evictions"] == 1 and cache.stats()["bytes"] == 200
+
+
+def test_failed_render_caches_nothing(tmp_path):
+    cache = AudioCache(str(tmp_path))
+    assert cache.get_or_render("silence", None, 150, lambda text, path: None) is None
+    assert cache.stats()["entries"] == 0 and os.listdir(tmp_path) == []
+
+
+def test_restart_picks_up_files_and_drops_stale_renders(tmp_path):
+    calls = []
+    path = AudioCache(str(tmp_path)).get_or_render("hello", "en", 150, _renderer(calls))
+    stale = os.path.join(str(tmp_path), f"x.wav.1.2{TMP_MARKER}.wav")
+    with open(stale, "wb") as fh:
+        fh.write(b"half")
+    old = time.time() - 7200
+    os.utime(stale, (old, old))
+
+    cache = AudioCache(str(tmp_path))
+    assert not os.path.exists(stale)
+    assert cache.get(utterance_key("hello", "en", 150)) == path
+    assert cache.get_or_render("hello", "en", 150, _renderer(calls)) == path and calls == ["hello"]
@@ -0,0 +1,68 @@
+# tests/test_tts_worker.py
+import threading
+
+from services.tts_worker import FileSinkBackend, NullBackend, SpeechWorker, make_backend
+
+
+class _Recorder:
+    name = "recorder"
+
+    def __init__(self, gate=None):
+        self.said = []
+        self.gate = gate
+
+    def say(self, text):
+        if self.gate is not None:
+            self.gate.wait(5)
+        self.said.append(text)
+
+    def close(self):
+        pass
+
+
+def test_auto_without_pyttsx3_counts_utterances_as_silent(monkeypatch):
+    import services.tts_worker as tts_worker
+
+    def no_engine(*args, **kwargs):
+        raise RuntimeError("no speech engine")
+
+    monkeypatch.setattr(tts_worker, "CachedAudioBackend", no_engine)
+    worker = SpeechWorker(lambda: make_backend("auto"))
+    assert worker.speak("hello", timeout=5)
+    worker.close()
+    assert isinstance(worker.backend, NullBackend)
+    assert worker.stats["silent"] == 1 and worker.stats["spoken"] == 0
+
+
+def test_failing_backend_factory_falls_back_to_silent():
+    def broken():
+        raise OSError("audio device busy")
+
+    worker = SpeechWorker(broken)
+    assert worker.speak("hello", timeout=5)
+    worker.close()
+    assert worker.stats["silent"] == 1 and worker.stats["spoken"] == 0
+
+
+def test_file_sink_counts_as_spoken(tmp_path):
+    path = tmp_path / "transcript.log"
+    worker = SpeechWorker(lambda: FileSinkBackend(str(path)))
+    assert worker.speak("first  line", timeout=5)
+    worker.close()
+    assert worker.stats["spoken"] == 1 and worker.stats["silent"] == 0
+    assert path.read_text(encoding="utf-8").rstrip().endswith("\tfirst line")
+
+
+def test_newer_reply_supersedes_the_waiting_one():
+    gate = threading.Event()
+    backend = _Recorder(gate)
+    worker = SpeechWorker(lambda: backend)
+    first = threading.Event()
+    worker.submit("busy", channel="other", done=first)
+    worker.submit("old reply")
+    worker.submit("new reply")
+    gate.set()
+    assert first.wait(5)
+    worker.close()
+    assert backend.said == ["busy", "new reply"]
+    assert worker.stats["superseded"] == 1 and worker.stats["spoken"] == 2
@@ -0,0 +1,52 @@
+# tests/test_ueba_stream.py
+import io
+import json
+
+import pytest
+
+from services.ueba_stream import UebaStreamAnalyzer, iter_records
+
+RECORDS = [
+    {"time": f"2026-01-05T10:00:{i:02d}", "agent": "DataAnalysisAgent", "action": "read",
+     "resource": "telematics_stream", "vehicle_id": f"V{i:03d}", "note": "ünïcode, [brackets] and {braces}"}
+    for i in range(12)
+] + [{"time": "2026-01-05T10:00:30", "agent": "SchedulingAgent", "action": "read", "resource": "maintenance_db",
+      "anomaly": True, "nested": {"a": [1, {"b": "}]"}]}}]
+
+
+@pytest.mark.parametrize("read_size", [1, 2, 3, 7, 64, 1 << 16])
+@pytest.mark.parametrize("fmt", ["array", "pretty", "jsonl"])
+def test_records_survive_any_chunk_boundary(read_size, fmt):
+    if fmt == "array":
+        text = json.dumps(RECORDS, ensure_ascii=False)
+    elif fmt == "pretty":
+        text = json.dumps(RECORDS, ensure_ascii=False, indent=2)
+    else:
+        text = "\n".join(json.dumps(r, ensure_ascii=False) for r in RECORDS) + "\n"
+    assert list(iter_records(io.StringIO(text), read_size=read_size)) == RECORDS
+
+
+def test_empty_inputs_yield_nothing():
+    for text in ("", "[]", " \n[\n]\n", "\n\n"):
+        assert list(iter_records(io.StringIO(text), read_size=2)) == []
+
+
+def test_truncated_and_oversized_records_raise():
+    text = json.dumps(RECORDS)[:-20]
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_records(io.StringIO(text), read_size=16))
+    with pytest.raises(ValueError):
+        list(iter_records(io.StringIO(json.dumps(RECORDS)), read_size=8, max_record_chars=32))
+
+
+def test_analyzer_flags_baseline_recorded_and_rate_findings():
+    analyzer = UebaStreamAnalyzer(window_s=60, max_events=10)
+    findings = list(analyzer.run(RECORDS))
+    kinds = [f["kind"] for f in findings]
+    # 11th and 12th reads inside a minute exceed the limit; the SchedulingAgent read is off-baseline and recorded
+    assert kinds.count("rate") == 2 and kinds.count("recorded") == 1
+    assert kinds.count("baseline") == sum(
+        1 for r in RECORDS if r["resource"] not in analyzer.baseline_access.get(r["agent"], ())
+    )
+    summary = analyzer.summary()
+    assert summary["records"] == len(RECORDS) and summary["findings"]["rate"] == 2